@@ -5,13 +5,13 @@ from pydantic import BaseModel, EmailStr
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..domain.exceptions import UserExistsError
+from ..domain.exceptions import GroupNotFoundError, UserExistsError
 from ..domain.models import User
 from ..infrastructure.constants import DEFAULT_GROUP_ID
 from ..infrastructure.database import get_db
 from ..infrastructure.orm import UserORM
-from ..infrastructure.repositories import SQLAlchemyGroupRepository, SQLAlchemyUserRepository
 from ..infrastructure.security import create_access_token, get_current_user, hash_password, verify_password
+from ..infrastructure.unit_of_work import SQLAlchemyUnitOfWork, get_unit_of_work
 
 logger = logging.getLogger(__name__)
 
@@ -36,8 +36,7 @@ class LoginRequest(BaseModel):
 
 
 @router.post("/signup", response_model=Token)
-async def signup(payload: SignupRequest, db: AsyncSession = Depends(get_db)) -> Token:
-    repo = SQLAlchemyUserRepository(db)
+async def signup(payload: SignupRequest, uow: SQLAlchemyUnitOfWork = Depends(get_unit_of_work)) -> Token:
     pw_hash = await hash_password(payload.password)
     user = User(
         email=payload.email,
@@ -46,21 +45,23 @@ async def signup(payload: SignupRequest, db: AsyncSession = Depends(get_db)) ->
         password_hash=pw_hash,
     )
 
-    try:
-        user_created = await repo.add(user)
-    except UserExistsError as exc:
-        raise HTTPException(status_code=409, detail="Email already exists") from exc
-
-    try:
-        await SQLAlchemyGroupRepository(db).add_member(DEFAULT_GROUP_ID, user_created.id)
-    except Exception:
-        logger.error(
-            f"Failed to add new user to default group {DEFAULT_GROUP_ID}.",
-            exc_info=True,
-            extra={"group_id": str(DEFAULT_GROUP_ID)},
-        )
-
-    token = create_access_token(str(user_created.id))
+    async with uow:
+        try:
+            user_created = await uow.users.add(user)
+        except UserExistsError as exc:
+            raise HTTPException(status_code=409, detail="Email already exists") from exc
+
+        try:
+            await uow.groups.add_member(DEFAULT_GROUP_ID, user_created.id)
+        except GroupNotFoundError:
+            logger.error(
+                f"Failed to add new user to default group {DEFAULT_GROUP_ID}.",
+                exc_info=True,
+                extra={"group_id": str(DEFAULT_GROUP_ID)},
+            )
+        await uow.commit()
+
+    token = create_access_token(user_created, token_version=user_created.token_version)
     return Token(access_token=token)
 
 
@@ -71,7 +72,8 @@ async def login(payload: LoginRequest, db: AsyncSession = Depends(get_db)) -> To
     if not row or not row.password_hash or not await verify_password(payload.password, row.password_hash):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    token = create_access_token(str(row.id))
+    user = User(id=row.id, email=row.email, name=row.name, is_admin=row.is_admin)
+    token = create_access_token(user, token_version=row.token_version)
     return Token(access_token=token)
 
 
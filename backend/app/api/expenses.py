@@ -1,63 +1,129 @@
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from fastapi.responses import Response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..domain.exceptions import GroupNotFoundError, NotGroupMemberError, PayerNotFoundError
 from ..domain.models import Expense
 from ..domain.models import User as UserModel
-from ..infrastructure.database import get_db
+from ..infrastructure.database import get_db, get_read_db
 from ..infrastructure.repositories import (
     SQLAlchemyExpenseRepository,
     SQLAlchemyGroupRepository,
     SQLAlchemyUserRepository,
 )
 from ..infrastructure.security import get_current_user
-from .schemas import ExpenseCreate, ExpenseRead
+from ..infrastructure.unit_of_work import SQLAlchemyUnitOfWork, get_unit_of_work
+from .idempotency import IdempotentRequest, idempotent
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_time_id_cursor, paginate
+from .schemas import BulkExpenseError, BulkExpenseResult, ExpenseCreate, ExpenseRead, Page
 
 router = APIRouter(prefix="/expenses", tags=["expenses"])
 
+MAX_BULK_EXPENSES = 10_000
+
 
 @router.post("/", response_model=ExpenseRead)
 async def create_expense(
     expense: ExpenseCreate,
-    db: AsyncSession = Depends(get_db),
+    uow: SQLAlchemyUnitOfWork = Depends(get_unit_of_work),
     _current: UserModel = Depends(get_current_user),
-) -> ExpenseRead:
-    """Create a new expense and persist it."""
-    group_repo = SQLAlchemyGroupRepository(db)
-    user_repo = SQLAlchemyUserRepository(db)
-
-    gid = expense.group_id
-    pid = expense.payer_id
-
-    group = await group_repo.get(gid)
-    if not group:
-        raise HTTPException(status_code=404, detail="Group not found")
-    if not await user_repo.get(pid):
-        raise HTTPException(status_code=404, detail="Payer not found")
+    idempotency: IdempotentRequest = Depends(idempotent("POST /expenses/")),
+) -> Response:
+    """Create a new expense and persist it.
 
-    if pid not in group.members:
-        raise HTTPException(status_code=400, detail="Payer is not a member of the group")
+    Retries carrying the same ``Idempotency-Key`` replay the first response.
+    """
+    replay = await idempotency.replay(expense)
+    if replay is not None:
+        return replay
 
-    repo = SQLAlchemyExpenseRepository(db)
     e = Expense(
-        group_id=gid,
-        payer_id=pid,
+        group_id=expense.group_id,
+        payer_id=expense.payer_id,
         amount=int(expense.amount * 100),
         description=expense.description,
     )
-    expense_created = await repo.add(e)
-    return expense_created
+    response = idempotency.stage(ExpenseRead.model_validate(e))
+    try:
+        async with uow:
+            await uow.expenses.add_for_member(e)
+            await uow.commit()
+    except GroupNotFoundError:
+        raise HTTPException(status_code=404, detail="Group not found")
+    except PayerNotFoundError:
+        raise HTTPException(status_code=404, detail="Payer not found")
+    except NotGroupMemberError:
+        raise HTTPException(status_code=400, detail="Payer is not a member of the group")
+    except IntegrityError:
+        replay = await idempotency.replay_after_conflict()
+        if replay is None:
+            raise
+        return replay
+    idempotency.committed()
+    return response
+
+
+@router.post("/bulk", response_model=BulkExpenseResult)
+async def create_expenses_bulk(
+    payload: list[ExpenseCreate] = Body(..., min_length=1, max_length=MAX_BULK_EXPENSES),
+    db: AsyncSession = Depends(get_db),
+    _current: UserModel = Depends(get_current_user),
+) -> BulkExpenseResult:
+    """Create many expenses in one transaction, reporting rows that were rejected.
+
+    Groups, payers and memberships are validated with one query each,
+    regardless of how many rows are submitted.
+    """
+    group_repo = SQLAlchemyGroupRepository(db)
+    user_repo = SQLAlchemyUserRepository(db)
+
+    group_ids = {e.group_id for e in payload}
+    payer_ids = {e.payer_id for e in payload}
+    groups = await group_repo.existing_ids(group_ids)
+    payers = await user_repo.existing_ids(payer_ids)
+    members = await group_repo.memberships(group_ids, payer_ids)
+
+    accepted: list[Expense] = []
+    errors: list[BulkExpenseError] = []
+    for index, expense in enumerate(payload):
+        if expense.group_id not in groups:
+            errors.append(BulkExpenseError(index=index, detail="Group not found"))
+        elif expense.payer_id not in payers:
+            errors.append(BulkExpenseError(index=index, detail="Payer not found"))
+        elif (expense.group_id, expense.payer_id) not in members:
+            errors.append(BulkExpenseError(index=index, detail="Payer is not a member of the group"))
+        else:
+            accepted.append(
+                Expense(
+                    group_id=expense.group_id,
+                    payer_id=expense.payer_id,
+                    amount=int(expense.amount * 100),
+                    description=expense.description,
+                )
+            )
+
+    if accepted:
+        await SQLAlchemyExpenseRepository(db).add_many(accepted)
+    return BulkExpenseResult(created=len(accepted), ids=[e.id for e in accepted], errors=errors)
 
 
-@router.get("/", response_model=list[ExpenseRead])
-async def list_expenses(db: AsyncSession = Depends(get_db)) -> list[ExpenseRead]:
+@router.get("/", response_model=Page[ExpenseRead])
+async def list_expenses(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+) -> Page[ExpenseRead]:
     repo = SQLAlchemyExpenseRepository(db)
-    return await repo.list_all()
+    rows = await repo.list_all(limit=limit + 1, after=decode_time_id_cursor(cursor))
+    return paginate(rows, limit, lambda e: (e.created_at, e.id))
 
 
 @router.get("/{expense_id}", response_model=ExpenseRead)
-async def get_expense(expense_id: str, db: AsyncSession = Depends(get_db)) -> ExpenseRead:
+async def get_expense(expense_id: str, db: AsyncSession = Depends(get_read_db)) -> ExpenseRead:
     try:
         eid = UUID(expense_id)
     except Exception:
@@ -1,20 +1,38 @@
+import csv
+import io
 import logging
+from datetime import datetime
+from typing import AsyncIterator, Dict, Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..domain.models import Group
+from ..domain.exceptions import GroupNotFoundError, UserNotFoundError
+from ..domain.models import ExpenseFilter, Group
 from ..domain.models import User as UserModel
-from ..domain.services import calculate_group_balances
-from ..infrastructure.database import get_db
+from ..domain.services import calculate_balances_from_totals, plan_settlements
+from ..infrastructure.database import get_db, get_read_db
 from ..infrastructure.repositories import (
     SQLAlchemyExpenseRepository,
     SQLAlchemyGroupRepository,
-    SQLAlchemyUserRepository,
 )
 from ..infrastructure.security import get_current_user
-from .schemas import BalanceEntry, ExpenseRead, GroupCreate, GroupRead, GroupUpdate
+from ..infrastructure.unit_of_work import SQLAlchemyUnitOfWork, get_unit_of_work
+from .idempotency import IdempotentRequest, idempotent
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_id_cursor, decode_time_id_cursor, paginate
+from .schemas import (
+    BalanceEntry,
+    ExpenseRead,
+    GroupCreate,
+    GroupRead,
+    GroupUpdate,
+    Page,
+    ReportEntry,
+    SettlementEntry,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -26,50 +44,81 @@ async def create_group(
     group: GroupCreate,
     db: AsyncSession = Depends(get_db),
     _current: UserModel = Depends(get_current_user),
-) -> GroupRead:
-    """Create a new group and persist it."""
+    idempotency: IdempotentRequest = Depends(idempotent("POST /groups/")),
+) -> Response:
+    """Create a new group and persist it.
+
+    Retries carrying the same ``Idempotency-Key`` replay the first response.
+    """
+    replay = await idempotency.replay(group)
+    if replay is not None:
+        return replay
+
     repo = SQLAlchemyGroupRepository(db)
     new_group = Group(name=group.name)
-    await repo.add(new_group)
-    return GroupRead(id=new_group.id, name=new_group.name, members=new_group.members)
+    response = idempotency.stage(GroupRead(id=new_group.id, name=new_group.name, members=new_group.members))
+    try:
+        await repo.add(new_group)
+    except IntegrityError:
+        replay = await idempotency.replay_after_conflict()
+        if replay is None:
+            raise
+        return replay
+    idempotency.committed()
+    return response
 
 
 @router.post("/{group_id}/members/{user_id}", response_model=GroupRead)
 async def add_member(
     group_id: UUID,
     user_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    uow: SQLAlchemyUnitOfWork = Depends(get_unit_of_work),
     _current: UserModel = Depends(get_current_user),
 ) -> GroupRead:
     """Add a user to a group and return the updated group."""
-    group_repo = SQLAlchemyGroupRepository(db)
-    user_repo = SQLAlchemyUserRepository(db)
-
-    if not await user_repo.get(user_id):
-        raise HTTPException(status_code=404, detail="User not found")
-    if not await group_repo.get(group_id):
-        raise HTTPException(status_code=404, detail="Group not found")
-
-    await group_repo.add_member(group_id, user_id)
-    for g in await group_repo.list_for_user(user_id):
-        if g.id == group_id:
-            return GroupRead(id=g.id, name=g.name, members=g.members)
-
-    return GroupRead(id=group_id, name="", members=[user_id])
+    try:
+        async with uow:
+            group = await uow.groups.add_member(group_id, user_id)
+            await uow.commit()
+    except UserNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="User not found") from exc
+    except GroupNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Group not found") from exc
+    return GroupRead(id=group.id, name=group.name, members=group.members)
 
 
-@router.get("/{group_id}/expenses", response_model=list[ExpenseRead])
+@router.get("/{group_id}/expenses", response_model=Page[ExpenseRead])
 async def list_group_expenses(
-    group_id: UUID, db: AsyncSession = Depends(get_db)
-) -> list[ExpenseRead]:
-    """List expenses for a group."""
+    group_id: UUID,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    from_: Optional[datetime] = Query(None, alias="from", description="Created at or after (inclusive)"),
+    to: Optional[datetime] = Query(None, description="Created before (exclusive)"),
+    payer_id: Optional[UUID] = None,
+    min_amount: Optional[float] = Query(None, ge=0),
+    max_amount: Optional[float] = Query(None, ge=0),
+    q: Optional[str] = Query(None, min_length=1, max_length=256, description="Description contains"),
+    db: AsyncSession = Depends(get_read_db),
+) -> Page[ExpenseRead]:
+    """List expenses for a group, oldest first, optionally filtered."""
     group_repo = SQLAlchemyGroupRepository(db)
-    if not await group_repo.get(group_id):
+    if not await group_repo.existing_ids({group_id}):
         raise HTTPException(status_code=404, detail="Group not found")
 
+    filters = ExpenseFilter(
+        since=from_,
+        until=to,
+        payer_id=payer_id,
+        min_amount=round(min_amount * 100) if min_amount is not None else None,
+        max_amount=round(max_amount * 100) if max_amount is not None else None,
+        text=q,
+    )
     expense_repo = SQLAlchemyExpenseRepository(db)
-    expenses = await expense_repo.list_for_group(group_id)
-    return [
+    expenses = await expense_repo.list_for_group(
+        group_id, limit=limit + 1, after=decode_time_id_cursor(cursor), filters=filters
+    )
+    page = paginate(expenses, limit, lambda e: (e.created_at, e.id))
+    page["items"] = [
         ExpenseRead(
             id=e.id,
             group_id=e.group_id,
@@ -78,21 +127,70 @@ async def list_group_expenses(
             created_at=e.created_at,
             description=e.description,
         )
-        for e in expenses
+        for e in page["items"]
     ]
+    return page
 
 
-@router.get("/", response_model=list[GroupRead])
+_EXPORT_FIELDS = ["id", "group_id", "payer_id", "amount", "created_at", "description"]
+_EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+async def _export_rows(
+    expense_repo: SQLAlchemyExpenseRepository, group_id: UUID, format: str
+) -> AsyncIterator[str]:
+    if format == "csv":
+        yield ",".join(_EXPORT_FIELDS) + "\r\n"
+    async for batch in expense_repo.stream_for_group(group_id):
+        rows = [ExpenseRead.model_validate(e) for e in batch]
+        if format == "csv":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            for r in rows:
+                writer.writerow(r.model_dump(mode="json")[f] for f in _EXPORT_FIELDS)
+            yield buf.getvalue()
+        else:
+            yield "".join(r.model_dump_json() + "\n" for r in rows)
+
+
+@router.get("/{group_id}/expenses/export")
+async def export_group_expenses(
+    group_id: UUID,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    db: AsyncSession = Depends(get_read_db),
+) -> StreamingResponse:
+    """Stream all of a group's expenses as NDJSON or CSV, oldest first."""
+    group_repo = SQLAlchemyGroupRepository(db)
+    if not await group_repo.existing_ids({group_id}):
+        raise HTTPException(status_code=404, detail="Group not found")
+
+    return StreamingResponse(
+        _export_rows(SQLAlchemyExpenseRepository(db), group_id, format),
+        media_type=_EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="expenses-{group_id}.{format}"'},
+    )
+
+
+@router.get("/", response_model=Page[GroupRead])
 async def list_groups(
-    db: AsyncSession = Depends(get_db), user: UserModel = Depends(get_current_user)
-) -> list[GroupRead]:
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    user: UserModel = Depends(get_current_user),
+) -> Page[GroupRead]:
     repo = SQLAlchemyGroupRepository(db)
-    groups = await repo.list_all() if user.is_admin else await repo.list_for_user(user.id)
-    return [GroupRead(id=g.id, name=g.name, members=g.members) for g in groups]
+    after = decode_id_cursor(cursor)
+    if user.is_admin:
+        groups = await repo.list_all(limit=limit + 1, after=after)
+    else:
+        groups = await repo.list_for_user(user.id, limit=limit + 1, after=after)
+    page = paginate(groups, limit, lambda g: (g.id,))
+    page["items"] = [GroupRead(id=g.id, name=g.name, members=g.members) for g in page["items"]]
+    return page
 
 
 @router.get("/{group_id}", response_model=GroupRead)
-async def get_group(group_id: UUID, db: AsyncSession = Depends(get_db)) -> GroupRead:
+async def get_group(group_id: UUID, db: AsyncSession = Depends(get_read_db)) -> GroupRead:
     repo = SQLAlchemyGroupRepository(db)
     group = await repo.get(group_id)
     if not group:
@@ -107,29 +205,15 @@ async def update_group(
     db: AsyncSession = Depends(get_db),
     _current: UserModel = Depends(get_current_user),
 ) -> GroupRead:
-    repo = SQLAlchemyGroupRepository(db)
-    if not await repo.get(group_id):
-        raise HTTPException(status_code=404, detail="Group not found")
-
-    await repo.update_name(group_id, payload.name)
-    updated = await repo.get(group_id)
-
+    updated = await SQLAlchemyGroupRepository(db).update_name(group_id, payload.name)
     if updated is None:
-        logger.error(
-            f"Failed to update group {group_id}.",
-            exc_info=True,
-            extra={"group_id": str(group_id)},
-        )
-        raise HTTPException(status_code=422, detail="Failed to update profile")
-
+        raise HTTPException(status_code=404, detail="Group not found")
     return GroupRead(id=updated.id, name=updated.name, members=updated.members)
 
 
-@router.get("/{group_id}/balances", response_model=list[BalanceEntry])
-async def get_group_balances(
-    group_id: UUID, db: AsyncSession = Depends(get_db)
-) -> list[BalanceEntry]:
-    """Retrieve balance information for a group."""
+async def _load_group_balances(
+    group_id: UUID, db: AsyncSession, as_of: Optional[datetime] = None
+) -> Dict[UUID, float]:
     group_repo = SQLAlchemyGroupRepository(db)
     expense_repo = SQLAlchemyExpenseRepository(db)
 
@@ -138,9 +222,48 @@ async def get_group_balances(
         raise HTTPException(status_code=404, detail="Group not found")
 
     if not group.members:
-        return []
+        return {}
 
-    expenses = await expense_repo.list_for_group(group_id)
-    balances = calculate_group_balances(group.members, expenses)
+    if as_of is None:
+        paid = await expense_repo.paid_totals(group_id)
+    else:
+        paid = await expense_repo.paid_totals_as_of(group_id, as_of)
+    return calculate_balances_from_totals(group.members, paid)
 
+
+@router.get("/{group_id}/balances", response_model=list[BalanceEntry])
+async def get_group_balances(
+    group_id: UUID,
+    as_of: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db),
+) -> list[BalanceEntry]:
+    """Retrieve balance information for a group, optionally as of a past time.
+
+    Point-in-time balances split past expenses across the group's current members.
+    """
+    balances = await _load_group_balances(group_id, db, as_of)
     return [{"user_id": uid, "balance": round(bal, 2)} for uid, bal in balances.items()]
+
+
+@router.get("/{group_id}/settlements", response_model=list[SettlementEntry])
+async def get_group_settlements(
+    group_id: UUID, db: AsyncSession = Depends(get_read_db)
+) -> list[SettlementEntry]:
+    """Suggest who pays whom so that every member's balance is settled."""
+    balances = await _load_group_balances(group_id, db)
+    return [SettlementEntry.model_validate(s) for s in plan_settlements(balances)]
+
+
+@router.get("/{group_id}/reports", response_model=list[ReportEntry])
+async def get_group_report(
+    group_id: UUID,
+    granularity: Literal["day", "month"] = "month",
+    db: AsyncSession = Depends(get_read_db),
+) -> list[ReportEntry]:
+    """Spend per payer per UTC day or month, served from the expense rollups."""
+    group_repo = SQLAlchemyGroupRepository(db)
+    if not await group_repo.existing_ids({group_id}):
+        raise HTTPException(status_code=404, detail="Group not found")
+
+    buckets = await SQLAlchemyExpenseRepository(db).spend_report(group_id, granularity)
+    return [ReportEntry.model_validate(b) for b in buckets]
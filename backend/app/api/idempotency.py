@@ -0,0 +1,148 @@
+"""``Idempotency-Key`` support for create endpoints.
+
+A client may send ``Idempotency-Key`` with a POST. The first response for a
+(user, key) pair is stored in ``idempotency_keys`` in the same transaction as
+the write, and retries replay it without touching the resource tables. An
+in-process LRU answers repeated retries without a database round trip. Its
+entries expire ``IDEMPOTENCY_KEY_TTL_HOURS`` after the record was created, when
+``purge-idempotency-keys`` would delete the stored row.
+"""
+
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional, Tuple
+from uuid import UUID
+
+from fastapi import Depends, Header, HTTPException
+from fastapi.responses import Response
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..domain.models import IdempotencyRecord, User as UserModel
+from ..infrastructure.constants import IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_KEY_TTL_HOURS
+from ..infrastructure.database import get_db
+from ..infrastructure.repositories import SQLAlchemyIdempotencyRepository
+from ..infrastructure.security import get_current_user
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class _ResponseCache:
+    """Bounded LRU of committed idempotency records keyed by (user_id, key), expiring ``ttl`` after creation."""
+
+    def __init__(self, maxsize: int, ttl: timedelta) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[UUID, str], IdempotencyRecord]" = OrderedDict()
+
+    def _expired(self, record: IdempotencyRecord) -> bool:
+        return record.created_at + self.ttl <= datetime.now(timezone.utc)
+
+    def get(self, user_id: UUID, key: str) -> Optional[IdempotencyRecord]:
+        record = self._entries.get((user_id, key))
+        if record is None:
+            return None
+        if self._expired(record):
+            del self._entries[(user_id, key)]
+            return None
+        self._entries.move_to_end((user_id, key))
+        return record
+
+    def put(self, record: IdempotencyRecord) -> None:
+        if self.maxsize <= 0 or self._expired(record):
+            return
+        self._entries[(record.user_id, record.key)] = record
+        self._entries.move_to_end((record.user_id, record.key))
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+response_cache = _ResponseCache(IDEMPOTENCY_CACHE_SIZE, timedelta(hours=IDEMPOTENCY_KEY_TTL_HOURS))
+
+
+def _json_response(body: str, status_code: int, replayed: bool = False) -> Response:
+    headers = {REPLAYED_HEADER: "true"} if replayed else None
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+class IdempotentRequest:
+    """Idempotency handling for one create request.
+
+    Call :meth:`replay` before doing any work, :meth:`stage` before the
+    write commits, and :meth:`committed` once it has. Without a key every
+    step is a pass-through.
+    """
+
+    def __init__(self, db: AsyncSession, user_id: UUID, key: Optional[str], endpoint: str) -> None:
+        self.repo = SQLAlchemyIdempotencyRepository(db)
+        self.db = db
+        self.user_id = user_id
+        self.key = key
+        self.endpoint = endpoint
+        self.request_hash = ""
+        self._record: Optional[IdempotencyRecord] = None
+
+    async def replay(self, payload: BaseModel) -> Optional[Response]:
+        """Return the stored response for this key, or ``None`` if it is new."""
+        if self.key is None:
+            return None
+        digest = hashlib.sha256(self.endpoint.encode())
+        digest.update(payload.model_dump_json().encode())
+        self.request_hash = digest.hexdigest()
+        return await self._lookup()
+
+    async def _lookup(self) -> Optional[Response]:
+        record = response_cache.get(self.user_id, self.key)
+        if record is None:
+            record = await self.repo.get(self.user_id, self.key)
+            if record is None:
+                return None
+            response_cache.put(record)
+        if record.request_hash != self.request_hash:
+            raise HTTPException(
+                status_code=422, detail=f"{IDEMPOTENCY_HEADER} was already used for a different request"
+            )
+        return _json_response(record.response_body, record.status_code, replayed=True)
+
+    def stage(self, response: BaseModel, status_code: int = 200) -> Response:
+        """Record ``response`` in the pending transaction and return it as a ``Response``."""
+        body = response.model_dump_json()
+        if self.key is not None:
+            self._record = IdempotencyRecord(
+                user_id=self.user_id,
+                key=self.key,
+                request_hash=self.request_hash,
+                status_code=status_code,
+                response_body=body,
+            )
+            self.repo.stage(self._record)
+        return _json_response(body, status_code)
+
+    def committed(self) -> None:
+        if self._record is not None:
+            response_cache.put(self._record)
+
+    async def replay_after_conflict(self) -> Optional[Response]:
+        """Roll back a write that lost a race with a concurrent retry and replay the winner."""
+        if self.key is None:
+            return None
+        await self.db.rollback()
+        return await self._lookup()
+
+
+def idempotent(endpoint: str) -> Callable[..., IdempotentRequest]:
+    """Build a dependency providing an :class:`IdempotentRequest` for ``endpoint``."""
+
+    async def dependency(
+        idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, min_length=1, max_length=255),
+        db: AsyncSession = Depends(get_db),
+        current: UserModel = Depends(get_current_user),
+    ) -> IdempotentRequest:
+        return IdempotentRequest(db, current.id, idempotency_key, endpoint)
+
+    return dependency
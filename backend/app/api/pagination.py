@@ -0,0 +1,66 @@
+"""Opaque keyset cursors for list endpoints.
+
+A cursor encodes the sort key of the last item on a page; repositories seek
+past it with a ``WHERE key > cursor`` predicate instead of ``OFFSET``.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence, Tuple, TypeVar
+from uuid import UUID
+
+from fastapi import HTTPException
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+T = TypeVar("T")
+
+
+def encode_cursor(*values: Any) -> str:
+    parts = [v.isoformat() if isinstance(v, datetime) else str(v) for v in values]
+    raw = json.dumps(parts, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor: str, size: int) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        parts = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # encode_cursor only writes strings; anything else would fail in UUID() or fromisoformat()
+    if not isinstance(parts, list) or len(parts) != size or not all(isinstance(p, str) for p in parts):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return parts
+
+
+def decode_id_cursor(cursor: Optional[str]) -> Optional[UUID]:
+    """Decode a cursor for listings ordered by ``id``."""
+    if cursor is None:
+        return None
+    (value,) = _decode(cursor, 1)
+    try:
+        return UUID(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def decode_time_id_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, UUID]]:
+    """Decode a cursor for listings ordered by ``(created_at, id)``."""
+    if cursor is None:
+        return None
+    created_at, value = _decode(cursor, 2)
+    try:
+        return datetime.fromisoformat(created_at), UUID(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(rows: Sequence[T], limit: int, key: Callable[[T], tuple]) -> dict:
+    """Build a page from ``limit + 1`` rows fetched by a seek query."""
+    items = list(rows[:limit])
+    next_cursor = encode_cursor(*key(items[-1])) if len(rows) > limit else None
+    return {"items": items, "limit": limit, "next_cursor": next_cursor}
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Generic, Optional, TypeVar
 from uuid import UUID
 
 from pydantic import (
@@ -15,6 +15,8 @@ from pydantic import (
     field_validator,
 )
 
+T = TypeVar("T")
+
 
 # Base configuration for schemas that map from ORM models
 class BaseOrmModel(BaseModel):
@@ -51,6 +53,12 @@ class UserRead(UserBase, BaseOrmModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserUpdated(UserRead):
+    # Updating the profile revokes earlier tokens, so the caller gets a fresh one
+    access_token: str
+    token_type: str = "bearer"
+
+
 class GroupBase(BaseModel):
     name: constr(min_length=1, max_length=255)
 
@@ -79,6 +87,17 @@ class ExpenseCreate(ExpenseBase):
     pass
 
 
+class BulkExpenseError(BaseModel):
+    index: int
+    detail: str
+
+
+class BulkExpenseResult(BaseModel):
+    created: int
+    ids: list[UUID] = Field(default_factory=list)
+    errors: list[BulkExpenseError] = Field(default_factory=list)
+
+
 class ExpenseRead(ExpenseBase, BaseOrmModel):
     id: UUID
     amount: float = Field(...)
@@ -111,3 +130,51 @@ class BalanceEntry(BaseOrmModel):
         return float(v)
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class GroupBalanceEntry(BaseModel):
+    group_id: UUID
+    balance: float
+
+
+class UserBalances(BaseModel):
+    user_id: UUID
+    balance: float
+    groups: list[GroupBalanceEntry] = Field(default_factory=list)
+
+
+class SettlementEntry(BaseOrmModel):
+    from_user_id: UUID
+    to_user_id: UUID
+    amount: float = Field(...)
+
+    @field_validator("amount", mode="before")
+    @classmethod
+    def convert_cents_to_dollars(cls, v: int | float) -> float:
+        if isinstance(v, int):
+            return float(v) / 100.0
+        return float(v)
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ReportEntry(BaseOrmModel):
+    period: date
+    payer_id: UUID
+    amount: float = Field(...)
+    count: int
+
+    @field_validator("amount", mode="before")
+    @classmethod
+    def convert_cents_to_dollars(cls, v: int | float) -> float:
+        if isinstance(v, int):
+            return float(v) / 100.0
+        return float(v)
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    limit: int
+    next_cursor: Optional[str] = None
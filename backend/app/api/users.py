@@ -1,17 +1,26 @@
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..domain.exceptions import UserExistsError
 from ..domain.models import User
+from ..domain.services import calculate_member_balance
 from ..infrastructure.constants import DEFAULT_GROUP_ID
-from ..infrastructure.database import get_db
+from ..infrastructure.database import get_db, get_read_db
 from ..infrastructure.orm import UserORM
-from ..infrastructure.repositories import SQLAlchemyGroupRepository, SQLAlchemyUserRepository
-from ..infrastructure.security import get_current_user
-from .schemas import GroupRead, UserCreate, UserRead, UserUpdate, PasswordChange
+from ..infrastructure.repositories import (
+    SQLAlchemyExpenseRepository,
+    SQLAlchemyGroupRepository,
+    SQLAlchemyUserRepository,
+)
+from ..infrastructure.security import create_access_token, get_current_user, token_versions
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_id_cursor, paginate
+from .schemas import (
+    GroupBalanceEntry, GroupRead, Page, UserBalances, UserCreate, UserRead, UserUpdate, UserUpdated, PasswordChange,
+)
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -37,21 +46,38 @@ async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)) -> U
 
 
 @router.get("/{user_id}/groups", response_model=list[GroupRead])
-async def list_user_groups(user_id: UUID, db: AsyncSession = Depends(get_db)) -> list[GroupRead]:
+async def list_user_groups(user_id: UUID, db: AsyncSession = Depends(get_read_db)) -> list[GroupRead]:
     """List groups a user belongs to."""
     group_repo = SQLAlchemyGroupRepository(db)
     groups = await group_repo.list_for_user(user_id)
     return [GroupRead(id=g.id, name=g.name, members=g.members) for g in groups]
 
 
-@router.get("/", response_model=list[UserRead])
-async def list_users(db: AsyncSession = Depends(get_db)) -> list[UserRead]:
+@router.get("/{user_id}/balances", response_model=UserBalances)
+async def get_user_balances(user_id: UUID, db: AsyncSession = Depends(get_read_db)) -> UserBalances:
+    """Net balance of a user in each of their groups and overall."""
+    totals = await SQLAlchemyExpenseRepository(db).totals_for_member(user_id)
+    balances = [(t.group_id, calculate_member_balance(t)) for t in totals]
+    return UserBalances(
+        user_id=user_id,
+        balance=round(sum(bal for _, bal in balances), 2),
+        groups=[GroupBalanceEntry(group_id=gid, balance=round(bal, 2)) for gid, bal in balances],
+    )
+
+
+@router.get("/", response_model=Page[UserRead])
+async def list_users(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+) -> Page[UserRead]:
     repo = SQLAlchemyUserRepository(db)
-    return await repo.list_all()
+    rows = await repo.list_all(limit=limit + 1, after=decode_id_cursor(cursor))
+    return paginate(rows, limit, lambda u: (u.id,))
 
 
 @router.get("/{user_id}", response_model=UserRead)
-async def get_user(user_id: UUID, db: AsyncSession = Depends(get_db)) -> UserRead:
+async def get_user(user_id: UUID, db: AsyncSession = Depends(get_read_db)) -> UserRead:
     repo = SQLAlchemyUserRepository(db)
     user = await repo.get(user_id)
     if not user:
@@ -59,13 +85,13 @@ async def get_user(user_id: UUID, db: AsyncSession = Depends(get_db)) -> UserRea
     return user
 
 
-@router.patch("/{user_id}", response_model=UserRead)
+@router.patch("/{user_id}", response_model=UserUpdated)
 async def update_user(
     user_id: UUID,
     payload: UserUpdate,
     db: AsyncSession = Depends(get_db),
     current: User = Depends(get_current_user),
-) -> UserRead:
+) -> UserUpdated:
     if user_id != current.id:
         raise HTTPException(status_code=403, detail="Forbidden")
 
@@ -77,6 +103,8 @@ async def update_user(
         row.email = payload.email
     if payload.name is not None:
         row.name = payload.name
+    # Tokens carry the profile as claims, so outstanding ones are now stale
+    row.token_version = UserORM.token_version + 1
 
     try:
         await db.commit()
@@ -84,8 +112,11 @@ async def update_user(
     except IntegrityError:
         await db.rollback()
         raise HTTPException(status_code=409, detail="Email already exists")
+    token_versions.discard(user_id)
 
-    return row
+    user = User(id=row.id, email=row.email, name=row.name, is_admin=row.is_admin)
+    token = create_access_token(user, token_version=row.token_version)
+    return UserUpdated(id=row.id, email=row.email, name=row.name, is_admin=row.is_admin, access_token=token)
 
 
 @router.post("/{user_id}/password", status_code=204)
@@ -119,5 +150,8 @@ async def change_password(
 
     # Hash and store new password
     row.password_hash = await hash_password(payload.new_password)
+    # Revoke every token issued with the old password
+    row.token_version = UserORM.token_version + 1
     await db.commit()
+    token_versions.discard(user_id)
     return None
@@ -0,0 +1,220 @@
+"""Operational maintenance commands.
+
+Run from the ``backend`` directory, e.g.::
+
+    python -m app.cli rebuild-balances [--group-id UUID]
+    python -m app.cli check-balances [--group-id UUID]
+    python -m app.cli checkpoint-balances [--group-id UUID] [--interval-days N] [--full]
+    python -m app.cli rebuild-rollups [--group-id UUID]
+    python -m app.cli purge-idempotency-keys [--older-than-hours N]
+    python -m app.cli create-expense-partitions [--months-ahead N]
+    python -m app.cli archive-expenses --before YYYY-MM-DD [--group-id UUID] [--archive-dir DIR]
+"""
+
+import argparse
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Optional
+from uuid import UUID
+
+from .domain.services import calculate_balances_from_payer_totals, calculate_balances_from_totals
+from .infrastructure.constants import (
+    BALANCE_CHECKPOINT_INTERVAL_DAYS,
+    EXPENSE_ARCHIVE_DIR,
+    EXPENSE_PARTITION_MONTHS_AHEAD,
+    IDEMPOTENCY_KEY_TTL_HOURS,
+)
+from .infrastructure.database import async_session_maker, engine
+from .infrastructure.partitions import ensure_expense_partitions
+from .infrastructure.repositories import (
+    SQLAlchemyExpenseRepository,
+    SQLAlchemyGroupRepository,
+    SQLAlchemyIdempotencyRepository,
+)
+
+
+async def rebuild_balances(group_id: Optional[UUID] = None) -> int:
+    async with async_session_maker() as db:
+        return await SQLAlchemyExpenseRepository(db).rebuild_balances(group_id)
+
+
+async def check_balances(group_id: Optional[UUID] = None) -> List[UUID]:
+    """Return the ids of groups whose ledger disagrees with their expenses."""
+    async with async_session_maker() as db:
+        group_repo = SQLAlchemyGroupRepository(db)
+        expense_repo = SQLAlchemyExpenseRepository(db)
+        groups = [await group_repo.get(group_id)] if group_id else await group_repo.list_all()
+
+        drifted: List[UUID] = []
+        for group in filter(None, groups):
+            expected = calculate_balances_from_payer_totals(
+                group.members, await expense_repo.sum_by_payer(group.id)
+            )
+            actual = calculate_balances_from_totals(
+                group.members, await expense_repo.paid_totals(group.id)
+            )
+            if any(round(expected[mid], 2) != round(actual[mid], 2) for mid in group.members):
+                drifted.append(group.id)
+        return drifted
+
+
+async def checkpoint_balances(
+    interval: timedelta, group_id: Optional[UUID] = None, full: bool = False
+) -> int:
+    async with async_session_maker() as db:
+        return await SQLAlchemyExpenseRepository(db).write_checkpoints(interval, group_id, full)
+
+
+async def rebuild_rollups(group_id: Optional[UUID] = None) -> int:
+    async with async_session_maker() as db:
+        return await SQLAlchemyExpenseRepository(db).rebuild_rollups(group_id)
+
+
+async def purge_idempotency_keys(older_than: timedelta) -> int:
+    async with async_session_maker() as db:
+        return await SQLAlchemyIdempotencyRepository(db).purge(datetime.now(timezone.utc) - older_than)
+
+
+async def create_expense_partitions(months_ahead: int) -> List[str]:
+    async with engine.begin() as conn:
+        return await conn.run_sync(ensure_expense_partitions, months_ahead)
+
+
+async def archive_expenses(before: date, archive_dir: Path, group_id: Optional[UUID] = None) -> int:
+    async with async_session_maker() as db:
+        return await SQLAlchemyExpenseRepository(db).archive_expenses(before, archive_dir, group_id)
+
+
+def _rebuild_balances(args: argparse.Namespace) -> int:
+    count = asyncio.run(rebuild_balances(args.group_id))
+    print(f"Rebuilt {count} group balance rows")
+    return 0
+
+
+def _check_balances(args: argparse.Namespace) -> int:
+    drifted = asyncio.run(check_balances(args.group_id))
+    for gid in drifted:
+        print(f"Ledger out of date for group {gid}")
+    return 1 if drifted else 0
+
+
+def _checkpoint_balances(args: argparse.Namespace) -> int:
+    interval = timedelta(days=args.interval_days)
+    count = asyncio.run(checkpoint_balances(interval, args.group_id, args.full))
+    print(f"Wrote {count} balance checkpoint rows")
+    return 0
+
+
+def _rebuild_rollups(args: argparse.Namespace) -> int:
+    count = asyncio.run(rebuild_rollups(args.group_id))
+    print(f"Rebuilt {count} expense rollup rows")
+    return 0
+
+
+def _purge_idempotency_keys(args: argparse.Namespace) -> int:
+    count = asyncio.run(purge_idempotency_keys(timedelta(hours=args.older_than_hours)))
+    print(f"Purged {count} idempotency keys")
+    return 0
+
+
+def _create_expense_partitions(args: argparse.Namespace) -> int:
+    if engine.dialect.name != "postgresql":
+        print("expenses is only partitioned on PostgreSQL; nothing to do")
+        return 0
+    created = asyncio.run(create_expense_partitions(args.months_ahead))
+    for name in created:
+        print(f"Created partition {name}")
+    print(f"Created {len(created)} expense partitions")
+    return 0
+
+
+def _archive_expenses(args: argparse.Namespace) -> int:
+    # Bring checkpoints up to date so they cover everything being archived
+    asyncio.run(checkpoint_balances(timedelta(days=BALANCE_CHECKPOINT_INTERVAL_DAYS)))
+    try:
+        count = asyncio.run(archive_expenses(args.before, Path(args.archive_dir), args.group_id))
+    except ValueError as exc:
+        print(exc)
+        return 1
+    print(f"Archived {count} expenses to {args.archive_dir}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser(
+        "rebuild-balances", help="Rebuild the group_balances ledger from expenses"
+    )
+    rebuild.add_argument("--group-id", type=UUID, default=None, help="Only rebuild this group")
+    rebuild.set_defaults(func=_rebuild_balances)
+
+    check = commands.add_parser(
+        "check-balances", help="Compare the group_balances ledger against expense aggregates"
+    )
+    check.add_argument("--group-id", type=UUID, default=None, help="Only check this group")
+    check.set_defaults(func=_check_balances)
+
+    checkpoint = commands.add_parser(
+        "checkpoint-balances", help="Write periodic balance checkpoints for point-in-time queries"
+    )
+    checkpoint.add_argument("--group-id", type=UUID, default=None, help="Only checkpoint this group")
+    checkpoint.add_argument(
+        "--interval-days",
+        type=int,
+        default=BALANCE_CHECKPOINT_INTERVAL_DAYS,
+        help="Days between checkpoints (default: BALANCE_CHECKPOINT_INTERVAL_DAYS)",
+    )
+    checkpoint.add_argument(
+        "--full", action="store_true", help="Discard existing checkpoints and rebuild from scratch"
+    )
+    checkpoint.set_defaults(func=_checkpoint_balances)
+
+    rollups = commands.add_parser(
+        "rebuild-rollups", help="Rebuild the expense_rollups report table from expenses"
+    )
+    rollups.add_argument("--group-id", type=UUID, default=None, help="Only rebuild this group")
+    rollups.set_defaults(func=_rebuild_rollups)
+
+    purge = commands.add_parser(
+        "purge-idempotency-keys", help="Delete stored Idempotency-Key responses past their retention"
+    )
+    purge.add_argument(
+        "--older-than-hours",
+        type=int,
+        default=IDEMPOTENCY_KEY_TTL_HOURS,
+        help="Retention in hours (default: IDEMPOTENCY_KEY_TTL_HOURS)",
+    )
+    purge.set_defaults(func=_purge_idempotency_keys)
+
+    partitions = commands.add_parser(
+        "create-expense-partitions", help="Create monthly expenses partitions ahead of time (PostgreSQL)"
+    )
+    partitions.add_argument(
+        "--months-ahead",
+        type=int,
+        default=EXPENSE_PARTITION_MONTHS_AHEAD,
+        help="Months after the current one to cover (default: EXPENSE_PARTITION_MONTHS_AHEAD)",
+    )
+    partitions.set_defaults(func=_create_expense_partitions)
+
+    archive = commands.add_parser(
+        "archive-expenses", help="Move old expenses into compressed segment files with carry-forward totals"
+    )
+    archive.add_argument(
+        "--before", type=date.fromisoformat, required=True, help="Archive expenses created before this UTC date"
+    )
+    archive.add_argument("--group-id", type=UUID, default=None, help="Only archive this group")
+    archive.add_argument(
+        "--archive-dir", default=EXPENSE_ARCHIVE_DIR, help="Segment directory (default: EXPENSE_ARCHIVE_DIR)"
+    )
+    archive.set_defaults(func=_archive_expenses)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
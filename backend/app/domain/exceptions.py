@@ -1,2 +1,18 @@
 class UserExistsError(Exception):
     pass
+
+
+class GroupNotFoundError(Exception):
+    pass
+
+
+class UserNotFoundError(Exception):
+    pass
+
+
+class PayerNotFoundError(Exception):
+    pass
+
+
+class NotGroupMemberError(Exception):
+    pass
@@ -1,4 +1,4 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from typing import List, Optional
 from uuid import UUID, uuid4
 
@@ -11,6 +11,8 @@ class User(BaseModel):
     name: str
     is_admin: bool = False
     password_hash: Optional[str] = None
+    # Current users.token_version, for issuing tokens; never serialized
+    token_version: int = Field(default=0, exclude=True)
 
 
 class Group(BaseModel):
@@ -26,3 +28,64 @@ class Expense(BaseModel):
     amount: int
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     description: Optional[str] = None
+
+
+class ExpenseFilter(BaseModel):
+    """Optional constraints for expense listings; amounts are in cents.
+
+    ``since`` is inclusive and ``until`` exclusive. ``text`` matches a
+    case-insensitive substring of the description.
+    """
+
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    payer_id: Optional[UUID] = None
+    min_amount: Optional[int] = None
+    max_amount: Optional[int] = None
+    text: Optional[str] = None
+
+
+class PayerTotal(BaseModel):
+    """Per-payer expense aggregate for a group; amounts are in cents."""
+
+    payer_id: UUID
+    amount: int
+    credited: int
+    count: int
+
+
+class Settlement(BaseModel):
+    """A transfer that settles part of a group's debts; amount is in cents."""
+
+    from_user_id: UUID
+    to_user_id: UUID
+    amount: int
+
+
+class MemberGroupTotal(BaseModel):
+    """A member's credits alongside their group's aggregates; amounts are in cents."""
+
+    group_id: UUID
+    member_count: int
+    group_credited: int
+    member_credited: int
+
+
+class SpendBucket(BaseModel):
+    """A payer's spend in a group over one report period; amount is in cents."""
+
+    period: date
+    payer_id: UUID
+    amount: int
+    count: int
+
+
+class IdempotencyRecord(BaseModel):
+    """The response first returned for an idempotency key, replayed on retries."""
+
+    user_id: UUID
+    key: str
+    request_hash: str
+    status_code: int
+    response_body: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -7,8 +7,8 @@ from .models import Expense, Group, User
 
 class UserRepository(ABC):
     @abstractmethod
-    async def add(self, user: User) -> None:
-        """Persist a new user."""
+    async def add(self, user: User) -> User:
+        """Persist a new user and return it as stored."""
 
     @abstractmethod
     async def get(self, user_id: UUID) -> Optional[User]:
@@ -17,12 +17,12 @@ class UserRepository(ABC):
 
 class GroupRepository(ABC):
     @abstractmethod
-    async def add(self, group: Group) -> None:
-        """Persist a new group."""
+    async def add(self, group: Group) -> Group:
+        """Persist a new group and return it as stored."""
 
     @abstractmethod
-    async def add_member(self, group_id: UUID, user_id: UUID) -> None:
-        """Add a member to a group."""
+    async def add_member(self, group_id: UUID, user_id: UUID) -> Group:
+        """Add a member to a group and return the updated group."""
 
     @abstractmethod
     async def list_for_user(self, user_id: UUID) -> Iterable[Group]:
@@ -31,14 +31,14 @@ class GroupRepository(ABC):
     # Optional extras
     async def update_name(
         self, _group_id: UUID, _name: str
-    ) -> None:  # pragma: no cover - optional in interface
+    ) -> Optional[Group]:  # pragma: no cover - optional in interface
         raise NotImplementedError
 
 
 class ExpenseRepository(ABC):
     @abstractmethod
-    async def add(self, expense: Expense) -> None:
-        """Persist a new expense."""
+    async def add(self, expense: Expense) -> Expense:
+        """Persist a new expense and return it as stored."""
 
     @abstractmethod
     async def list_for_group(self, group_id: UUID) -> Iterable[Expense]:
@@ -1,8 +1,9 @@
 from math import floor
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Mapping, Optional
 from uuid import UUID
 
-from ..models import Expense
+from ..models import Expense, MemberGroupTotal, PayerTotal
+from .settlement_service import plan_settlements
 from .user_service import build_user_service, create_user_and_add_to_group
 
 
@@ -23,7 +24,9 @@ def summarize_balances(expenses: Iterable[Expense]) -> Dict[str, float]:
 
 
 def calculate_group_balances(
-    member_ids: List[UUID], expenses: Iterable[Expense]
+    member_ids: List[UUID],
+    expenses: Iterable[Expense],
+    carry_forward: Optional[Mapping[UUID, int]] = None,
 ) -> Dict[UUID, float]:
     """Calculate per-member balance using equal-split accounting.
 
@@ -33,23 +36,94 @@ def calculate_group_balances(
 
     Amounts are stored as integer cents, and the calculation normalises to
     dollars before returning, matching the API's ``BalanceEntry`` schema.
+
+    Members are mapped to dense indexes so credits accumulate in a flat list
+    and the equal-split debit is applied once per member: O(expenses + members).
+
+    ``carry_forward`` holds payer credits in cents for archived expenses (see
+    ``SQLAlchemyExpenseRepository.archived_credits``), so only expenses after
+    the archive cutoff need to be passed.
     """
     n = len(member_ids)
-    balances: Dict[UUID, float] = {mid: 0.0 for mid in member_ids}
+    index = {mid: i for i, mid in enumerate(member_ids)}
+    paid = [0] * n
+    total = 0
+
+    for payer_id, cents in (carry_forward or {}).items():
+        credit = cents // 100
+        total += credit
+        i = index.get(payer_id)
+        if i is not None:
+            paid[i] += credit
 
     for e in expenses:
-        share = floor(float(e.amount) / 100) / n if n else 0.0
-        for mid in member_ids:
-            balances[mid] -= share
-        if e.payer_id in balances:
-            balances[e.payer_id] += floor(e.amount / 100)
+        credit = floor(e.amount / 100)
+        total += credit
+        i = index.get(e.payer_id)
+        if i is not None:
+            paid[i] += credit
+
+    share = total / n if n else 0.0
+    balances: Dict[UUID, float] = {mid: float(paid[index[mid]]) for mid in member_ids}
+    for mid in member_ids:
+        balances[mid] -= share
 
     return balances
 
 
+def payer_credit_cents(amount: int) -> int:
+    """Return the credit, in cents, a payer receives for an expense.
+
+    Mirrors ``calculate_group_balances``: the payer is credited the whole-dollar
+    part of the amount only.
+    """
+    return floor(amount / 100) * 100
+
+
+def calculate_balances_from_totals(
+    member_ids: List[UUID], paid_cents: Mapping[UUID, int]
+) -> Dict[UUID, float]:
+    """Calculate per-member balance from pre-aggregated payer credits.
+
+    ``paid_cents`` maps each payer to the sum of ``payer_credit_cents`` over the
+    group's expenses.  The result matches ``calculate_group_balances`` for the
+    same members and expenses, but costs O(members + payers) instead of
+    O(expenses x members).
+    """
+    n = len(member_ids)
+    if not n:
+        return {}
+
+    share = sum(paid_cents.values()) / 100 / n
+    return {mid: paid_cents.get(mid, 0) / 100 - share for mid in member_ids}
+
+
+def calculate_member_balance(total: MemberGroupTotal) -> float:
+    """Calculate one member's balance in a group from pre-aggregated credits.
+
+    Uses the same arithmetic as ``calculate_balances_from_totals``.
+    """
+    if not total.member_count:
+        return 0.0
+    share = total.group_credited / 100 / total.member_count
+    return total.member_credited / 100 - share
+
+
+def calculate_balances_from_payer_totals(
+    member_ids: List[UUID], totals: Iterable[PayerTotal]
+) -> Dict[UUID, float]:
+    """Calculate per-member balance from ``GROUP BY payer`` aggregates."""
+    return calculate_balances_from_totals(member_ids, {t.payer_id: t.credited for t in totals})
+
+
 __all__ = [
     "summarize_balances",
     "calculate_group_balances",
+    "payer_credit_cents",
+    "calculate_balances_from_totals",
+    "calculate_balances_from_payer_totals",
+    "calculate_member_balance",
+    "plan_settlements",
     "build_user_service",
     "create_user_and_add_to_group",
 ]
@@ -0,0 +1,41 @@
+import heapq
+from typing import List, Mapping, Tuple
+from uuid import UUID
+
+from ..models import Settlement
+
+
+def plan_settlements(balances: Mapping[UUID, float]) -> List[Settlement]:
+    """Return a short list of transfers that settles the given balances.
+
+    ``balances`` is the dollar-denominated output of ``calculate_group_balances``.
+    Balances are rounded to cents, then the largest debtor repeatedly pays the
+    largest creditor from two max-heaps.  Every transfer settles at least one
+    member, so the plan has at most ``members - 1`` entries and costs
+    O(members log members).  Rounding residue of a few cents is left unassigned.
+    """
+    creditors: List[Tuple[int, UUID]] = []
+    debtors: List[Tuple[int, UUID]] = []
+    for uid, balance in balances.items():
+        cents = round(balance * 100)
+        # heapq is a min-heap: store negated amounts; the id breaks ties deterministically
+        if cents > 0:
+            creditors.append((-cents, uid))
+        elif cents < 0:
+            debtors.append((cents, uid))
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+
+    plan: List[Settlement] = []
+    while creditors and debtors:
+        credit, creditor = heapq.heappop(creditors)
+        debt, debtor = heapq.heappop(debtors)
+        amount = min(-credit, -debt)
+        plan.append(Settlement(from_user_id=debtor, to_user_id=creditor, amount=amount))
+
+        if -credit > amount:
+            heapq.heappush(creditors, (credit + amount, creditor))
+        if -debt > amount:
+            heapq.heappush(debtors, (debt + amount, debtor))
+
+    return plan
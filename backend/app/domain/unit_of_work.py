@@ -0,0 +1,31 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from .repositories import ExpenseRepository, GroupRepository, UserRepository
+
+
+class UnitOfWork(ABC):
+    """Repositories sharing one transaction that is committed once.
+
+    Use as ``async with uow: ...; await uow.commit()``. Leaving the block
+    with an exception rolls back; work not committed is discarded.
+    """
+
+    users: UserRepository
+    groups: GroupRepository
+    expenses: ExpenseRepository
+
+    async def __aenter__(self) -> "UnitOfWork":
+        return self
+
+    async def __aexit__(self, exc_type, exc: Optional[BaseException], tb) -> None:
+        if exc_type is not None:
+            await self.rollback()
+
+    @abstractmethod
+    async def commit(self) -> None:
+        """Commit everything written through the repositories."""
+
+    @abstractmethod
+    async def rollback(self) -> None:
+        """Discard everything written since the last commit."""
@@ -0,0 +1,193 @@
+"""Columnar segment files for archived expenses.
+
+A segment holds one group's expenses from a single archival run, sorted by
+``(created_at, id)``. Each column is stored as a separately zlib-compressed
+block, so readers map the file with ``mmap`` and inflate only the columns they
+need; aggregating payer totals never touches ids or descriptions.
+
+Layout::
+
+    b"EXPSEG1\\n" | header length (uint32 LE) | header JSON | column blocks
+
+The header records the group, row count, the payer dictionary and each
+column's ``[offset, length]`` relative to the first block. Numeric columns are
+little-endian ``array`` buffers: payer index (``I``), amount in cents (``q``)
+and ``created_at`` as microseconds since the Unix epoch (``q``).
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from ..domain.models import Expense, PayerTotal
+from ..domain.services import payer_credit_cents
+
+MAGIC = b"EXPSEG1\n"
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_HEADER_LEN = struct.Struct("<I")
+
+
+def _to_micros(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value)
+
+
+def _pack(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def write_segment(path: Path, group_id: UUID, expenses: Sequence[Expense]) -> None:
+    """Write ``expenses`` of one group to ``path`` atomically."""
+    rows = sorted(expenses, key=lambda e: (e.created_at, e.id))
+    payers: Dict[UUID, int] = {}
+    for e in rows:
+        payers.setdefault(e.payer_id, len(payers))
+
+    columns = {
+        "id": b"".join(e.id.bytes for e in rows),
+        "payer": _pack(array("I", (payers[e.payer_id] for e in rows))),
+        "amount": _pack(array("q", (e.amount for e in rows))),
+        "created_at": _pack(array("q", (_to_micros(e.created_at) for e in rows))),
+        "description": json.dumps([e.description for e in rows]).encode(),
+    }
+    blocks: List[bytes] = []
+    offsets: Dict[str, Tuple[int, int]] = {}
+    position = 0
+    for name, raw in columns.items():
+        block = zlib.compress(raw)
+        offsets[name] = (position, len(block))
+        blocks.append(block)
+        position += len(block)
+
+    header = json.dumps(
+        {
+            "group_id": str(group_id),
+            "rows": len(rows),
+            "payers": [str(p) for p in payers],
+            "columns": offsets,
+        }
+    ).encode()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(MAGIC)
+        fh.write(_HEADER_LEN.pack(len(header)))
+        fh.write(header)
+        for block in blocks:
+            fh.write(block)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+class Segment:
+    """Read-only view of a segment file, decoding columns on demand."""
+
+    def __init__(self, path: Path) -> None:
+        with open(path, "rb") as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[: len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not an expense segment")
+        (length,) = _HEADER_LEN.unpack_from(self._map, len(MAGIC))
+        start = len(MAGIC) + _HEADER_LEN.size
+        header = json.loads(self._map[start : start + length])
+        self._data = start + length
+        self.group_id = UUID(header["group_id"])
+        self.rows: int = header["rows"]
+        self.payers = [UUID(p) for p in header["payers"]]
+        self._columns: Dict[str, Tuple[int, int]] = header["columns"]
+
+    def __enter__(self) -> "Segment":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._map.close()
+
+    def _raw(self, name: str) -> bytes:
+        offset, length = self._columns[name]
+        start = self._data + offset
+        return zlib.decompress(self._map[start : start + length])
+
+    def column(self, name: str):
+        """Decode one column: ``id`` and ``payer`` as UUIDs, ``created_at`` as datetimes."""
+        raw = self._raw(name)
+        if name == "id":
+            return [UUID(bytes=raw[i : i + 16]) for i in range(0, len(raw), 16)]
+        if name == "payer":
+            return [self.payers[i] for i in _unpack("I", raw)]
+        if name == "amount":
+            return _unpack("q", raw)
+        if name == "created_at":
+            return [_from_micros(v) for v in _unpack("q", raw)]
+        return json.loads(raw)
+
+    def expenses(self) -> List[Expense]:
+        columns = zip(
+            self.column("id"),
+            self.column("payer"),
+            self.column("amount"),
+            self.column("created_at"),
+            self.column("description"),
+        )
+        return [
+            Expense(
+                id=expense_id,
+                group_id=self.group_id,
+                payer_id=payer_id,
+                amount=amount,
+                created_at=created_at,
+                description=description,
+            )
+            for expense_id, payer_id, amount, created_at, description in columns
+        ]
+
+    def payer_totals(
+        self, since: Optional[datetime] = None, until: Optional[datetime] = None
+    ) -> List[PayerTotal]:
+        """Aggregate per payer; ``since`` is exclusive and ``until`` inclusive, like ``sum_by_payer``."""
+        lower = _to_micros(since) if since is not None else None
+        upper = _to_micros(until) if until is not None else None
+        totals: Dict[int, List[int]] = {}
+        payers = _unpack("I", self._raw("payer"))
+        amounts = _unpack("q", self._raw("amount"))
+        stamps = _unpack("q", self._raw("created_at"))
+        for payer, amount, stamp in zip(payers, amounts, stamps):
+            if (lower is not None and stamp <= lower) or (upper is not None and stamp > upper):
+                continue
+            total = totals.setdefault(payer, [0, 0, 0])
+            total[0] += amount
+            total[1] += payer_credit_cents(amount)
+            total[2] += 1
+        return [
+            PayerTotal(payer_id=self.payers[i], amount=amount, credited=credited, count=count)
+            for i, (amount, credited, count) in totals.items()
+        ]
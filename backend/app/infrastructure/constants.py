@@ -16,5 +16,47 @@ def _read_uuid(var: str, fallback: UUID) -> UUID:
     return fallback
 
 
+def _read_int(var: str, fallback: int) -> int:
+    val = os.getenv(var)
+    if val:
+        try:
+            return int(val)
+        except ValueError:
+            pass
+    return fallback
+
+
 DEFAULT_GROUP_ID: UUID = _read_uuid("DEFAULT_GROUP_ID", _DEFAULT_ID)
 DEFAULT_GROUP_NAME: str = os.getenv("DEFAULT_GROUP_NAME", "default")
+
+# Spacing of per-group balance checkpoints used by point-in-time balance queries
+BALANCE_CHECKPOINT_INTERVAL_DAYS: int = _read_int("BALANCE_CHECKPOINT_INTERVAL_DAYS", 7)
+
+# In-process LRU of replayable responses in front of the idempotency_keys table
+IDEMPOTENCY_CACHE_SIZE: int = _read_int("IDEMPOTENCY_CACHE_SIZE", 1024)
+# Age after which purge-idempotency-keys deletes stored responses and cached ones expire
+IDEMPOTENCY_KEY_TTL_HOURS: int = _read_int("IDEMPOTENCY_KEY_TTL_HOURS", 24)
+
+# Monthly expenses partitions kept ahead of the current month on Postgres
+EXPENSE_PARTITION_MONTHS_AHEAD: int = _read_int("EXPENSE_PARTITION_MONTHS_AHEAD", 3)
+
+# Directory for archived expense segment files written by archive-expenses
+EXPENSE_ARCHIVE_DIR: str = os.getenv("EXPENSE_ARCHIVE_DIR", "archive")
+
+# Per-process cache of users' token versions checked on each authenticated request;
+# a revoked token stays usable in other processes for at most the TTL
+TOKEN_VERSION_CACHE_TTL_SECONDS: int = _read_int("TOKEN_VERSION_CACHE_TTL_SECONDS", 30)
+TOKEN_VERSION_CACHE_SIZE: int = _read_int("TOKEN_VERSION_CACHE_SIZE", 10_000)
+
+# Read replicas (DATABASE_REPLICA_URLS): how often each is probed, how long a probe
+# may take, and how long a client's reads stay on the primary after it writes
+REPLICA_HEALTH_INTERVAL_SECONDS: int = _read_int("REPLICA_HEALTH_INTERVAL_SECONDS", 10)
+REPLICA_HEALTH_TIMEOUT_SECONDS: int = _read_int("REPLICA_HEALTH_TIMEOUT_SECONDS", 2)
+READ_YOUR_WRITES_SECONDS: int = _read_int("READ_YOUR_WRITES_SECONDS", 5)
+# Per-process bound on users pinned to the primary by their recent writes
+READ_YOUR_WRITES_PINNED_USERS: int = _read_int("READ_YOUR_WRITES_PINNED_USERS", 10_000)
+
+# PRAGMAs for the embedded SQLite profile (DB_ENGINE_PROFILE=sqlite)
+SQLITE_MMAP_SIZE_BYTES: int = _read_int("SQLITE_MMAP_SIZE_BYTES", 256 * 1024 * 1024)
+SQLITE_CACHE_SIZE_KIB: int = _read_int("SQLITE_CACHE_SIZE_KIB", 64 * 1024)
+SQLITE_BUSY_TIMEOUT_MS: int = _read_int("SQLITE_BUSY_TIMEOUT_MS", 5000)
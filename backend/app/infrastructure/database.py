@@ -1,9 +1,15 @@
 import os
 from typing import AsyncGenerator
 
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+from .constants import REPLICA_HEALTH_INTERVAL_SECONDS, REPLICA_HEALTH_TIMEOUT_SECONDS
+from .engine_profiles import engine_options, load_profile
+from .pool_metrics import register_engine
+from .replicas import ReplicaSet, read_session_maker, replica_urls
 from .secrets import get_secret
+from .sqlite import sqlite_engines
 
 
 def _database_url() -> str:
@@ -26,12 +32,18 @@ def _database_url() -> str:
 
 DATABASE_URL = _database_url()
 
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=True,
-    future=True,
-    pool_pre_ping=True,
-)
+# Validated here so a bad DB_ENGINE_PROFILE or pool override stops the process at import
+ENGINE_PROFILE = load_profile()
+
+if ENGINE_PROFILE.name == "sqlite":
+    # One serialized writer; GET endpoints read through a pool of query-only connections
+    engine, read_engine = sqlite_engines(DATABASE_URL, ENGINE_PROFILE)
+    register_engine("writer", engine, 1)
+    register_engine("readers", read_engine, ENGINE_PROFILE.capacity)
+else:
+    engine = create_async_engine(DATABASE_URL, **engine_options(DATABASE_URL, ENGINE_PROFILE, "primary"))
+    register_engine("primary", engine, ENGINE_PROFILE.capacity)
+    read_engine = engine
 
 async_session_maker = async_sessionmaker(
     engine,
@@ -39,9 +51,42 @@ async_session_maker = async_sessionmaker(
     autocommit=False,
     expire_on_commit=False,
 )
+# Sessions on the sqlite profile's reader pool; other profiles read from the primary
+reader_session_maker = (
+    async_sessionmaker(read_engine, autoflush=False, autocommit=False, expire_on_commit=False)
+    if read_engine is not engine
+    else None
+)
+
+
+read_replicas = ReplicaSet.from_urls(
+    replica_urls(get_secret("DATABASE_REPLICA_URLS") or get_secret("DATABASE_REPLICA_URL")),
+    health_interval=REPLICA_HEALTH_INTERVAL_SECONDS,
+    health_timeout=REPLICA_HEALTH_TIMEOUT_SECONDS,
+    engine_options=lambda url, pool_name: engine_options(url, ENGINE_PROFILE, pool_name),
+)
+for _i, _replica in enumerate(read_replicas.replicas):
+    register_engine(f"replica{_i}", _replica.engine, ENGINE_PROFILE.capacity)
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """FastAPI dependency that yields an async SQLAlchemy session."""
     async with async_session_maker() as session:
         yield session
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Like :func:`get_db`, but served by a read replica when one is configured and healthy.
+
+    Under the ``sqlite`` profile, reads without replicas use the reader pool.
+    """
+    sessions = await read_session_maker(read_replicas, reader_session_maker or async_session_maker, request)
+    async with sessions() as session:
+        yield session
+
+
+async def dispose_engines() -> None:
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+    await read_replicas.dispose()
@@ -1,4 +1,4 @@
-from typing import Callable
+from typing import Awaitable, Callable
 from uuid import UUID
 
 from fastapi import Depends
@@ -12,6 +12,7 @@ from .repositories import (
     SQLAlchemyGroupRepository,
     SQLAlchemyUserRepository,
 )
+from .unit_of_work import SQLAlchemyUnitOfWork, get_unit_of_work
 
 
 def get_user_repo(db: AsyncSession = Depends(get_db)) -> SQLAlchemyUserRepository:
@@ -27,8 +28,6 @@ def get_expense_repo(db: AsyncSession = Depends(get_db)) -> SQLAlchemyExpenseRep
 
 
 def get_user_service(
-    db: AsyncSession = Depends(get_db),
-) -> Callable[[User, UUID], User]:
-    user_repo = SQLAlchemyUserRepository(db)
-    group_repo = SQLAlchemyGroupRepository(db)
-    return build_user_service(user_repo, group_repo, db)
+    uow: SQLAlchemyUnitOfWork = Depends(get_unit_of_work),
+) -> Callable[[User, UUID], Awaitable[User]]:
+    return build_user_service(uow)
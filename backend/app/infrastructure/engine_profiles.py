@@ -0,0 +1,175 @@
+"""Named engine profiles for ``create_async_engine``.
+
+``DB_ENGINE_PROFILE`` picks one of ``dev``, ``test``, ``prod`` (the default),
+``pgbouncer`` or ``sqlite``. A profile sets SQL echo, the pool size and overflow, how long
+a checkout may wait for a connection, when connections are recycled, and the
+asyncpg prepared statement cache. Each pool setting can be overridden with its
+own variable (``DB_POOL_SIZE``, ``DB_MAX_OVERFLOW``, ``DB_POOL_TIMEOUT``,
+``DB_POOL_RECYCLE``, ``DB_PREPARED_STATEMENT_CACHE_SIZE``). An unknown profile
+or an invalid value raises ``ValueError`` when the engine is built, so a
+misconfigured process fails at startup instead of under load.
+
+``pgbouncer`` is for PgBouncer in transaction mode. Server connections change
+between transactions there, so asyncpg must not reuse prepared statements.
+``sqlite`` runs on a local database file; see :mod:`.sqlite`. Its
+``pool_size`` is the number of reader connections.
+"""
+
+import os
+import uuid
+from typing import Any, Dict, Optional
+
+from sqlalchemy.engine import make_url
+
+from .pool_metrics import TimedAsyncAdaptedQueuePool
+
+
+class EngineProfile:
+    def __init__(
+        self,
+        name: str,
+        *,
+        echo: bool,
+        pool_size: int,
+        max_overflow: int,
+        pool_timeout: float,
+        pool_recycle: int,
+        prepared_statement_cache_size: int,
+    ) -> None:
+        self.name = name
+        self.echo = echo
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.prepared_statement_cache_size = prepared_statement_cache_size
+
+    def validate(self) -> "EngineProfile":
+        if self.pool_size < 1:
+            raise ValueError(f"{self.name}: pool_size must be at least 1")
+        if self.max_overflow < 0:
+            raise ValueError(f"{self.name}: max_overflow must not be negative")
+        if self.pool_timeout <= 0:
+            raise ValueError(f"{self.name}: pool_timeout must be positive")
+        if self.pool_recycle < -1 or self.pool_recycle == 0:
+            raise ValueError(f"{self.name}: pool_recycle must be positive, or -1 to disable")
+        if self.prepared_statement_cache_size < 0:
+            raise ValueError(f"{self.name}: prepared_statement_cache_size must not be negative")
+        return self
+
+    @property
+    def capacity(self) -> int:
+        """Most connections the pool hands out at once."""
+        return self.pool_size + self.max_overflow
+
+
+PROFILES: Dict[str, EngineProfile] = {
+    "dev": EngineProfile(
+        "dev",
+        echo=True,
+        pool_size=5,
+        max_overflow=5,
+        pool_timeout=30,
+        pool_recycle=-1,
+        prepared_statement_cache_size=100,
+    ),
+    "test": EngineProfile(
+        "test",
+        echo=False,
+        pool_size=2,
+        max_overflow=2,
+        pool_timeout=5,
+        pool_recycle=-1,
+        prepared_statement_cache_size=100,
+    ),
+    "prod": EngineProfile(
+        "prod",
+        echo=False,
+        pool_size=10,
+        max_overflow=10,
+        pool_timeout=10,
+        pool_recycle=1800,
+        prepared_statement_cache_size=500,
+    ),
+    "pgbouncer": EngineProfile(
+        "pgbouncer",
+        echo=False,
+        pool_size=10,
+        max_overflow=0,
+        pool_timeout=10,
+        pool_recycle=300,
+        prepared_statement_cache_size=0,
+    ),
+    "sqlite": EngineProfile(
+        "sqlite",
+        echo=False,
+        pool_size=os.cpu_count() or 4,
+        max_overflow=0,
+        pool_timeout=30,
+        pool_recycle=-1,
+        prepared_statement_cache_size=0,
+    ),
+}
+
+
+def _env_number(var: str, fallback, cast):
+    val = os.getenv(var)
+    if not val:
+        return fallback
+    try:
+        return cast(val)
+    except ValueError:
+        raise ValueError(f"{var} must be a number, got {val!r}") from None
+
+
+def load_profile(name: Optional[str] = None) -> EngineProfile:
+    """Return the validated profile ``name`` (default: ``DB_ENGINE_PROFILE``) with env overrides."""
+    name = name or os.getenv("DB_ENGINE_PROFILE", "prod")
+    if name not in PROFILES:
+        raise ValueError(f"Unknown DB_ENGINE_PROFILE {name!r}; expected one of {', '.join(PROFILES)}")
+    base = PROFILES[name]
+    return EngineProfile(
+        name,
+        echo=base.echo,
+        pool_size=_env_number("DB_POOL_SIZE", base.pool_size, int),
+        max_overflow=_env_number("DB_MAX_OVERFLOW", base.max_overflow, int),
+        pool_timeout=_env_number("DB_POOL_TIMEOUT", base.pool_timeout, float),
+        pool_recycle=_env_number("DB_POOL_RECYCLE", base.pool_recycle, int),
+        prepared_statement_cache_size=_env_number(
+            "DB_PREPARED_STATEMENT_CACHE_SIZE", base.prepared_statement_cache_size, int
+        ),
+    ).validate()
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def engine_options(url: str, profile: EngineProfile, pool_name: str) -> Dict[str, Any]:
+    """Keyword arguments for ``create_async_engine(url, ...)`` under ``profile``.
+
+    The pool settings only apply to queue pools; an in-memory SQLite database
+    keeps SQLAlchemy's single shared connection.
+    """
+    options: Dict[str, Any] = {"echo": profile.echo, "future": True, "pool_pre_ping": True}
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return options
+
+    options.update(
+        poolclass=TimedAsyncAdaptedQueuePool,
+        pool_logging_name=pool_name,
+        pool_size=profile.pool_size,
+        max_overflow=profile.max_overflow,
+        pool_timeout=profile.pool_timeout,
+        pool_recycle=profile.pool_recycle,
+    )
+    if parsed.get_driver_name() == "asyncpg":
+        connect_args = {"prepared_statement_cache_size": profile.prepared_statement_cache_size}
+        if profile.prepared_statement_cache_size == 0:
+            # Disable asyncpg's own cache too, and name statements uniquely so two
+            # clients sharing a server connection never collide
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = _unique_statement_name
+        options["connect_args"] = connect_args
+    return options
@@ -1,30 +1,55 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from typing import List
 from uuid import UUID as UUID_t
 from uuid import uuid4
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Table
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Table,
+    Text,
+    Uuid,
+    event,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, declarative_base, mapped_column, relationship
 
+from .constants import EXPENSE_PARTITION_MONTHS_AHEAD
+from .partitions import ensure_expense_partitions
+
 Base = declarative_base()
 
+# Native uuid on PostgreSQL. SQLite would give a "UUID" column NUMERIC affinity
+# and store all-digit ids (such as the default group's) as numbers, so it gets
+# CHAR(32) text instead
+UUIDType = UUID(as_uuid=True).with_variant(Uuid(as_uuid=True), "sqlite")
+
 
 group_members = Table(
     "group_members",
     Base.metadata,
     Column(
         "group_id",
-        UUID(as_uuid=True),
+        UUIDType,
         ForeignKey("groups.id", ondelete="CASCADE"),
         primary_key=True,
     ),
     Column(
         "user_id",
-        UUID(as_uuid=True),
+        UUIDType,
         ForeignKey("users.id", ondelete="CASCADE"),
         primary_key=True,
     ),
+    # The primary key leads with group_id; this serves user -> groups lookups
+    Index("ix_group_members_user_group", "user_id", "group_id"),
 )
 
 
@@ -32,17 +57,21 @@ class UserORM(Base):
     __tablename__ = "users"
 
     id: Mapped[UUID_t] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid4
+        UUIDType, primary_key=True, default=uuid4
     )
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     password_hash: Mapped[str | None] = mapped_column(String(255), nullable=True)
     is_admin: Mapped[bool] = mapped_column(Boolean(), nullable=False, default=False)
+    # Bumped to revoke every access token issued to the user so far
+    token_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
+    # Never loaded implicitly: through the default group one user reaches
+    # nearly every row. Repositories read memberships from group_members.
     groups: Mapped[List["GroupORM"]] = relationship(
         secondary=group_members,
         back_populates="members",
-        lazy="selectin",
+        lazy="raise",
     )
 
 
@@ -50,33 +79,206 @@ class GroupORM(Base):
     __tablename__ = "groups"
 
     id: Mapped[UUID_t] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid4
+        UUIDType, primary_key=True, default=uuid4
     )
     name: Mapped[str] = mapped_column(String(255), nullable=False)
 
     members: Mapped[List[UserORM]] = relationship(
         secondary=group_members,
         back_populates="groups",
-        lazy="selectin",
+        lazy="raise",
     )
 
 
 class ExpenseORM(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index("ix_expenses_group_created", "group_id", "created_at", "id"),
+        # Postgres partitions by created_at, so it must be part of the primary key;
+        # SQLite keeps one table and still enforces unique ids
+        Index("ux_expenses_id", "id", unique=True).ddl_if(dialect="sqlite"),
+        Index("ix_expenses_payer_id", "payer_id"),
+        # Substring search on descriptions (Postgres only; SQLite uses expenses_fts)
+        Index(
+            "ix_expenses_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id: Mapped[UUID_t] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid4
+        UUIDType, primary_key=True, default=uuid4
     )
     group_id = mapped_column(
-        UUID(as_uuid=True), ForeignKey("groups.id", ondelete="CASCADE"), nullable=False
+        UUIDType, ForeignKey("groups.id", ondelete="CASCADE"), nullable=False
     )
     payer_id = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+        UUIDType, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     amount: Mapped[int] = mapped_column(Integer, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
         nullable=False,
+        primary_key=True,
     )
     description: Mapped[str | None] = mapped_column(String(1024), nullable=True)
+
+    # Identity stays the id alone; created_at is in the table key only for partitioning
+    __mapper_args__ = {"primary_key": [id]}
+
+
+# Description search backends, created alongside the expenses table.
+# Postgres needs pg_trgm for the GIN index above; SQLite keeps an FTS5
+# trigram table in sync with expenses through triggers.
+EXPENSES_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS expenses_fts "
+    "USING fts5(expense_id UNINDEXED, description, tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS expenses_fts_insert AFTER INSERT ON expenses "
+    "WHEN new.description IS NOT NULL BEGIN "
+    "INSERT INTO expenses_fts (expense_id, description) VALUES (new.id, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS expenses_fts_delete AFTER DELETE ON expenses BEGIN "
+    "DELETE FROM expenses_fts WHERE expense_id = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS expenses_fts_update AFTER UPDATE OF description ON expenses BEGIN "
+    "DELETE FROM expenses_fts WHERE expense_id = old.id; "
+    "INSERT INTO expenses_fts (expense_id, description) "
+    "SELECT new.id, new.description WHERE new.description IS NOT NULL; END",
+)
+
+event.listen(
+    ExpenseORM.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+# On Postgres, create the default partition and the coming months' partitions
+event.listen(
+    ExpenseORM.__table__,
+    "after_create",
+    lambda target, connection, **kw: ensure_expense_partitions(connection, EXPENSE_PARTITION_MONTHS_AHEAD),
+)
+for _statement in EXPENSES_FTS_DDL:
+    event.listen(ExpenseORM.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    ExpenseORM.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS expenses_fts").execute_if(dialect="sqlite"),
+)
+
+
+class GroupBalanceORM(Base):
+    """Materialized per-member ledger, maintained alongside every expense write.
+
+    ``paid_cents`` holds the whole-dollar credit a member has earned as payer.
+    The equal-split debit depends on the current member count, so it is applied
+    at read time rather than stored.
+    """
+
+    __tablename__ = "group_balances"
+
+    group_id: Mapped[UUID_t] = mapped_column(
+        UUIDType, ForeignKey("groups.id", ondelete="CASCADE"), primary_key=True
+    )
+    user_id: Mapped[UUID_t] = mapped_column(
+        UUIDType, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    paid_cents: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class BalanceCheckpointORM(Base):
+    """Cumulative ``group_balances`` snapshot taken at a checkpoint boundary.
+
+    A checkpoint covers every expense with ``created_at <= checkpoint_at`` and
+    holds a row for each payer of the group at that time.
+    """
+
+    __tablename__ = "balance_checkpoints"
+
+    group_id: Mapped[UUID_t] = mapped_column(
+        UUIDType, ForeignKey("groups.id", ondelete="CASCADE"), primary_key=True
+    )
+    checkpoint_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    user_id: Mapped[UUID_t] = mapped_column(
+        UUIDType, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    paid_cents: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class ExpenseRollupORM(Base):
+    """Per-day spend for each payer of a group, maintained alongside every expense write.
+
+    ``day`` is the UTC calendar date of ``expenses.created_at``.
+    """
+
+    __tablename__ = "expense_rollups"
+
+    group_id: Mapped[UUID_t] = mapped_column(
+        UUIDType, ForeignKey("groups.id", ondelete="CASCADE"), primary_key=True
+    )
+    payer_id: Mapped[UUID_t] = mapped_column(
+        UUIDType, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    amount_cents: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    expense_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class IdempotencyKeyORM(Base):
+    """Response stored for a client-supplied ``Idempotency-Key``, scoped per user."""
+
+    __tablename__ = "idempotency_keys"
+
+    user_id: Mapped[UUID_t] = mapped_column(
+        UUIDType, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    status_code: Mapped[int] = mapped_column(Integer, nullable=False)
+    response_body: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+        index=True,
+    )
+
+
+class ExpenseSegmentORM(Base):
+    """Catalog of archived expense segment files (see ``archive.py``).
+
+    Every archived expense of the group was created before midnight UTC on
+    ``archived_before``; those rows no longer exist in ``expenses``.
+    """
+
+    __tablename__ = "expense_segments"
+
+    id: Mapped[UUID_t] = mapped_column(UUIDType, primary_key=True, default=uuid4)
+    group_id: Mapped[UUID_t] = mapped_column(
+        UUIDType, ForeignKey("groups.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    path: Mapped[str] = mapped_column(String(1024), nullable=False)
+    row_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    first_created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    archived_before: Mapped[date] = mapped_column(Date, nullable=False)
+
+
+class ArchivedBalanceORM(Base):
+    """Carry-forward totals per payer of everything archived for a group.
+
+    ``paid_cents`` matches the ``group_balances`` credit for those expenses, so
+    balances can be rebuilt from live rows plus this table.
+    """
+
+    __tablename__ = "archived_balances"
+
+    group_id: Mapped[UUID_t] = mapped_column(
+        UUIDType, ForeignKey("groups.id", ondelete="CASCADE"), primary_key=True
+    )
+    user_id: Mapped[UUID_t] = mapped_column(
+        UUIDType, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    paid_cents: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    amount_cents: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    expense_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -0,0 +1,63 @@
+"""Monthly range partitions of ``expenses`` on Postgres.
+
+``expenses`` is declared ``PARTITION BY RANGE (created_at)`` on Postgres and
+stays a single table elsewhere. Each calendar month (UTC) gets its own
+partition named ``expenses_pYYYY_MM``; ``expenses_default`` catches rows
+outside the created months so inserts never fail. Partitions must exist
+before rows for their month arrive, because Postgres cannot split rows out of
+the default partition, so create them ahead of time with
+``python -m app.cli create-expense-partitions``.
+"""
+
+from datetime import date, datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Connection, text
+
+PARENT_TABLE = "expenses"
+DEFAULT_PARTITION = "expenses_default"
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def monthly_partitions(first: date, count: int) -> List[Tuple[str, date, date]]:
+    """Return ``(name, from, to)`` for ``count`` months starting at ``first``'s month."""
+    start = month_start(first)
+    bounds = []
+    for offset in range(count):
+        lower = add_months(start, offset)
+        bounds.append((f"{PARENT_TABLE}_p{lower:%Y_%m}", lower, add_months(lower, 1)))
+    return bounds
+
+
+def ensure_expense_partitions(
+    connection: Connection, months_ahead: int, first: Optional[date] = None
+) -> List[str]:
+    """Create missing monthly partitions from ``first`` (default: this month) up to ``months_ahead`` later.
+
+    Also creates the default partition. Returns the names of the partitions
+    created; a no-op returning ``[]`` on databases other than Postgres.
+    """
+    if connection.dialect.name != "postgresql":
+        return []
+    first = first or datetime.now(timezone.utc).date()
+
+    created: List[str] = []
+    wanted = [(DEFAULT_PARTITION, None, None)] + monthly_partitions(first, months_ahead + 1)
+    for name, lower, upper in wanted:
+        if connection.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+            continue
+        if lower is None:
+            bound = "DEFAULT"
+        else:
+            bound = f"FOR VALUES FROM ('{lower.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+        connection.execute(text(f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} {bound}"))
+        created.append(name)
+    return created
@@ -0,0 +1,83 @@
+"""Connection pool metrics, exported through OpenTelemetry.
+
+- ``db.client.connections.wait_time`` (histogram, seconds): how long each
+  checkout waited for a connection. Long waits mean the pool is too small for
+  the concurrency it serves.
+- ``db.client.connections.usage`` (gauge): connections checked out
+  (``state=used``) and idle in the pool (``state=idle``).
+- ``db.client.connections.saturation`` (gauge): checked-out connections as a
+  fraction of ``pool_size + max_overflow``. At 1.0, new checkouts queue until
+  ``pool_timeout``.
+
+Every series carries the pool name (``primary``, ``replica0``, ...) as ``pool.name``.
+"""
+
+import time
+from typing import Dict, Iterable, Tuple
+
+from opentelemetry import metrics
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+_meter = metrics.get_meter(__name__)
+
+checkout_wait = _meter.create_histogram(
+    "db.client.connections.wait_time",
+    unit="s",
+    description="Time spent waiting for a pooled connection",
+)
+
+# Pool name -> (engine, capacity); the engine is kept rather than its pool
+# because dispose() swaps in a fresh pool
+_engines: Dict[str, Tuple[AsyncEngine, int]] = {}
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            checkout_wait.record(
+                time.perf_counter() - started, {"pool.name": self.logging_name or "default"}
+            )
+
+
+def pool_status(engine: AsyncEngine, capacity: int) -> Dict[str, float]:
+    pool = engine.pool
+    used = pool.checkedout()
+    return {"used": used, "idle": pool.checkedin(), "saturation": used / capacity if capacity else 0.0}
+
+
+def register_engine(name: str, engine: AsyncEngine, capacity: int) -> None:
+    """Report ``engine``'s pool usage under ``name``; a no-op for pools without a queue."""
+    if isinstance(engine.pool, TimedAsyncAdaptedQueuePool):
+        _engines[name] = (engine, capacity)
+
+
+def _observe_usage(options: metrics.CallbackOptions) -> Iterable[metrics.Observation]:
+    for name, (engine, capacity) in list(_engines.items()):
+        status = pool_status(engine, capacity)
+        yield metrics.Observation(status["used"], {"pool.name": name, "state": "used"})
+        yield metrics.Observation(status["idle"], {"pool.name": name, "state": "idle"})
+
+
+def _observe_saturation(options: metrics.CallbackOptions) -> Iterable[metrics.Observation]:
+    for name, (engine, capacity) in list(_engines.items()):
+        yield metrics.Observation(pool_status(engine, capacity)["saturation"], {"pool.name": name})
+
+
+_meter.create_observable_gauge(
+    "db.client.connections.usage",
+    callbacks=[_observe_usage],
+    unit="{connection}",
+    description="Pooled connections by state",
+)
+_meter.create_observable_gauge(
+    "db.client.connections.saturation",
+    callbacks=[_observe_saturation],
+    unit="1",
+    description="Checked-out connections as a fraction of pool_size + max_overflow",
+)
@@ -0,0 +1,175 @@
+"""Read replicas for GET endpoints.
+
+Replicas come from ``DATABASE_REPLICA_URLS``, a comma-separated list of
+database URLs. ``DATABASE_REPLICA_URL`` is accepted for a single replica.
+Reads rotate round-robin over the replicas that answered their last health
+check, and fall back to the primary when none did. A replica is probed again
+once its result is older than ``REPLICA_HEALTH_INTERVAL_SECONDS``.
+
+Replication lag would hide a client's own writes from it. After a successful
+write, that client's reads are therefore pinned to the primary for
+``READ_YOUR_WRITES_SECONDS``. A write with a bearer token pins the token's user,
+so API clients that send no cookies are covered too. Those pins live in each
+process (at most ``READ_YOUR_WRITES_PINNED_USERS`` users), so a read served by
+another process can still miss the write. The response also sets a cookie that
+pins the browser that made the write, in every process.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from .constants import READ_YOUR_WRITES_PINNED_USERS
+
+PRIMARY_PIN_COOKIE = "read_primary_until"
+_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class Replica:
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.sessions = async_sessionmaker(engine, autoflush=False, autocommit=False, expire_on_commit=False)
+        self.healthy = True
+        self.checked_at = float("-inf")
+
+
+class ReplicaSet:
+    """Round-robin selection over healthy replicas."""
+
+    def __init__(self, engines: Sequence[AsyncEngine], health_interval: float, health_timeout: float) -> None:
+        self.replicas = [Replica(engine) for engine in engines]
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self._next = 0
+
+    @classmethod
+    def from_urls(
+        cls,
+        urls: Sequence[str],
+        health_interval: float,
+        health_timeout: float,
+        engine_options: Callable[[str, str], Dict[str, Any]],
+    ):
+        """Build one engine per URL with ``engine_options(url, pool_name)``; pools are ``replica0``, ``replica1``..."""
+        engines = [create_async_engine(url, **engine_options(url, f"replica{i}")) for i, url in enumerate(urls)]
+        return cls(engines, health_interval, health_timeout)
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    async def check(self, replica: Replica) -> bool:
+        """Probe ``replica`` with ``SELECT 1`` and record the result."""
+        try:
+            async with asyncio.timeout(self.health_timeout):
+                async with replica.engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            replica.healthy = True
+        except Exception:
+            replica.healthy = False
+        replica.checked_at = time.monotonic()
+        return replica.healthy
+
+    async def choose(self) -> Optional[Replica]:
+        """Return the next healthy replica, or ``None`` if there is none."""
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self._next % len(self.replicas)]
+            self._next += 1
+            if time.monotonic() - replica.checked_at >= self.health_interval:
+                await self.check(replica)
+            if replica.healthy:
+                return replica
+        return None
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+def replica_urls(value: Optional[str]) -> List[str]:
+    return [url.strip() for url in (value or "").split(",") if url.strip()]
+
+
+class _UserPins:
+    """Bounded per-process map of user id -> time until which their reads go to the primary."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._until: "OrderedDict[str, float]" = OrderedDict()
+
+    def pin(self, user_id: str, until: float) -> None:
+        if self.maxsize <= 0:
+            return
+        self._until[user_id] = until
+        self._until.move_to_end(user_id)
+        while len(self._until) > self.maxsize:
+            self._until.popitem(last=False)
+
+    def pinned(self, user_id: str) -> bool:
+        until = self._until.get(user_id)
+        if until is None:
+            return False
+        if until <= time.time():
+            del self._until[user_id]
+            return False
+        return True
+
+    def clear(self) -> None:
+        self._until.clear()
+
+
+user_pins = _UserPins(READ_YOUR_WRITES_PINNED_USERS)
+
+
+def request_user_id(request: Request) -> Optional[str]:
+    """The ``sub`` of a valid bearer token on ``request``, if any."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    # security imports database, which imports this module
+    from .security import decode_token
+
+    try:
+        return decode_token(token).get("sub")
+    except HTTPException:
+        return None
+
+
+def pinned_to_primary(request: Request) -> bool:
+    """Whether ``request`` comes from a client or user that wrote recently."""
+    try:
+        if float(request.cookies.get(PRIMARY_PIN_COOKIE, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+    user_id = request_user_id(request)
+    return user_id is not None and user_pins.pinned(user_id)
+
+
+def read_your_writes(replicas: ReplicaSet, window: int) -> Callable[..., Awaitable[Response]]:
+    """Build HTTP middleware that pins a client to the primary after it writes."""
+
+    async def middleware(request: Request, call_next) -> Response:
+        response = await call_next(request)
+        if replicas and request.method not in _SAFE_METHODS and response.status_code < 400:
+            until = int(time.time()) + window
+            user_id = request_user_id(request)
+            if user_id is not None:
+                user_pins.pin(user_id, until)
+            response.set_cookie(PRIMARY_PIN_COOKIE, str(until), max_age=window, httponly=True, samesite="lax")
+        return response
+
+    return middleware
+
+
+async def read_session_maker(
+    replicas: ReplicaSet, primary: async_sessionmaker, request: Request
+) -> "async_sessionmaker[AsyncSession]":
+    if not replicas or pinned_to_primary(request):
+        return primary
+    replica = await replicas.choose()
+    return replica.sessions if replica is not None else primary
@@ -1,65 +1,480 @@
-from typing import Dict, Iterable, List, Optional
-from uuid import UUID
+import asyncio
+import copy
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
 
-from sqlalchemy import select
+from sqlalchemy import (
+    JSON,
+    ColumnElement,
+    Date,
+    Integer,
+    Row,
+    Select,
+    case,
+    cast,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    text,
+    tuple_,
+    type_coerce,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
-from ..domain.exceptions import UserExistsError
-from ..domain.models import Expense, Group, User
+from ..domain.exceptions import (
+    GroupNotFoundError,
+    NotGroupMemberError,
+    PayerNotFoundError,
+    UserExistsError,
+    UserNotFoundError,
+)
+from ..domain.models import (
+    Expense,
+    ExpenseFilter,
+    Group,
+    IdempotencyRecord,
+    MemberGroupTotal,
+    PayerTotal,
+    SpendBucket,
+    User,
+)
 from ..domain.repositories import ExpenseRepository, GroupRepository, UserRepository
-from .orm import ExpenseORM, GroupORM, UserORM
+from ..domain.services import payer_credit_cents
+from .archive import Segment, write_segment
+from .orm import (
+    ArchivedBalanceORM,
+    BalanceCheckpointORM,
+    ExpenseORM,
+    ExpenseRollupORM,
+    ExpenseSegmentORM,
+    GroupBalanceORM,
+    GroupORM,
+    IdempotencyKeyORM,
+    UserORM,
+    group_members,
+)
 
 
-class InMemoryUserRepository(UserRepository):
+class _InMemoryRepository:
+    """Shared plumbing for the in-memory repositories.
+
+    They keep dicts plus secondary indexes and answer every read from an
+    index, so none of them scans the whole store. Returned models are copies;
+    mutating one does not corrupt the indexes. A :meth:`journaled` view shares
+    the data and records how to undo each write, which is how
+    ``InMemoryUnitOfWork`` rolls back.
+    """
+
+    _journal: Optional[List[Callable[[], None]]] = None
+
+    def journaled(self, journal: List[Callable[[], None]]):
+        view = copy.copy(self)
+        view._journal = journal
+        return view
+
+    def _on_undo(self, undo: Callable[[], None]) -> None:
+        if self._journal is not None:
+            self._journal.append(undo)
+
+
+def _seek(ids: List, after, limit: Optional[int]) -> List:
+    """Slice a sorted key list past ``after``, ``limit`` at a time."""
+    start = 0 if after is None else bisect_right(ids, after)
+    return ids[start : None if limit is None else start + limit]
+
+
+class InMemoryUserRepository(_InMemoryRepository, UserRepository):
     def __init__(self) -> None:
         self.users: Dict[UUID, User] = {}
+        self._ids: List[UUID] = []
+        self._by_email: Dict[str, UUID] = {}
 
-    async def add(self, user: User) -> None:
-        self.users[user.id] = user
+    async def add(self, user: User) -> User:
+        if user.id in self.users or user.email in self._by_email:
+            raise UserExistsError(f"Failed to create user {user.email}")
+        self.users[user.id] = user.model_copy()
+        insort(self._ids, user.id)
+        self._by_email[user.email] = user.id
+        self._on_undo(lambda: self._remove(user.id))
+        return user.model_copy(update={"password_hash": None})
+
+    def _remove(self, user_id: UUID) -> None:
+        user = self.users.pop(user_id)
+        del self._ids[bisect_left(self._ids, user_id)]
+        del self._by_email[user.email]
 
     async def get(self, user_id: UUID) -> Optional[User]:
-        return self.users.get(user_id)
+        user = self.users.get(user_id)
+        return user.model_copy() if user else None
 
+    async def list_all(self, limit: Optional[int] = None, after: Optional[UUID] = None) -> List[User]:
+        """Return users ordered by id, optionally seeking past ``after``."""
+        return [self.users[i].model_copy() for i in _seek(self._ids, after, limit)]
 
-class InMemoryGroupRepository(GroupRepository):
-    def __init__(self) -> None:
+    async def existing_ids(self, user_ids: Iterable[UUID]) -> Set[UUID]:
+        return {i for i in user_ids if i in self.users}
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        user_id = self._by_email.get(email)
+        return None if user_id is None else await self.get(user_id)
+
+
+class InMemoryGroupRepository(_InMemoryRepository, GroupRepository):
+    """Groups indexed by member; pass ``users`` to reject unknown members like the database does."""
+
+    def __init__(self, users: Optional[InMemoryUserRepository] = None) -> None:
+        self.users = users
         self.groups: Dict[UUID, Group] = {}
+        self._ids: List[UUID] = []
+        self._members: Dict[UUID, Set[UUID]] = {}
+        # user id -> sorted ids of their groups
+        self._by_user: Dict[UUID, List[UUID]] = {}
+
+    async def add(self, group: Group) -> Group:
+        self.groups[group.id] = Group(id=group.id, name=group.name)
+        insort(self._ids, group.id)
+        self._members[group.id] = set()
+        self._on_undo(lambda: self._remove(group.id))
+        return Group(id=group.id, name=group.name)
 
-    async def add(self, group: Group) -> None:
-        self.groups[group.id] = group
+    def _remove(self, group_id: UUID) -> None:
+        del self.groups[group_id], self._members[group_id]
+        del self._ids[bisect_left(self._ids, group_id)]
 
-    async def add_member(self, group_id: UUID, user_id: UUID) -> None:
+    async def add_member(self, group_id: UUID, user_id: UUID) -> Group:
+        """Add ``user_id`` to ``group_id``; adding an existing member is a no-op.
+
+        Raises ``GroupNotFoundError``, or ``UserNotFoundError`` when the
+        repository knows its users.
+        """
+        if group_id not in self.groups:
+            raise GroupNotFoundError(str(group_id))
+        if self.users is not None and user_id not in self.users.users:
+            raise UserNotFoundError(str(user_id))
+        members = self._members[group_id]
+        if user_id not in members:
+            members.add(user_id)
+            self.groups[group_id].members.append(user_id)
+            insort(self._by_user.setdefault(user_id, []), group_id)
+            self._on_undo(lambda: self._remove_member(group_id, user_id))
+        return self._copy(group_id)
+
+    def _remove_member(self, group_id: UUID, user_id: UUID) -> None:
+        self._members[group_id].discard(user_id)
+        self.groups[group_id].members.remove(user_id)
+        groups = self._by_user[user_id]
+        del groups[bisect_left(groups, group_id)]
+
+    def exists(self, group_id: UUID) -> bool:
+        return group_id in self.groups
+
+    def is_member(self, group_id: UUID, user_id: UUID) -> bool:
+        return user_id in self._members.get(group_id, ())
+
+    def _copy(self, group_id: UUID) -> Group:
         group = self.groups[group_id]
-        group.members.append(user_id)
+        return Group(id=group.id, name=group.name, members=list(group.members))
+
+    async def list_for_user(
+        self, user_id: UUID, limit: Optional[int] = None, after: Optional[UUID] = None
+    ) -> List[Group]:
+        return [self._copy(i) for i in _seek(self._by_user.get(user_id, []), after, limit)]
 
-    async def list_for_user(self, user_id: UUID) -> Iterable[Group]:
-        return [g for g in self.groups.values() if user_id in g.members]
+    async def get(self, group_id: UUID) -> Optional[Group]:
+        return self._copy(group_id) if group_id in self.groups else None
 
-    async def update_name(self, _group_id: UUID, _name: str) -> None:
-        if _group_id in self.groups:
-            g = self.groups[_group_id]
-            g.name = _name
+    async def list_all(self, limit: Optional[int] = None, after: Optional[UUID] = None) -> List[Group]:
+        """Return groups ordered by id, optionally seeking past ``after``."""
+        return [self._copy(i) for i in _seek(self._ids, after, limit)]
 
+    async def existing_ids(self, group_ids: Iterable[UUID]) -> Set[UUID]:
+        return {i for i in group_ids if i in self.groups}
 
-class InMemoryExpenseRepository(ExpenseRepository):
-    def __init__(self) -> None:
+    async def memberships(
+        self, group_ids: Iterable[UUID], user_ids: Iterable[UUID]
+    ) -> Set[Tuple[UUID, UUID]]:
+        user_ids = set(user_ids)
+        return {
+            (g, u) for g in group_ids for u in self._members.get(g, ()) if u in user_ids
+        }
+
+    async def update_name(self, _group_id: UUID, _name: str) -> Optional[Group]:
+        group = self.groups.get(_group_id)
+        if group is None:
+            return None
+        old, group.name = group.name, _name
+        self._on_undo(lambda: setattr(group, "name", old))
+        return self._copy(_group_id)
+
+
+class InMemoryExpenseRepository(_InMemoryRepository, ExpenseRepository):
+    """Expenses indexed per group by ``(created_at, id)``.
+
+    :meth:`add_for_member` checks membership against ``groups``; share the
+    group repository the members are added through.
+    """
+
+    def __init__(self, groups: Optional[InMemoryGroupRepository] = None) -> None:
+        self.groups = groups if groups is not None else InMemoryGroupRepository()
         self.expenses: Dict[UUID, Expense] = {}
+        self._keys: List[Tuple[datetime, UUID]] = []
+        # group id -> sorted (created_at, id) keys of its expenses
+        self._by_group: Dict[UUID, List[Tuple[datetime, UUID]]] = {}
+
+    async def add(self, expense: Expense) -> Expense:
+        stored = expense.model_copy(update={"created_at": _as_utc(expense.created_at)})
+        key = (stored.created_at, stored.id)
+        self.expenses[stored.id] = stored
+        insort(self._keys, key)
+        insort(self._by_group.setdefault(stored.group_id, []), key)
+        self._on_undo(lambda: self._remove(stored))
+        return stored.model_copy()
+
+    def _remove(self, expense: Expense) -> None:
+        key = (expense.created_at, expense.id)
+        del self.expenses[expense.id]
+        for keys in (self._keys, self._by_group[expense.group_id]):
+            del keys[bisect_left(keys, key)]
+
+    async def add_for_member(self, expense: Expense) -> Expense:
+        """Add ``expense`` only if its payer belongs to its group.
+
+        Checks the group repository's membership index. Raises
+        ``GroupNotFoundError``, ``PayerNotFoundError`` (when the group
+        repository knows its users) or ``NotGroupMemberError``, like the SQL
+        repository.
+        """
+        if not self.groups.exists(expense.group_id):
+            raise GroupNotFoundError(str(expense.group_id))
+        if not self.groups.is_member(expense.group_id, expense.payer_id):
+            if self.groups.users is not None and expense.payer_id not in self.groups.users.users:
+                raise PayerNotFoundError(str(expense.payer_id))
+            raise NotGroupMemberError(f"{expense.payer_id} is not a member of {expense.group_id}")
+        return await self.add(expense)
+
+    async def list_for_group(
+        self,
+        group_id: UUID,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        filters: Optional[ExpenseFilter] = None,
+    ) -> List[Expense]:
+        """Return a group's expenses ordered by ``(created_at, id)``, optionally filtered.
+
+        The time bounds and ``after`` are binary searches on the group's index;
+        the remaining filters are checked only on rows inside that range.
+        """
+        keys = self._by_group.get(group_id, [])
+        lo, hi = 0, len(keys)
+        if after is not None:
+            lo = bisect_right(keys, (_as_utc(after[0]), after[1]))
+        if filters is not None and filters.since is not None:
+            lo = max(lo, bisect_left(keys, (_as_utc(filters.since),)))
+        if filters is not None and filters.until is not None:
+            hi = bisect_left(keys, (_as_utc(filters.until),))
+
+        page: List[Expense] = []
+        for _, expense_id in keys[lo:hi]:
+            expense = self.expenses[expense_id]
+            if filters is None or _matches(expense, filters):
+                page.append(expense.model_copy())
+                if limit is not None and len(page) == limit:
+                    break
+        return page
+
+    async def get(self, expense_id: UUID) -> Optional[Expense]:
+        expense = self.expenses.get(expense_id)
+        return expense.model_copy() if expense else None
+
+    async def list_all(
+        self, limit: Optional[int] = None, after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[Expense]:
+        """Return expenses ordered by ``(created_at, id)``, optionally seeking past ``after``."""
+        if after is not None:
+            after = (_as_utc(after[0]), after[1])
+        return [self.expenses[i].model_copy() for _, i in _seek(self._keys, after, limit)]
+
+
+def _matches(expense: Expense, filters: ExpenseFilter) -> bool:
+    """The non-time parts of ``filters``, as :func:`_apply_expense_filter` applies them in SQL."""
+    if filters.payer_id is not None and expense.payer_id != filters.payer_id:
+        return False
+    if filters.min_amount is not None and expense.amount < filters.min_amount:
+        return False
+    if filters.max_amount is not None and expense.amount > filters.max_amount:
+        return False
+    if filters.text and filters.text.lower() not in (expense.description or "").lower():
+        return False
+    return True
+
+
+def _dialect_insert(db: AsyncSession):
+    """Return the dialect-specific ``insert`` construct (supports ON CONFLICT)."""
+    if db.get_bind().dialect.name == "postgresql":
+        return pg_insert
+    return sqlite_insert
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Normalise to aware UTC; SQLite returns naive values and compares as text."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _utc_day(db: AsyncSession, column) -> ColumnElement[date]:
+    """SQL expression for the UTC calendar date of a timestamp column."""
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(func.timezone("UTC", column), Date)
+    return type_coerce(func.date(column), Date)
+
+
+def _month_start(db: AsyncSession, column) -> ColumnElement[date]:
+    """SQL expression for the first day of the month of a date column."""
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(func.date_trunc("month", column), Date)
+    return type_coerce(func.strftime("%Y-%m-01", column), Date)
+
+
+def _next_boundary(value: datetime, interval: timedelta) -> datetime:
+    """Return the first checkpoint boundary at or after ``value``."""
+    return _EPOCH + -((_EPOCH - _as_utc(value)) // interval) * interval
+
+
+def _expense_page(stmt: Select, limit: Optional[int], after: Optional[Tuple[datetime, UUID]]) -> Select:
+    """Order expenses by ``(created_at, id)`` and seek past the ``after`` key."""
+    stmt = stmt.order_by(ExpenseORM.created_at, ExpenseORM.id).limit(limit)
+    if after is not None:
+        created_at, expense_id = after
+        stmt = stmt.where(tuple_(ExpenseORM.created_at, ExpenseORM.id) > tuple_(_as_utc(created_at), expense_id))
+    return stmt
+
+
+def _description_match(db: AsyncSession, needle: str) -> ColumnElement[bool]:
+    """Case-insensitive substring match on descriptions, served by a trigram index.
+
+    Postgres answers ``ILIKE`` from the pg_trgm GIN index. SQLite searches
+    the ``expenses_fts`` trigram table, which needs at least three characters;
+    shorter needles fall back to scanning the group's rows.
+    """
+    if db.get_bind().dialect.name == "sqlite" and len(needle) >= 3:
+        phrase = '"' + needle.replace('"', '""') + '"'
+        matches = (
+            select(literal_column("expense_id"))
+            .select_from(text("expenses_fts"))
+            .where(text("expenses_fts MATCH :fts_phrase").bindparams(fts_phrase=phrase))
+        )
+        return ExpenseORM.id.in_(matches)
+    escaped = needle.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return ExpenseORM.description.ilike(f"%{escaped}%", escape="\\")
+
 
-    async def add(self, expense: Expense) -> None:
-        self.expenses[expense.id] = expense
+def _apply_expense_filter(db: AsyncSession, stmt: Select, filters: Optional[ExpenseFilter]) -> Select:
+    if filters is None:
+        return stmt
+    if filters.since is not None:
+        stmt = stmt.where(ExpenseORM.created_at >= _as_utc(filters.since))
+    if filters.until is not None:
+        stmt = stmt.where(ExpenseORM.created_at < _as_utc(filters.until))
+    if filters.payer_id is not None:
+        stmt = stmt.where(ExpenseORM.payer_id == filters.payer_id)
+    if filters.min_amount is not None:
+        stmt = stmt.where(ExpenseORM.amount >= filters.min_amount)
+    if filters.max_amount is not None:
+        stmt = stmt.where(ExpenseORM.amount <= filters.max_amount)
+    if filters.text:
+        stmt = stmt.where(_description_match(db, filters.text))
+    return stmt
 
-    async def list_for_group(self, group_id: UUID) -> Iterable[Expense]:
-        return [e for e in self.expenses.values() if e.group_id == group_id]
+
+def _merge_payer_totals(*groups: Iterable[PayerTotal]) -> List[PayerTotal]:
+    merged: Dict[UUID, PayerTotal] = {}
+    for totals in groups:
+        for t in totals:
+            seen = merged.get(t.payer_id)
+            if seen is None:
+                merged[t.payer_id] = t
+            else:
+                merged[t.payer_id] = PayerTotal(
+                    payer_id=t.payer_id,
+                    amount=seen.amount + t.amount,
+                    credited=seen.credited + t.credited,
+                    count=seen.count + t.count,
+                )
+    return list(merged.values())
+
+
+def _segment_payer_totals(
+    paths: List[str], since: Optional[datetime], until: Optional[datetime]
+) -> List[PayerTotal]:
+    totals: List[List[PayerTotal]] = []
+    for path in paths:
+        with Segment(Path(path)) as segment:
+            totals.append(segment.payer_totals(since, until))
+    return _merge_payer_totals(*totals)
+
+
+def _read_segment(path: str) -> List[Expense]:
+    with Segment(Path(path)) as segment:
+        return segment.expenses()
+
+
+def _member_ids(db: AsyncSession, group_id) -> ColumnElement:
+    """A group's member ids as a JSON array, aggregated from ``group_members`` alone."""
+    aggregate = func.json_agg if db.get_bind().dialect.name == "postgresql" else func.json_group_array
+    member_ids = (
+        select(aggregate(group_members.c.user_id))
+        .where(group_members.c.group_id == group_id)
+        .correlate_except(group_members)
+        .scalar_subquery()
+    )
+    return type_coerce(member_ids, JSON)
+
+
+def _group_rows(db: AsyncSession) -> Select:
+    """Select ``id``, ``name`` and ``members`` per group without loading user rows."""
+    return select(GroupORM.id, GroupORM.name, _member_ids(db, GroupORM.id).label("members"))
+
+
+def _decode_member_ids(value: Optional[List[str]]) -> List[UUID]:
+    # json_agg yields NULL rather than [] for a group without members
+    return [UUID(str(member)) for member in value or []]
+
+
+def _expense_values(expense: Expense) -> Dict[str, object]:
+    return {
+        "id": expense.id,
+        "group_id": expense.group_id,
+        "payer_id": expense.payer_id,
+        "amount": expense.amount,
+        "created_at": _as_utc(expense.created_at),
+        "description": expense.description,
+    }
 
 
 def _to_user_model(row: UserORM) -> User:
     return User(id=row.id, email=row.email, name=row.name, is_admin=row.is_admin)
 
 
-def _to_group_model(row: GroupORM) -> Group:
-    member_ids: List[UUID] = [u.id for u in row.members]
-    return Group(id=row.id, name=row.name, members=member_ids)
+def _to_group_model(row: Row) -> Group:
+    return Group(id=row.id, name=row.name, members=_decode_member_ids(row.members))
 
 
 def _to_expense_model(row: ExpenseORM) -> Expense:
@@ -73,111 +488,716 @@ def _to_expense_model(row: ExpenseORM) -> Expense:
     )
 
 
-class SQLAlchemyUserRepository(UserRepository):
-    def __init__(self, db: AsyncSession) -> None:
+class _SessionRepository:
+    """Base for repositories over one ``AsyncSession``.
+
+    Writes commit on their own unless a unit of work owns the session
+    (``autocommit=False``), in which case they only flush and the unit of
+    work commits once.
+    """
+
+    def __init__(self, db: AsyncSession, autocommit: bool = True) -> None:
         self.db = db
+        self.autocommit = autocommit
 
-    async def add(self, user: User) -> UserORM:
-        try:
-            row = UserORM(
-                id=user.id,
-                email=user.email,
-                name=user.name,
-                is_admin=user.is_admin,
-                password_hash=user.password_hash,
-            )
-            self.db.add(row)
+    async def _commit(self) -> None:
+        if self.autocommit:
             await self.db.commit()
-            await self.db.refresh(row)
-            return row
-        except IntegrityError as exc:
+        else:
+            await self.db.flush()
+
+    async def _rollback(self) -> None:
+        """Roll back after a failed write, unless a unit of work owns the transaction.
+
+        The unit of work decides what to do with its earlier writes; it rolls
+        back when the error leaves its block.
+        """
+        if self.autocommit:
             await self.db.rollback()
+
+
+# Load plan for user reads: the row itself, never its relationships
+_USER_ROW = (raiseload("*"),)
+
+
+class SQLAlchemyUserRepository(_SessionRepository, UserRepository):
+
+    async def add(self, user: User) -> User:
+        try:
+            row = (
+                await self.db.execute(
+                    insert(UserORM)
+                    .values(
+                        id=user.id,
+                        email=user.email,
+                        name=user.name,
+                        is_admin=user.is_admin,
+                        password_hash=user.password_hash,
+                    )
+                    .returning(UserORM.id, UserORM.email, UserORM.name, UserORM.is_admin, UserORM.token_version)
+                )
+            ).one()
+            await self._commit()
+        except IntegrityError as exc:
+            await self._rollback()
             raise UserExistsError(f"Failed to create user {user.email}") from exc
+        return User(
+            id=row.id, email=row.email, name=row.name, is_admin=row.is_admin, token_version=row.token_version
+        )
 
     async def get(self, user_id: UUID) -> Optional[UserORM]:
-        return await self.db.get(UserORM, user_id)
+        return await self.db.get(UserORM, user_id, options=_USER_ROW)
 
     # Extra helpers not in interface
-    async def list_all(self) -> List[User]:
-        result = await self.db.execute(select(UserORM))
+    async def list_all(self, limit: Optional[int] = None, after: Optional[UUID] = None) -> List[User]:
+        """Return users ordered by id, optionally seeking past ``after``."""
+        stmt = select(UserORM).options(*_USER_ROW).order_by(UserORM.id).limit(limit)
+        if after is not None:
+            stmt = stmt.where(UserORM.id > after)
+        result = await self.db.execute(stmt)
         return [_to_user_model(r) for r in result.scalars().all()]
 
+    async def existing_ids(self, user_ids: Iterable[UUID]) -> Set[UUID]:
+        """Return the subset of ``user_ids`` that exist, in one query."""
+        result = await self.db.execute(select(UserORM.id).where(UserORM.id.in_(list(user_ids))))
+        return set(result.scalars().all())
+
     async def get_by_email(self, email: str) -> Optional[User]:
-        result = await self.db.execute(select(UserORM).where(UserORM.email == email))
+        result = await self.db.execute(select(UserORM).options(*_USER_ROW).where(UserORM.email == email))
         row = result.scalar_one_or_none()
         if not row:
             return None
         return _to_user_model(row)
 
 
-class SQLAlchemyGroupRepository(GroupRepository):
-    def __init__(self, db: AsyncSession) -> None:
-        self.db = db
+class SQLAlchemyGroupRepository(_SessionRepository, GroupRepository):
 
-    async def add(self, group: Group) -> None:
-        row = GroupORM(id=group.id, name=group.name)
-        self.db.add(row)
-        await self.db.commit()
+    async def add(self, group: Group) -> Group:
+        row = (
+            await self.db.execute(
+                insert(GroupORM).values(id=group.id, name=group.name).returning(GroupORM.id, GroupORM.name)
+            )
+        ).one()
+        await self._commit()
+        return Group(id=row.id, name=row.name)
 
-    async def add_member(self, group_id: UUID, user_id: UUID) -> None:
-        group = await self.db.get(GroupORM, group_id)
-        user = await self.db.get(UserORM, user_id)
-        if group and user:
-            group.members.append(user)
-            await self.db.commit()
+    async def add_member(self, group_id: UUID, user_id: UUID) -> Group:
+        """Add ``user_id`` to ``group_id`` with a zero ledger row and return the group.
 
-    async def list_for_user(self, user_id: UUID) -> List[Group]:
-        # Load groups and their members in a single async query to avoid
-        # triggering lazy loads (which cause MissingGreenlet in async engines).
-        from sqlalchemy import select
-        from sqlalchemy.orm import selectinload
+        The existence checks run inside the INSERT and the group comes back
+        through RETURNING; on PostgreSQL the ledger row is seeded in the same
+        statement. Adding an existing member is a no-op. Raises
+        ``UserNotFoundError`` or ``GroupNotFoundError``.
+        """
+        upsert = _dialect_insert(self.db)
+        joined = (
+            upsert(group_members)
+            .from_select(
+                ["group_id", "user_id"],
+                select(
+                    literal(group_id, group_members.c.group_id.type),
+                    literal(user_id, group_members.c.user_id.type),
+                ).where(exists().where(GroupORM.id == group_id), exists().where(UserORM.id == user_id)),
+            )
+            .on_conflict_do_nothing(index_elements=["group_id", "user_id"])
+            .returning(
+                group_members.c.user_id,
+                select(GroupORM.name).where(GroupORM.id == group_id).scalar_subquery().label("name"),
+                _member_ids(self.db, group_id).label("members"),
+            )
+        )
 
-        result = await self.db.execute(
-            select(GroupORM).join(GroupORM.members).where(UserORM.id == user_id).options(selectinload(GroupORM.members))
+        if self.db.get_bind().dialect.name == "postgresql":
+            new = joined.cte("new_member")
+            ledger = pg_insert(GroupBalanceORM).from_select(
+                ["group_id", "user_id", "paid_cents"],
+                select(literal(group_id, GroupBalanceORM.group_id.type), new.c.user_id, literal(0)),
+            )
+            ledger = ledger.on_conflict_do_nothing(index_elements=["group_id", "user_id"])
+            row = (
+                await self.db.execute(select(new.c.name, new.c.members).add_cte(ledger.cte("seed_ledger")))
+            ).first()
+        else:
+            row = (await self.db.execute(joined)).first()
+            if row is not None:
+                await self.db.execute(
+                    upsert(GroupBalanceORM)
+                    .values(group_id=group_id, user_id=user_id, paid_cents=0)
+                    .on_conflict_do_nothing(index_elements=["group_id", "user_id"])
+                )
+
+        if row is None:
+            user_exists, group_exists = (
+                await self.db.execute(
+                    select(exists().where(UserORM.id == user_id), exists().where(GroupORM.id == group_id))
+                )
+            ).one()
+            if not user_exists:
+                raise UserNotFoundError(str(user_id))
+            if not group_exists:
+                raise GroupNotFoundError(str(group_id))
+            return await self.get(group_id)
+
+        await self._commit()
+        members = _decode_member_ids(row.members)
+        if user_id not in members:
+            members.append(user_id)
+        return Group(id=group_id, name=row.name, members=members)
+
+    async def list_for_user(
+        self, user_id: UUID, limit: Optional[int] = None, after: Optional[UUID] = None
+    ) -> List[Group]:
+        stmt = (
+            _group_rows(self.db)
+            .where(GroupORM.id.in_(select(group_members.c.group_id).where(group_members.c.user_id == user_id)))
+            .order_by(GroupORM.id)
+            .limit(limit)
         )
-        groups = result.scalars().all()
-        return [_to_group_model(g) for g in groups]
+        if after is not None:
+            stmt = stmt.where(GroupORM.id > after)
+        result = await self.db.execute(stmt)
+        return [_to_group_model(r) for r in result.all()]
 
     # Extra helpers not in interface
     async def get(self, group_id: UUID) -> Optional[Group]:
-        row = await self.db.get(GroupORM, group_id)
-        if not row:
+        row = (await self.db.execute(_group_rows(self.db).where(GroupORM.id == group_id))).first()
+        if row is None:
             return None
         return _to_group_model(row)
 
-    async def list_all(self) -> List[Group]:
-        result = await self.db.execute(select(GroupORM))
-        return [_to_group_model(r) for r in result.scalars().all()]
+    async def list_all(self, limit: Optional[int] = None, after: Optional[UUID] = None) -> List[Group]:
+        """Return groups ordered by id, optionally seeking past ``after``."""
+        stmt = _group_rows(self.db).order_by(GroupORM.id).limit(limit)
+        if after is not None:
+            stmt = stmt.where(GroupORM.id > after)
+        result = await self.db.execute(stmt)
+        return [_to_group_model(r) for r in result.all()]
 
-    async def update_name(self, _group_id: UUID, _name: str) -> None:
-        row = await self.db.get(GroupORM, _group_id)
-        if row:
-            row.name = _name
-            await self.db.commit()
+    async def existing_ids(self, group_ids: Iterable[UUID]) -> Set[UUID]:
+        """Return the subset of ``group_ids`` that exist, in one query."""
+        result = await self.db.execute(select(GroupORM.id).where(GroupORM.id.in_(list(group_ids))))
+        return set(result.scalars().all())
+
+    async def memberships(
+        self, group_ids: Iterable[UUID], user_ids: Iterable[UUID]
+    ) -> Set[Tuple[UUID, UUID]]:
+        """Return existing ``(group_id, user_id)`` pairs among the given ids, in one query."""
+        result = await self.db.execute(
+            select(group_members.c.group_id, group_members.c.user_id).where(
+                group_members.c.group_id.in_(list(group_ids)),
+                group_members.c.user_id.in_(list(user_ids)),
+            )
+        )
+        return {(group_id, user_id) for group_id, user_id in result.all()}
 
+    async def update_name(self, _group_id: UUID, _name: str) -> Optional[Group]:
+        """Rename a group and return it, or ``None`` if it does not exist."""
+        row = (
+            await self.db.execute(
+                update(GroupORM)
+                .where(GroupORM.id == _group_id)
+                .values(name=_name)
+                .returning(GroupORM.id, GroupORM.name, _member_ids(self.db, GroupORM.id).label("members"))
+            )
+        ).first()
+        await self._commit()
+        if row is None:
+            return None
+        return _to_group_model(row)
 
-class SQLAlchemyExpenseRepository(ExpenseRepository):
-    def __init__(self, db: AsyncSession) -> None:
-        self.db = db
 
-    async def add(self, expense: Expense) -> ExpenseORM:
-        row = ExpenseORM(
-            id=expense.id,
-            group_id=expense.group_id,
-            payer_id=expense.payer_id,
-            amount=expense.amount,
-            created_at=expense.created_at,
-            description=expense.description,
+class SQLAlchemyExpenseRepository(_SessionRepository, ExpenseRepository):
+
+    async def add(self, expense: Expense) -> Expense:
+        """Insert ``expense`` with its ledger credit and rollup; see :meth:`_insert`."""
+        row = await self._insert(insert(ExpenseORM).values(**_expense_values(expense)), expense)
+        await self._commit()
+        return expense.model_copy(update={"created_at": _as_utc(row.created_at)})
+
+    async def add_for_member(self, expense: Expense) -> Expense:
+        """Insert ``expense`` only if its payer belongs to its group.
+
+        The membership check, insert, ledger credit and rollup happen in one
+        statement on PostgreSQL (data-modifying CTEs); elsewhere the insert
+        is followed by the upserts in the same transaction. No group or user
+        rows are loaded, so the cost does not depend on the group's size.
+        Returns the expense with its stored ``created_at``.
+
+        Raises ``GroupNotFoundError``, ``PayerNotFoundError`` or
+        ``NotGroupMemberError`` when nothing was inserted.
+        """
+        is_member = exists().where(
+            group_members.c.group_id == expense.group_id, group_members.c.user_id == expense.payer_id
         )
-        self.db.add(row)
-        await self.db.commit()
-        await self.db.refresh(row)
+        values = _expense_values(expense)
+        inserted = insert(ExpenseORM).from_select(
+            list(values),
+            select(*(literal(v, ExpenseORM.__table__.c[k].type).label(k) for k, v in values.items())).where(
+                is_member
+            ),
+        )
+
+        row = await self._insert(inserted, expense)
+        if row is None:
+            await self._rollback()
+            group_exists, payer_exists = (
+                await self.db.execute(
+                    select(
+                        exists().where(GroupORM.id == expense.group_id),
+                        exists().where(UserORM.id == expense.payer_id),
+                    )
+                )
+            ).one()
+            if not group_exists:
+                raise GroupNotFoundError(str(expense.group_id))
+            if not payer_exists:
+                raise PayerNotFoundError(str(expense.payer_id))
+            raise NotGroupMemberError(f"{expense.payer_id} is not a member of {expense.group_id}")
+
+        await self._commit()
+        return expense.model_copy(update={"created_at": _as_utc(row.created_at)})
+
+    async def _insert(self, inserted, expense: Expense) -> Optional[Row]:
+        """Run ``inserted`` for ``expense`` plus its ledger credit and rollup.
+
+        On PostgreSQL the upserts ride along as data-modifying CTEs, so the
+        write is one statement; SQLite has no writable CTEs and runs them
+        after the insert. Returns the stored ``created_at``, or ``None`` if
+        nothing was inserted.
+        """
+        if self.db.get_bind().dialect.name == "postgresql":
+            return (await self.db.execute(self._insert_with_ledger(inserted, expense))).first()
+        row = (await self.db.execute(inserted.returning(ExpenseORM.created_at))).first()
+        if row is not None:
+            await self._credit_payers({(expense.group_id, expense.payer_id): payer_credit_cents(expense.amount)})
+            await self._roll_up([expense])
         return row
 
-    async def list_for_group(self, group_id: UUID) -> List[Expense]:
-        result = await self.db.execute(select(ExpenseORM).where(ExpenseORM.group_id == group_id))
+    def _insert_with_ledger(self, inserted, expense: Expense) -> Select:
+        """Chain the ledger credit and rollup onto ``inserted`` as PostgreSQL CTEs."""
+        new = inserted.returning(
+            ExpenseORM.group_id, ExpenseORM.payer_id, ExpenseORM.amount, ExpenseORM.created_at
+        ).cte("new_expense")
+
+        ledger = pg_insert(GroupBalanceORM).from_select(
+            ["group_id", "user_id", "paid_cents"],
+            select(new.c.group_id, new.c.payer_id, literal(payer_credit_cents(expense.amount))),
+        )
+        ledger = ledger.on_conflict_do_update(
+            index_elements=["group_id", "user_id"],
+            set_={"paid_cents": GroupBalanceORM.paid_cents + ledger.excluded.paid_cents},
+        )
+
+        rollup = pg_insert(ExpenseRollupORM).from_select(
+            ["group_id", "payer_id", "day", "amount_cents", "expense_count"],
+            select(new.c.group_id, new.c.payer_id, _utc_day(self.db, new.c.created_at), new.c.amount, literal(1)),
+        )
+        rollup = rollup.on_conflict_do_update(
+            index_elements=["group_id", "payer_id", "day"],
+            set_={
+                "amount_cents": ExpenseRollupORM.amount_cents + rollup.excluded.amount_cents,
+                "expense_count": ExpenseRollupORM.expense_count + rollup.excluded.expense_count,
+            },
+        )
+        return select(new.c.created_at).add_cte(ledger.cte("credit_payer"), rollup.cte("roll_up"))
+
+    async def add_many(self, expenses: List[Expense]) -> None:
+        """Persist many expenses and their ledger credits in one transaction.
+
+        Uses ``COPY`` on PostgreSQL and a multi-row ``INSERT`` elsewhere.
+        """
+        credits: Dict[Tuple[UUID, UUID], int] = {}
+        for e in expenses:
+            key = (e.group_id, e.payer_id)
+            credits[key] = credits.get(key, 0) + payer_credit_cents(e.amount)
+        # Run first so the transaction is open before COPY uses the raw connection
+        await self._credit_payers(credits)
+        await self._roll_up(expenses)
+
+        columns = ["id", "group_id", "payer_id", "amount", "created_at", "description"]
+        rows = [
+            {**e.model_dump(include=set(columns)), "created_at": _as_utc(e.created_at)} for e in expenses
+        ]
+        if self.db.get_bind().dialect.name == "postgresql":
+            conn = await self.db.connection()
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                ExpenseORM.__tablename__,
+                records=[tuple(row[c] for c in columns) for row in rows],
+                columns=columns,
+            )
+        else:
+            await self.db.execute(insert(ExpenseORM), rows)
+        await self._commit()
+
+    async def _credit_payers(self, credits: Dict[Tuple[UUID, UUID], int]) -> None:
+        """Add payer credits to the ``group_balances`` ledger."""
+        if not credits:
+            return
+        upsert = _dialect_insert(self.db)
+        stmt = upsert(GroupBalanceORM)
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["group_id", "user_id"],
+                set_={"paid_cents": GroupBalanceORM.paid_cents + stmt.excluded.paid_cents},
+            ),
+            [
+                {"group_id": group_id, "user_id": payer_id, "paid_cents": cents}
+                for (group_id, payer_id), cents in credits.items()
+            ],
+        )
+
+    async def _roll_up(self, expenses: Iterable[Expense]) -> None:
+        """Add expenses to the per-day ``expense_rollups``."""
+        buckets: Dict[Tuple[UUID, UUID, date], List[int]] = {}
+        for e in expenses:
+            bucket = buckets.setdefault((e.group_id, e.payer_id, _as_utc(e.created_at).date()), [0, 0])
+            bucket[0] += e.amount
+            bucket[1] += 1
+        if not buckets:
+            return
+        upsert = _dialect_insert(self.db)
+        stmt = upsert(ExpenseRollupORM)
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["group_id", "payer_id", "day"],
+                set_={
+                    "amount_cents": ExpenseRollupORM.amount_cents + stmt.excluded.amount_cents,
+                    "expense_count": ExpenseRollupORM.expense_count + stmt.excluded.expense_count,
+                },
+            ),
+            [
+                {
+                    "group_id": group_id,
+                    "payer_id": payer_id,
+                    "day": day,
+                    "amount_cents": amount,
+                    "expense_count": count,
+                }
+                for (group_id, payer_id, day), (amount, count) in buckets.items()
+            ],
+        )
+
+    async def list_for_group(
+        self,
+        group_id: UUID,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        filters: Optional[ExpenseFilter] = None,
+    ) -> List[Expense]:
+        """Return a group's expenses ordered by ``(created_at, id)``, optionally filtered."""
+        stmt = select(ExpenseORM).where(ExpenseORM.group_id == group_id)
+        stmt = _expense_page(_apply_expense_filter(self.db, stmt, filters), limit, after)
+        result = await self.db.execute(stmt)
         return [_to_expense_model(r) for r in result.scalars().all()]
 
+    async def stream_for_group(
+        self, group_id: UUID, batch_size: int = 1000, include_archived: bool = True
+    ) -> AsyncIterator[List[Expense]]:
+        """Yield a group's expenses in ``(created_at, id)`` order, ``batch_size`` at a time.
+
+        Archived segments come first, one file at a time, followed by the live
+        rows. Those use a server-side cursor and select plain columns, so rows
+        are not kept in the session identity map and memory stays bounded.
+        """
+        if include_archived:
+            for path in await self._segment_paths(group_id):
+                archived = await asyncio.to_thread(_read_segment, path)
+                for start in range(0, len(archived), batch_size):
+                    yield archived[start : start + batch_size]
+
+        columns = (
+            ExpenseORM.id,
+            ExpenseORM.group_id,
+            ExpenseORM.payer_id,
+            ExpenseORM.amount,
+            ExpenseORM.created_at,
+            ExpenseORM.description,
+        )
+        stmt = _expense_page(select(*columns).where(ExpenseORM.group_id == group_id), None, None)
+        result = await self.db.stream(stmt.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield [Expense(**{**row._mapping, "created_at": _as_utc(row.created_at)}) for row in rows]
+
+    async def sum_by_payer(
+        self,
+        group_id: UUID,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[PayerTotal]:
+        """Aggregate a group's expenses per payer in the database.
+
+        ``since`` (exclusive) and ``until`` (inclusive) bound ``created_at``.
+        """
+        amount = cast(ExpenseORM.amount, Integer)
+        stmt = (
+            select(
+                ExpenseORM.payer_id,
+                func.sum(amount),
+                func.sum(amount // 100) * 100,
+                func.count(),
+            )
+            .where(ExpenseORM.group_id == group_id)
+            .group_by(ExpenseORM.payer_id)
+        )
+        if since is not None:
+            stmt = stmt.where(ExpenseORM.created_at > _as_utc(since))
+        if until is not None:
+            stmt = stmt.where(ExpenseORM.created_at <= _as_utc(until))
+        result = await self.db.execute(stmt)
+        totals = [
+            PayerTotal(payer_id=payer_id, amount=total, credited=credited, count=count)
+            for payer_id, total, credited, count in result.all()
+        ]
+        archived = await self._archived_payer_totals(group_id, since, until)
+        return _merge_payer_totals(totals, archived) if archived else totals
+
+    async def _archived_before(self, group_id: UUID) -> Optional[datetime]:
+        """Return the instant before which the group's expenses are archived, if any."""
+        day = (
+            await self.db.execute(
+                select(func.max(ExpenseSegmentORM.archived_before)).where(
+                    ExpenseSegmentORM.group_id == group_id
+                )
+            )
+        ).scalar_one()
+        return datetime.combine(day, time.min, tzinfo=timezone.utc) if day is not None else None
+
+    async def _segment_paths(
+        self, group_id: UUID, since: Optional[datetime] = None, until: Optional[datetime] = None
+    ) -> List[str]:
+        """Return the group's segment files overlapping ``(since, until]``, oldest first."""
+        stmt = select(ExpenseSegmentORM.path).where(ExpenseSegmentORM.group_id == group_id)
+        if since is not None:
+            stmt = stmt.where(ExpenseSegmentORM.last_created_at > _as_utc(since))
+        if until is not None:
+            stmt = stmt.where(ExpenseSegmentORM.first_created_at <= _as_utc(until))
+        stmt = stmt.order_by(ExpenseSegmentORM.first_created_at)
+        return list((await self.db.execute(stmt)).scalars().all())
+
+    async def _archived_payer_totals(
+        self, group_id: UUID, since: Optional[datetime], until: Optional[datetime]
+    ) -> List[PayerTotal]:
+        """Payer totals of archived expenses in ``(since, until]``.
+
+        Windows covering the whole archive are answered from the carry-forward
+        totals; partial windows scan the overlapping segments.
+        """
+        archived_before = await self._archived_before(group_id)
+        if archived_before is None or (since is not None and _as_utc(since) >= archived_before):
+            return []
+        if since is None and (until is None or _as_utc(until) >= archived_before):
+            result = await self.db.execute(
+                select(
+                    ArchivedBalanceORM.user_id,
+                    ArchivedBalanceORM.amount_cents,
+                    ArchivedBalanceORM.paid_cents,
+                    ArchivedBalanceORM.expense_count,
+                ).where(ArchivedBalanceORM.group_id == group_id)
+            )
+            return [
+                PayerTotal(payer_id=user_id, amount=amount, credited=credited, count=count)
+                for user_id, amount, credited, count in result.all()
+            ]
+        paths = await self._segment_paths(group_id, since, until)
+        return await asyncio.to_thread(_segment_payer_totals, paths, since, until)
+
+    async def archived_credits(self, group_id: UUID) -> Dict[UUID, int]:
+        """Return the carry-forward payer credits, in cents, of the group's archived expenses."""
+        result = await self.db.execute(
+            select(ArchivedBalanceORM.user_id, ArchivedBalanceORM.paid_cents).where(
+                ArchivedBalanceORM.group_id == group_id
+            )
+        )
+        return {user_id: cents for user_id, cents in result.all()}
+
+    async def totals_for_member(self, user_id: UUID) -> List[MemberGroupTotal]:
+        """Aggregate every group a user belongs to in a single statement over ``group_balances``."""
+        groups = select(group_members.c.group_id).where(group_members.c.user_id == user_id)
+        counts = (
+            select(group_members.c.group_id, func.count().label("member_count"))
+            .where(group_members.c.group_id.in_(groups))
+            .group_by(group_members.c.group_id)
+            .subquery()
+        )
+        # The ledger already holds live and archived credits, so no expense is read
+        credits = (
+            select(
+                GroupBalanceORM.group_id,
+                func.sum(GroupBalanceORM.paid_cents).label("group_credited"),
+                func.sum(case((GroupBalanceORM.user_id == user_id, GroupBalanceORM.paid_cents), else_=0)).label(
+                    "member_credited"
+                ),
+            )
+            .where(GroupBalanceORM.group_id.in_(groups))
+            .group_by(GroupBalanceORM.group_id)
+            .subquery()
+        )
+        result = await self.db.execute(
+            select(
+                counts.c.group_id,
+                counts.c.member_count,
+                func.coalesce(credits.c.group_credited, 0),
+                func.coalesce(credits.c.member_credited, 0),
+            ).outerjoin(credits, credits.c.group_id == counts.c.group_id)
+        )
+        return [
+            MemberGroupTotal(
+                group_id=group_id,
+                member_count=member_count,
+                group_credited=group_credited,
+                member_credited=member_credited,
+            )
+            for group_id, member_count, group_credited, member_credited in result.all()
+        ]
+
+    async def paid_totals_as_of(self, group_id: UUID, as_of: datetime) -> Dict[UUID, int]:
+        """Return payer credits for a group as they stood at ``as_of``.
+
+        Loads the nearest checkpoint at or before ``as_of`` and replays only the
+        expenses created after it.
+        """
+        as_of = _as_utc(as_of)
+        checkpoint_at = (
+            await self.db.execute(
+                select(func.max(BalanceCheckpointORM.checkpoint_at)).where(
+                    BalanceCheckpointORM.group_id == group_id,
+                    BalanceCheckpointORM.checkpoint_at <= as_of,
+                )
+            )
+        ).scalar_one()
+
+        paid: Dict[UUID, int] = {}
+        if checkpoint_at is not None:
+            result = await self.db.execute(
+                select(BalanceCheckpointORM.user_id, BalanceCheckpointORM.paid_cents).where(
+                    BalanceCheckpointORM.group_id == group_id,
+                    BalanceCheckpointORM.checkpoint_at == checkpoint_at,
+                )
+            )
+            paid = {user_id: cents for user_id, cents in result.all()}
+
+        for total in await self.sum_by_payer(group_id, since=checkpoint_at, until=as_of):
+            paid[total.payer_id] = paid.get(total.payer_id, 0) + total.credited
+        return paid
+
+    async def write_checkpoints(
+        self,
+        interval: timedelta,
+        group_id: Optional[UUID] = None,
+        full: bool = False,
+        now: Optional[datetime] = None,
+    ) -> int:
+        """Write balance checkpoints on boundaries spaced ``interval`` apart.
+
+        Each group continues after its own latest checkpoint; a group without
+        one starts from its archived totals and first expense.  With ``full``
+        set, existing checkpoints are discarded and rebuilt from the first
+        expense.  A group only gets a checkpoint for boundaries after which its
+        totals changed.  Returns the number of checkpoint rows written.
+        """
+        now = _as_utc(now or datetime.now(timezone.utc))
+        checkpoint_scope = []
+        expense_scope = []
+        archive_scope = []
+        if group_id is not None:
+            checkpoint_scope.append(BalanceCheckpointORM.group_id == group_id)
+            expense_scope.append(ExpenseORM.group_id == group_id)
+            archive_scope.append(ArchivedBalanceORM.group_id == group_id)
+        if full:
+            await self.db.execute(delete(BalanceCheckpointORM).where(*checkpoint_scope))
+
+        # Each group resumes after its own latest checkpoint
+        latest = (
+            select(
+                BalanceCheckpointORM.group_id,
+                func.max(BalanceCheckpointORM.checkpoint_at).label("checkpoint_at"),
+            )
+            .where(*checkpoint_scope)
+            .group_by(BalanceCheckpointORM.group_id)
+            .subquery()
+        )
+        result = await self.db.execute(
+            select(
+                BalanceCheckpointORM.group_id,
+                BalanceCheckpointORM.user_id,
+                BalanceCheckpointORM.paid_cents,
+            ).join(
+                latest,
+                (BalanceCheckpointORM.group_id == latest.c.group_id)
+                & (BalanceCheckpointORM.checkpoint_at == latest.c.checkpoint_at),
+            )
+        )
+        cumulative: Dict[Tuple[UUID, UUID], int] = {}
+        resumed: Set[UUID] = set()
+        for gid, uid, cents in result.all():
+            cumulative[(gid, uid)] = cents
+            resumed.add(gid)
+
+        # Groups without checkpoints start from their archived totals, which predate every live expense
+        result = await self.db.execute(
+            select(ArchivedBalanceORM.group_id, ArchivedBalanceORM.user_id, ArchivedBalanceORM.paid_cents).where(
+                *archive_scope
+            )
+        )
+        for gid, uid, cents in result.all():
+            if gid not in resumed:
+                cumulative[(gid, uid)] = cents
+
+        # The first boundary with anything new: after a group's checkpoint, or at its first expense
+        pending = (
+            select(func.min(ExpenseORM.created_at))
+            .select_from(ExpenseORM)
+            .outerjoin(latest, latest.c.group_id == ExpenseORM.group_id)
+            .where(
+                *expense_scope,
+                or_(latest.c.checkpoint_at.is_(None), ExpenseORM.created_at > latest.c.checkpoint_at),
+            )
+        )
+        first = (await self.db.execute(pending)).scalar_one()
+        if first is None:
+            await self.db.commit()
+            return 0
+        boundary = _next_boundary(first, interval)
+
+        amount = cast(ExpenseORM.amount, Integer)
+        previous: Optional[datetime] = None
+        written = 0
+        while boundary <= now:
+            # Checkpoints written by earlier iterations move ``latest`` up to ``previous``,
+            # which the window below already excludes
+            credits = (
+                select(ExpenseORM.group_id, ExpenseORM.payer_id, func.sum(amount // 100) * 100)
+                .outerjoin(latest, latest.c.group_id == ExpenseORM.group_id)
+                .where(
+                    *expense_scope,
+                    ExpenseORM.created_at <= boundary,
+                    or_(latest.c.checkpoint_at.is_(None), ExpenseORM.created_at > latest.c.checkpoint_at),
+                )
+                .group_by(ExpenseORM.group_id, ExpenseORM.payer_id)
+            )
+            if previous is not None:
+                credits = credits.where(ExpenseORM.created_at > previous)
+
+            changed: Set[UUID] = set()
+            for gid, uid, credited in (await self.db.execute(credits)).all():
+                cumulative[(gid, uid)] = cumulative.get((gid, uid), 0) + credited
+                changed.add(gid)
+
+            rows = [
+                {"group_id": gid, "user_id": uid, "checkpoint_at": boundary, "paid_cents": cents}
+                for (gid, uid), cents in cumulative.items()
+                if gid in changed
+            ]
+            if rows:
+                await self.db.execute(insert(BalanceCheckpointORM), rows)
+                written += len(rows)
+            previous = boundary
+            boundary += interval
+
+        await self.db.commit()
+        return written
+
     # Extra helpers not in interface
     async def get(self, expense_id: UUID) -> Optional[Expense]:
         row = await self.db.get(ExpenseORM, expense_id)
@@ -185,6 +1205,262 @@ class SQLAlchemyExpenseRepository(ExpenseRepository):
             return None
         return _to_expense_model(row)
 
-    async def list_all(self) -> List[Expense]:
-        result = await self.db.execute(select(ExpenseORM))
+    async def list_all(
+        self, limit: Optional[int] = None, after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[Expense]:
+        """Return expenses ordered by ``(created_at, id)``, optionally seeking past ``after``."""
+        result = await self.db.execute(_expense_page(select(ExpenseORM), limit, after))
         return [_to_expense_model(r) for r in result.scalars().all()]
+
+    async def paid_totals(self, group_id: UUID) -> Dict[UUID, int]:
+        """Return payer credits for a group from the ``group_balances`` ledger."""
+        result = await self.db.execute(
+            select(GroupBalanceORM.user_id, GroupBalanceORM.paid_cents).where(
+                GroupBalanceORM.group_id == group_id
+            )
+        )
+        return {user_id: paid for user_id, paid in result.all()}
+
+    async def rebuild_balances(self, group_id: Optional[UUID] = None) -> int:
+        """Rebuild the ``group_balances`` ledger from ``expenses`` and archived carry-forwards.
+
+        Rebuilds a single group when ``group_id`` is given, otherwise every
+        group.  Returns the number of ledger rows written.
+        """
+        clear = delete(GroupBalanceORM)
+        live = select(
+            ExpenseORM.group_id.label("group_id"),
+            ExpenseORM.payer_id.label("user_id"),
+            (func.sum(cast(ExpenseORM.amount, Integer) // 100) * 100).label("paid_cents"),
+        ).group_by(ExpenseORM.group_id, ExpenseORM.payer_id)
+        archived = select(ArchivedBalanceORM.group_id, ArchivedBalanceORM.user_id, ArchivedBalanceORM.paid_cents)
+        if group_id is not None:
+            live = live.where(ExpenseORM.group_id == group_id)
+            archived = archived.where(ArchivedBalanceORM.group_id == group_id)
+        # Live expenses plus the carry-forward credits of archived ones
+        source = union_all(live, archived).subquery()
+        credits = select(source.c.group_id, source.c.user_id, func.sum(source.c.paid_cents)).group_by(
+            source.c.group_id, source.c.user_id
+        )
+        members = select(group_members.c.group_id, group_members.c.user_id, literal(0)).where(
+            ~select(GroupBalanceORM.user_id)
+            .where(
+                GroupBalanceORM.group_id == group_members.c.group_id,
+                GroupBalanceORM.user_id == group_members.c.user_id,
+            )
+            .exists()
+        )
+        if group_id is not None:
+            clear = clear.where(GroupBalanceORM.group_id == group_id)
+            members = members.where(group_members.c.group_id == group_id)
+
+        columns = ["group_id", "user_id", "paid_cents"]
+        await self.db.execute(clear)
+        await self.db.execute(insert(GroupBalanceORM).from_select(columns, credits))
+        await self.db.execute(insert(GroupBalanceORM).from_select(columns, members))
+        await self.db.commit()
+
+        count = select(func.count()).select_from(GroupBalanceORM)
+        if group_id is not None:
+            count = count.where(GroupBalanceORM.group_id == group_id)
+        return (await self.db.execute(count)).scalar_one()
+
+    async def spend_report(self, group_id: UUID, granularity: str = "day") -> List[SpendBucket]:
+        """Return a group's spend per payer per ``day`` or ``month`` from ``expense_rollups``.
+
+        Buckets are ordered by period, then payer.
+        """
+        period = ExpenseRollupORM.day
+        if granularity == "month":
+            period = _month_start(self.db, ExpenseRollupORM.day)
+        elif granularity != "day":
+            raise ValueError(f"Unsupported granularity: {granularity}")
+
+        stmt = (
+            select(
+                period.label("period"),
+                ExpenseRollupORM.payer_id,
+                func.sum(ExpenseRollupORM.amount_cents),
+                func.sum(ExpenseRollupORM.expense_count),
+            )
+            .where(ExpenseRollupORM.group_id == group_id)
+            .group_by(period, ExpenseRollupORM.payer_id)
+            .order_by(period, ExpenseRollupORM.payer_id)
+        )
+        result = await self.db.execute(stmt)
+        return [
+            SpendBucket(period=p, payer_id=payer_id, amount=int(amount), count=int(count))
+            for p, payer_id, amount, count in result.all()
+        ]
+
+    async def rebuild_rollups(self, group_id: Optional[UUID] = None) -> int:
+        """Rebuild ``expense_rollups`` from ``expenses``.
+
+        Rebuilds a single group when ``group_id`` is given, otherwise every
+        group.  Days before a group's archive cutoff are kept as they are,
+        since their expenses now live in segment files.  Returns the number
+        of rollup rows for the scope.
+        """
+        day = _utc_day(self.db, ExpenseORM.created_at)
+        archived_day = (
+            select(ExpenseSegmentORM.id)
+            .where(
+                ExpenseSegmentORM.group_id == ExpenseRollupORM.group_id,
+                ExpenseSegmentORM.archived_before > ExpenseRollupORM.day,
+            )
+            .exists()
+        )
+        clear = delete(ExpenseRollupORM).where(~archived_day)
+        buckets = select(
+            ExpenseORM.group_id,
+            ExpenseORM.payer_id,
+            day,
+            func.sum(ExpenseORM.amount),
+            func.count(),
+        ).group_by(ExpenseORM.group_id, ExpenseORM.payer_id, day)
+        if group_id is not None:
+            clear = clear.where(ExpenseRollupORM.group_id == group_id)
+            buckets = buckets.where(ExpenseORM.group_id == group_id)
+
+        await self.db.execute(clear)
+        await self.db.execute(
+            insert(ExpenseRollupORM).from_select(
+                ["group_id", "payer_id", "day", "amount_cents", "expense_count"], buckets
+            )
+        )
+        await self.db.commit()
+
+        count = select(func.count()).select_from(ExpenseRollupORM)
+        if group_id is not None:
+            count = count.where(ExpenseRollupORM.group_id == group_id)
+        return (await self.db.execute(count)).scalar_one()
+
+    async def archive_expenses(self, before: date, archive_dir: Path, group_id: Optional[UUID] = None) -> int:
+        """Move expenses created before midnight UTC on ``before`` into segment files.
+
+        Each group with old expenses gets one segment under
+        ``archive_dir/<group_id>/``, a catalog row and updated carry-forward
+        totals, and its archived rows are deleted, committing per group. The
+        ledger is left untouched because it already includes those credits.
+        Returns the number of expenses archived.
+
+        Raises ``ValueError`` when balance checkpoints exist but end before the
+        cutoff, because later incremental checkpoints only see live rows.
+        """
+        cutoff = datetime.combine(before, time.min, tzinfo=timezone.utc)
+        latest_checkpoint = (
+            await self.db.execute(select(func.max(BalanceCheckpointORM.checkpoint_at)))
+        ).scalar_one()
+        if latest_checkpoint is not None and _as_utc(latest_checkpoint) < cutoff:
+            raise ValueError("Balance checkpoints end before the archive cutoff; write checkpoints first")
+
+        scope = [ExpenseORM.created_at < cutoff]
+        if group_id is not None:
+            scope.append(ExpenseORM.group_id == group_id)
+        group_ids = (await self.db.execute(select(ExpenseORM.group_id).where(*scope).distinct())).scalars().all()
+
+        columns = (
+            ExpenseORM.id,
+            ExpenseORM.group_id,
+            ExpenseORM.payer_id,
+            ExpenseORM.amount,
+            ExpenseORM.created_at,
+            ExpenseORM.description,
+        )
+        archived = 0
+        for gid in group_ids:
+            in_group = [ExpenseORM.group_id == gid, ExpenseORM.created_at < cutoff]
+            result = await self.db.execute(
+                select(*columns).where(*in_group).order_by(ExpenseORM.created_at, ExpenseORM.id)
+            )
+            expenses = [
+                Expense(**{**row._mapping, "created_at": _as_utc(row.created_at)}) for row in result.all()
+            ]
+            if not expenses:
+                # Its old rows were deleted since the groups were listed
+                continue
+            path = (archive_dir / str(gid) / f"{before:%Y%m%d}-{uuid4().hex}.seg").resolve()
+            await asyncio.to_thread(write_segment, path, gid, expenses)
+
+            self.db.add(
+                ExpenseSegmentORM(
+                    group_id=gid,
+                    path=str(path),
+                    row_count=len(expenses),
+                    first_created_at=expenses[0].created_at,
+                    last_created_at=expenses[-1].created_at,
+                    archived_before=before,
+                )
+            )
+            carry: Dict[UUID, List[int]] = {}
+            for e in expenses:
+                total = carry.setdefault(e.payer_id, [0, 0, 0])
+                total[0] += payer_credit_cents(e.amount)
+                total[1] += e.amount
+                total[2] += 1
+            upsert = _dialect_insert(self.db)
+            stmt = upsert(ArchivedBalanceORM)
+            await self.db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["group_id", "user_id"],
+                    set_={
+                        "paid_cents": ArchivedBalanceORM.paid_cents + stmt.excluded.paid_cents,
+                        "amount_cents": ArchivedBalanceORM.amount_cents + stmt.excluded.amount_cents,
+                        "expense_count": ArchivedBalanceORM.expense_count + stmt.excluded.expense_count,
+                    },
+                ),
+                [
+                    {
+                        "group_id": gid,
+                        "user_id": payer_id,
+                        "paid_cents": paid,
+                        "amount_cents": amount,
+                        "expense_count": count,
+                    }
+                    for payer_id, (paid, amount, count) in carry.items()
+                ],
+            )
+            # Delete exactly what was written, in case rows arrived since the select
+            ids = [e.id for e in expenses]
+            for start in range(0, len(ids), 1000):
+                await self.db.execute(
+                    delete(ExpenseORM).where(*in_group, ExpenseORM.id.in_(ids[start : start + 1000]))
+                )
+            await self.db.commit()
+            archived += len(expenses)
+        return archived
+
+
+class SQLAlchemyIdempotencyRepository:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def get(self, user_id: UUID, key: str) -> Optional[IdempotencyRecord]:
+        row = await self.db.get(IdempotencyKeyORM, (user_id, key))
+        if row is None:
+            return None
+        return IdempotencyRecord(
+            user_id=row.user_id,
+            key=row.key,
+            request_hash=row.request_hash,
+            status_code=row.status_code,
+            response_body=row.response_body,
+            created_at=_as_utc(row.created_at),
+        )
+
+    def stage(self, record: IdempotencyRecord) -> None:
+        """Add ``record`` to the session without committing.
+
+        It is committed together with the write it belongs to, so a stored
+        response always has a matching row and a concurrent retry with the
+        same key fails on the primary key instead of writing twice.
+        """
+        self.db.add(IdempotencyKeyORM(**record.model_dump()))
+
+    async def purge(self, before: datetime) -> int:
+        """Delete stored responses created before ``before``; returns the count."""
+        result = await self.db.execute(
+            delete(IdempotencyKeyORM).where(IdempotencyKeyORM.created_at < _as_utc(before))
+        )
+        await self.db.commit()
+        return result.rowcount
@@ -1,16 +1,20 @@
 import asyncio
 import os
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 from uuid import UUID as UUID_t
 
 import jwt
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from passlib.context import CryptContext
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..domain.models import User
+from .constants import TOKEN_VERSION_CACHE_SIZE, TOKEN_VERSION_CACHE_TTL_SECONDS
 from .database import get_db
 from .orm import UserORM
 from .secrets import get_secret
@@ -35,12 +39,21 @@ async def verify_password(plain_password: str, password_hash: str) -> bool:
     return await loop.run_in_executor(None, pwd_context.verify, plain_password, password_hash)
 
 
-def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
+def create_access_token(user: User, token_version: int, expires_delta: Optional[timedelta] = None) -> str:
+    """Issue a token carrying the principal's claims, so requests need not load the user.
+
+    ``token_version`` must be the user's current ``users.token_version``;
+    bumping that column revokes every token issued before.
+    """
     if expires_delta is None:
         expires_delta = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     now = datetime.now(tz=timezone.utc)
     payload = {
-        "sub": subject,
+        "sub": str(user.id),
+        "email": user.email,
+        "name": user.name,
+        "adm": user.is_admin,
+        "ver": token_version,
         "iat": int(now.timestamp()),
         "exp": int((now + expires_delta).timestamp()),
     }
@@ -57,6 +70,54 @@ def decode_token(token: str) -> dict:
         raise HTTPException(status_code=401, detail="Invalid token")
 
 
+class _TokenVersionCache:
+    """Bounded per-process cache of users' current token versions with a TTL.
+
+    Revocations made by another process take effect once its entry expires.
+    """
+
+    def __init__(self, ttl: float, maxsize: int) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[UUID_t, Tuple[int, float]]" = OrderedDict()
+
+    def get(self, user_id: UUID_t) -> Optional[int]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        version, expires = entry
+        if expires <= time.monotonic():
+            del self._entries[user_id]
+            return None
+        return version
+
+    def put(self, user_id: UUID_t, version: int) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        self._entries[user_id] = (version, time.monotonic() + self.ttl)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def discard(self, user_id: UUID_t) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+token_versions = _TokenVersionCache(TOKEN_VERSION_CACHE_TTL_SECONDS, TOKEN_VERSION_CACHE_SIZE)
+
+
+async def _current_token_version(db: AsyncSession, user_id: UUID_t) -> Optional[int]:
+    version = token_versions.get(user_id)
+    if version is None:
+        version = (await db.execute(select(UserORM.token_version).where(UserORM.id == user_id))).scalar()
+        if version is not None:
+            token_versions.put(user_id, version)
+    return version
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
     db: AsyncSession = Depends(get_db),
@@ -70,7 +131,12 @@ async def get_current_user(
         uid = UUID_t(str(sub))
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token subject")
-    row = await db.get(UserORM, uid)
-    if not row:
+    if not all(claim in payload for claim in ("email", "name", "adm", "ver")):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    version = await _current_token_version(db, uid)
+    if version is None:
         raise HTTPException(status_code=401, detail="User not found")
-    return User(id=row.id, email=row.email, name=row.name, is_admin=row.is_admin)
+    if version != payload["ver"]:
+        raise HTTPException(status_code=401, detail="Token revoked")
+    return User(id=uid, email=payload["email"], name=payload["name"], is_admin=payload["adm"])
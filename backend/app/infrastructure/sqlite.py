@@ -0,0 +1,67 @@
+"""Embedded SQLite mode, selected with ``DB_ENGINE_PROFILE=sqlite``.
+
+SQLite allows one writer at a time, and in WAL mode readers never block it
+or each other. The profile therefore builds two engines on the same file:
+
+- a writer with exactly one connection, so writes queue in the pool (for up
+  to ``pool_timeout``) instead of failing with "database is locked";
+- a reader pool of ``pool_size`` connections (one per core by default),
+  opened with ``query_only`` so a misrouted write fails loudly.
+
+Every connection sets ``journal_mode=WAL``, ``synchronous=NORMAL`` (durable
+at each checkpoint rather than each commit, and the database stays consistent),
+``mmap_size``, ``cache_size`` and ``busy_timeout`` when it is opened. It
+also turns on ``foreign_keys``, which PostgreSQL always enforces.
+"""
+
+from typing import Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from .constants import SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE_KIB, SQLITE_MMAP_SIZE_BYTES
+from .engine_profiles import EngineProfile, engine_options
+
+
+def pragmas(read_only: bool) -> Tuple[str, ...]:
+    statements = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE_BYTES}",
+        # Negative sizes are in KiB rather than pages
+        f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KIB}",
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        "PRAGMA foreign_keys=ON",
+    )
+    return (*statements, "PRAGMA query_only=ON") if read_only else statements
+
+
+def apply_pragmas(engine: AsyncEngine, read_only: bool = False) -> None:
+    """Run :func:`pragmas` on every new connection of ``engine``."""
+    statements = pragmas(read_only)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def sqlite_engines(url: str, profile: EngineProfile) -> Tuple[AsyncEngine, AsyncEngine]:
+    """Return the ``(writer, readers)`` engines for a SQLite database file."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite" or parsed.database in (None, "", ":memory:"):
+        raise ValueError("DB_ENGINE_PROFILE=sqlite needs DATABASE_URL to point at a SQLite database file")
+
+    # A local file needs no liveness check on checkout
+    writer = create_async_engine(
+        url, **{**engine_options(url, profile, "writer"), "pool_size": 1, "max_overflow": 0, "pool_pre_ping": False}
+    )
+    readers = create_async_engine(url, **{**engine_options(url, profile, "readers"), "pool_pre_ping": False})
+    apply_pragmas(writer)
+    apply_pragmas(readers, read_only=True)
+    return writer, readers
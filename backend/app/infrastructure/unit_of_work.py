@@ -0,0 +1,61 @@
+from typing import Callable, List
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..domain.unit_of_work import UnitOfWork
+from .database import get_db
+from .repositories import (
+    InMemoryExpenseRepository,
+    InMemoryGroupRepository,
+    InMemoryUserRepository,
+    SQLAlchemyExpenseRepository,
+    SQLAlchemyGroupRepository,
+    SQLAlchemyUserRepository,
+)
+
+
+class SQLAlchemyUnitOfWork(UnitOfWork):
+    """Unit of work over one ``AsyncSession``; its repositories only flush."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self.users = SQLAlchemyUserRepository(db, autocommit=False)
+        self.groups = SQLAlchemyGroupRepository(db, autocommit=False)
+        self.expenses = SQLAlchemyExpenseRepository(db, autocommit=False)
+
+    async def commit(self) -> None:
+        await self.db.commit()
+
+    async def rollback(self) -> None:
+        await self.db.rollback()
+
+
+class InMemoryUnitOfWork(UnitOfWork):
+    """Unit of work over shared in-memory repositories.
+
+    Writes are visible as soon as they are made; each one is journaled, and
+    ``rollback`` undoes this unit's writes newest first.
+    """
+
+    def __init__(
+        self,
+        users: InMemoryUserRepository,
+        groups: InMemoryGroupRepository,
+        expenses: InMemoryExpenseRepository,
+    ) -> None:
+        self._undo: List[Callable[[], None]] = []
+        self.users = users.journaled(self._undo)
+        self.groups = groups.journaled(self._undo)
+        self.expenses = expenses.journaled(self._undo)
+
+    async def commit(self) -> None:
+        self._undo.clear()
+
+    async def rollback(self) -> None:
+        while self._undo:
+            self._undo.pop()()
+
+
+def get_unit_of_work(db: AsyncSession = Depends(get_db)) -> SQLAlchemyUnitOfWork:
+    return SQLAlchemyUnitOfWork(db)
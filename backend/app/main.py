@@ -3,10 +3,11 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from .api import auth, expenses, groups, users
-from .infrastructure.constants import DEFAULT_GROUP_ID, DEFAULT_GROUP_NAME
-from .infrastructure.database import async_session_maker, engine
+from .infrastructure.constants import DEFAULT_GROUP_ID, DEFAULT_GROUP_NAME, READ_YOUR_WRITES_SECONDS
+from .infrastructure.database import async_session_maker, dispose_engines, engine, read_replicas
 from .infrastructure.orm import Base, GroupORM
-from .observability import init_tracing
+from .infrastructure.replicas import read_your_writes
+from .observability import init_metrics, init_tracing
 
 
 @asynccontextmanager
@@ -15,29 +16,30 @@ async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
-    # Seed default group — skip for SQLite (used in tests) to avoid UUID type issues
+    # Seed default group
     try:
-        if engine.url.get_backend_name() != "sqlite":
-            async with async_session_maker() as db:
-                row = await db.get(GroupORM, DEFAULT_GROUP_ID)
-                if not row:
-                    db.add(GroupORM(id=DEFAULT_GROUP_ID, name=DEFAULT_GROUP_NAME))
-                    await db.commit()
+        async with async_session_maker() as db:
+            row = await db.get(GroupORM, DEFAULT_GROUP_ID)
+            if not row:
+                db.add(GroupORM(id=DEFAULT_GROUP_ID, name=DEFAULT_GROUP_NAME))
+                await db.commit()
     except Exception:
         # Best-effort seeding only
         pass
 
     yield
 
-    # Shutdown: dispose connection pool
-    await engine.dispose()
+    # Shutdown: dispose connection pools
+    await dispose_engines()
 
 
 app = FastAPI(title="Expense Service", lifespan=lifespan)
+app.middleware("http")(read_your_writes(read_replicas, READ_YOUR_WRITES_SECONDS))
 
-# Initialize tracing/instrumentation
+# Initialize tracing/instrumentation and metrics
 try:
     init_tracing(app, sqlalchemy_engine=engine)
+    init_metrics()
 except Exception:
     # Observability should never block app startup
     pass
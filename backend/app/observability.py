@@ -1,16 +1,30 @@
 import os
 from typing import Optional
 
-from opentelemetry import trace
+from opentelemetry import metrics, trace
+from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
 from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 from opentelemetry.instrumentation.requests import RequestsInstrumentor
 from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
 
 
+def _resource() -> Resource:
+    service_name = os.getenv("OTEL_SERVICE_NAME", "expense-backend")
+    environment = os.getenv("OTEL_ENVIRONMENT", os.getenv("ENVIRONMENT", "dev"))
+    return Resource.create(
+        {
+            "service.name": service_name,
+            "deployment.environment": environment,
+        }
+    )
+
+
 def init_tracing(app, sqlalchemy_engine: Optional[object] = None) -> None:
     """Initialize OpenTelemetry tracing with OTLP exporter.
 
@@ -19,15 +33,7 @@ def init_tracing(app, sqlalchemy_engine: Optional[object] = None) -> None:
     - Instruments FastAPI, SQLAlchemy (if engine provided), and requests.
     """
     endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://jaeger:4317")
-    service_name = os.getenv("OTEL_SERVICE_NAME", "expense-backend")
-    environment = os.getenv("OTEL_ENVIRONMENT", os.getenv("ENVIRONMENT", "dev"))
-
-    resource = Resource.create(
-        {
-            "service.name": service_name,
-            "deployment.environment": environment,
-        }
-    )
+    resource = _resource()
     provider = TracerProvider(resource=resource)
     processor = BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint))
     provider.add_span_processor(processor)
@@ -42,3 +48,17 @@ def init_tracing(app, sqlalchemy_engine: Optional[object] = None) -> None:
         except Exception:
             # Best-effort instrumentation
             pass
+
+
+def init_metrics() -> None:
+    """Initialize OpenTelemetry metrics (e.g. connection pool usage) with OTLP exporter.
+
+    - Reads endpoint from OTEL_EXPORTER_OTLP_METRICS_ENDPOINT, falling back to
+      OTEL_EXPORTER_OTLP_ENDPOINT; Jaeger only accepts traces, so point it at a collector.
+    - Exports every OTEL_METRIC_EXPORT_INTERVAL milliseconds (default: 60000).
+    """
+    endpoint = os.getenv(
+        "OTEL_EXPORTER_OTLP_METRICS_ENDPOINT", os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://jaeger:4317")
+    )
+    reader = PeriodicExportingMetricReader(OTLPMetricExporter(endpoint=endpoint))
+    metrics.set_meter_provider(MeterProvider(resource=_resource(), metric_readers=[reader]))
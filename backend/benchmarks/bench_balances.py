@@ -0,0 +1,79 @@
+"""Benchmark ``calculate_group_balances`` on large groups.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_balances [--expenses 100000] [--members 10000]
+"""
+
+import argparse
+import random
+import time
+from math import floor
+from typing import Dict, List
+from uuid import UUID, uuid4
+
+from app.domain.models import Expense
+from app.domain.services import calculate_group_balances
+
+
+def _nested_loop_balances(member_ids: List[UUID], expenses: List[Expense]) -> Dict[UUID, float]:
+    """The original O(expenses x members) implementation, kept for comparison."""
+    n = len(member_ids)
+    balances: Dict[UUID, float] = {mid: 0.0 for mid in member_ids}
+    for e in expenses:
+        share = floor(float(e.amount) / 100) / n if n else 0.0
+        for mid in member_ids:
+            balances[mid] -= share
+        if e.payer_id in balances:
+            balances[e.payer_id] += floor(e.amount / 100)
+    return balances
+
+
+def _build(expenses: int, members: int, seed: int = 0):
+    rng = random.Random(seed)
+    group_id = uuid4()
+    member_ids = [uuid4() for _ in range(members)]
+    rows = [
+        Expense.model_construct(
+            id=uuid4(),
+            group_id=group_id,
+            payer_id=rng.choice(member_ids),
+            amount=rng.randint(1, 500_000),
+        )
+        for _ in range(expenses)
+    ]
+    return member_ids, rows
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--expenses", type=int, default=100_000)
+    parser.add_argument("--members", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    member_ids, expenses = _build(args.expenses, args.members)
+    best = min(_timed(calculate_group_balances, member_ids, expenses)[1] for _ in range(args.repeat))
+    print(f"calculate_group_balances: {args.expenses} expenses x {args.members} members: {best * 1000:.1f} ms")
+
+    # The nested loop is quadratic; compare on a slice small enough to finish quickly.
+    small_members, small_expenses = member_ids[:1_000], [
+        e.model_copy(update={"payer_id": member_ids[i % 1_000]}) for i, e in enumerate(expenses[:2_000])
+    ]
+    fast, fast_s = _timed(calculate_group_balances, small_members, small_expenses)
+    slow, slow_s = _timed(_nested_loop_balances, small_members, small_expenses)
+    assert all(abs(fast[m] - slow[m]) < 1e-6 for m in small_members)
+    print(
+        f"2000 expenses x 1000 members: engine {fast_s * 1000:.1f} ms, "
+        f"nested loop {slow_s * 1000:.1f} ms ({slow_s / fast_s:.0f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Compare single ``POST /expenses/`` calls against ``POST /expenses/bulk``.
+
+Runs the API in-process against a throwaway SQLite file. Run from the
+``backend`` directory::
+
+    python -m benchmarks.bench_bulk_expenses [--rows 5000]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+_DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_DB_PATH}")
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+
+from app.infrastructure import database as dbmod  # noqa: E402
+from app.infrastructure.orm import Base  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+async def _setup(client: AsyncClient):
+    r = await client.post(
+        "/auth/signup",
+        json={"email": "bench@example.com", "name": "Bench", "password": "bench", "is_admin": True},
+    )
+    r.raise_for_status()
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    payer = (await client.post("/users/", json={"email": "payer@example.com", "name": "P"})).json()
+    group = (await client.post("/groups/", json={"name": "Bench"}, headers=headers)).json()
+    await client.post(f"/groups/{group['id']}/members/{payer['id']}", headers=headers)
+    return headers, group["id"], payer["id"]
+
+
+async def _run(rows: int, batch: int) -> None:
+    # Statement echo would dominate the timings
+    dbmod.engine.echo = False
+    async with dbmod.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        headers, group_id, payer_id = await _setup(client)
+        payload = [
+            {"group_id": group_id, "payer_id": payer_id, "amount": 1 + i % 100} for i in range(rows)
+        ]
+
+        start = time.perf_counter()
+        for item in payload:
+            (await client.post("/expenses/", json=item, headers=headers)).raise_for_status()
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for offset in range(0, rows, batch):
+            chunk = payload[offset : offset + batch]
+            (await client.post("/expenses/bulk", json=chunk, headers=headers)).raise_for_status()
+        bulk = time.perf_counter() - start
+
+    print(f"single: {rows / single:10.0f} rows/s ({single:.2f} s)")
+    print(f"bulk:   {rows / bulk:10.0f} rows/s ({bulk:.2f} s)")
+    print(f"speedup: {single / bulk:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000)
+    parser.add_argument("--batch", type=int, default=5_000)
+    args = parser.parse_args()
+    asyncio.run(_run(args.rows, args.batch))
+
+
+if __name__ == "__main__":
+    main()
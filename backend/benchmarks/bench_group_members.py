@@ -0,0 +1,88 @@
+"""Compare loading a large group's members as ORM rows against the id projection.
+
+Seeds a throwaway SQLite file with one group of ``--members`` users, then
+times ``SQLAlchemyGroupRepository.get`` against loading ``GroupORM`` with its
+``members`` relationship, and reports the peak Python memory of each. Run from
+the ``backend`` directory::
+
+    python -m benchmarks.bench_group_members [--members 100000]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from uuid import uuid4
+
+_DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_DB_PATH}")
+
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.orm import selectinload  # noqa: E402
+
+from app.infrastructure import database as dbmod  # noqa: E402
+from app.infrastructure.orm import Base, GroupORM, UserORM, group_members  # noqa: E402
+from app.infrastructure.repositories import SQLAlchemyGroupRepository  # noqa: E402
+
+_BATCH = 10_000
+
+
+async def _seed(members: int):
+    group_id = uuid4()
+    async with dbmod.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(GroupORM).values(id=group_id, name="Everyone"))
+        for offset in range(0, members, _BATCH):
+            users = [
+                {"id": uuid4(), "email": f"member{i}@example.com", "name": f"Member {i}", "password_hash": "x" * 60}
+                for i in range(offset, min(offset + _BATCH, members))
+            ]
+            await conn.execute(insert(UserORM), users)
+            await conn.execute(insert(group_members), [{"group_id": group_id, "user_id": u["id"]} for u in users])
+    return group_id
+
+
+async def _measure(load):
+    tracemalloc.start()
+    start = time.perf_counter()
+    async with dbmod.async_session_maker() as db:
+        count = await load(db)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+async def _run(members: int, repeat: int) -> None:
+    # Statement echo would dominate the timings
+    dbmod.engine.echo = False
+    group_id = await _seed(members)
+
+    async def orm_rows(db):
+        stmt = select(GroupORM).where(GroupORM.id == group_id).options(selectinload(GroupORM.members))
+        group = (await db.execute(stmt)).scalar_one()
+        return len([u.id for u in group.members])
+
+    async def projection(db):
+        return len((await SQLAlchemyGroupRepository(db).get(group_id)).members)
+
+    for label, load in (("orm rows", orm_rows), ("projection", projection)):
+        runs = [await _measure(load) for _ in range(repeat)]
+        count = runs[0][0]
+        best = min(elapsed for _, elapsed, _ in runs)
+        peak = max(peak for _, _, peak in runs)
+        print(f"{label:<11} {count} members  {best * 1000:8.1f} ms  peak {peak / 2**20:7.1f} MiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(_run(args.members, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Benchmark ``plan_settlements`` across group sizes.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_settlements [--sizes 100 1000 10000 100000]
+"""
+
+import argparse
+import random
+import time
+from uuid import uuid4
+
+from app.domain.services import plan_settlements
+
+
+def _balances(members: int, seed: int = 0):
+    rng = random.Random(seed)
+    cents = [rng.randint(-500_000, 500_000) for _ in range(members - 1)]
+    cents.append(-sum(cents))
+    return {uuid4(): c / 100 for c in cents}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        balances = _balances(size)
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            plan = plan_settlements(balances)
+            best = min(best, time.perf_counter() - start)
+        print(f"{size:>7} members: {len(plan):>7} transfers in {best * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
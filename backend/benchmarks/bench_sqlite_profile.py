@@ -0,0 +1,118 @@
+"""Compare SQLite's default engine setup against the ``sqlite`` engine profile.
+
+Each configuration gets a fresh SQLite file with one group. ``--clients``
+concurrent clients then each run ``--ops`` operations: reads of the group's
+latest expenses, plus a write (``add_for_member``) for ``--write-ratio`` of
+them. The defaults share one engine with SQLAlchemy's default pool, rollback
+journal and no PRAGMAs. The profile writes through its single writer and
+reads through its WAL reader pool. The report shows throughput, latency
+percentiles and failed operations (e.g. "database is locked"). Run from the
+``backend`` directory::
+
+    python -m benchmarks.bench_sqlite_profile [--clients 32] [--ops 200] [--write-ratio 0.2]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from uuid import uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.domain.models import Expense
+from app.infrastructure.engine_profiles import load_profile
+from app.infrastructure.orm import Base, GroupORM, UserORM, group_members
+from app.infrastructure.repositories import SQLAlchemyExpenseRepository
+from app.infrastructure.sqlite import sqlite_engines
+
+_MEMBERS = 20
+
+
+async def _seed(engine):
+    group_id = uuid4()
+    users = [uuid4() for _ in range(_MEMBERS)]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(GroupORM).values(id=group_id, name="Bench"))
+        await conn.execute(
+            insert(UserORM), [{"id": u, "email": f"{u}@example.com", "name": "Member"} for u in users]
+        )
+        await conn.execute(insert(group_members), [{"group_id": group_id, "user_id": u} for u in users])
+    return group_id, users
+
+
+async def _client(writes, reads, group_id, users, ops, write_ratio, rng, latencies, failures):
+    for _ in range(ops):
+        write = rng.random() < write_ratio
+        start = time.perf_counter()
+        try:
+            async with (writes if write else reads)() as db:
+                repo = SQLAlchemyExpenseRepository(db)
+                if write:
+                    await repo.add_for_member(
+                        Expense(group_id=group_id, payer_id=rng.choice(users), amount=rng.randint(100, 10_000))
+                    )
+                else:
+                    await repo.list_for_group(group_id, limit=50)
+        except Exception:
+            failures.append(write)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def _measure(label, writer, reader, clients, ops, write_ratio):
+    group_id, users = await _seed(writer)
+    writes = async_sessionmaker(writer, expire_on_commit=False)
+    reads = async_sessionmaker(reader, expire_on_commit=False)
+    latencies, failures = [], []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _client(writes, reads, group_id, users, ops, write_ratio, random.Random(i), latencies, failures)
+            for i in range(clients)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    ms = sorted(v * 1000 for v in latencies)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))] if ms else float("nan")
+    print(
+        f"{label:<8} {len(latencies) / elapsed:8.0f} ops/s  p50 {statistics.median(ms) if ms else float('nan'):7.1f} ms"
+        f"  p99 {p99:7.1f} ms  failed {len(failures)} ({sum(failures)} writes)"
+    )
+
+
+async def _run(clients: int, ops: int, write_ratio: float) -> None:
+    directory = tempfile.mkdtemp()
+
+    url = f"sqlite+aiosqlite:///{os.path.join(directory, 'defaults.db')}"
+    engine = create_async_engine(url)
+    try:
+        await _measure("defaults", engine, engine, clients, ops, write_ratio)
+    finally:
+        await engine.dispose()
+
+    url = f"sqlite+aiosqlite:///{os.path.join(directory, 'profile.db')}"
+    writer, readers = sqlite_engines(url, load_profile("sqlite"))
+    try:
+        await _measure("sqlite", writer, readers, clients, ops, write_ratio)
+    finally:
+        await writer.dispose()
+        await readers.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--ops", type=int, default=200)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+    asyncio.run(_run(args.clients, args.ops, args.write_ratio))
+
+
+if __name__ == "__main__":
+    main()
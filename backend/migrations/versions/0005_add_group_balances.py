@@ -0,0 +1,41 @@
+"""add group_balances ledger
+
+Revision ID: 0005_group_balances
+Revises: 0004_add_is_admin
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0005_group_balances'
+down_revision = '0004_add_is_admin'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'group_balances',
+        sa.Column('group_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('groups.id', ondelete='CASCADE'), primary_key=True, nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True, nullable=False),
+        sa.Column('paid_cents', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+
+    # Backfill from existing data: payer credits first, then zero rows for members who never paid
+    op.execute(
+        "INSERT INTO group_balances (group_id, user_id, paid_cents) "
+        "SELECT group_id, payer_id, SUM(CAST(amount AS INTEGER) / 100) * 100 "
+        "FROM expenses GROUP BY group_id, payer_id"
+    )
+    op.execute(
+        "INSERT INTO group_balances (group_id, user_id, paid_cents) "
+        "SELECT gm.group_id, gm.user_id, 0 FROM group_members gm "
+        "WHERE NOT EXISTS (SELECT 1 FROM group_balances gb "
+        "WHERE gb.group_id = gm.group_id AND gb.user_id = gm.user_id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('group_balances')
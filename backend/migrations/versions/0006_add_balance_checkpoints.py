@@ -0,0 +1,30 @@
+"""add balance_checkpoints
+
+Revision ID: 0006_balance_checkpoints
+Revises: 0005_group_balances
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0006_balance_checkpoints'
+down_revision = '0005_group_balances'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Checkpoints are populated by `python -m app.cli checkpoint-balances`
+    op.create_table(
+        'balance_checkpoints',
+        sa.Column('group_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('groups.id', ondelete='CASCADE'), primary_key=True, nullable=False),
+        sa.Column('checkpoint_at', sa.DateTime(timezone=True), primary_key=True, nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True, nullable=False),
+        sa.Column('paid_cents', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('balance_checkpoints')
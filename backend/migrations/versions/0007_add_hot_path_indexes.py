@@ -0,0 +1,28 @@
+"""add indexes for hot query paths
+
+Revision ID: 0007_hot_path_indexes
+Revises: 0006_balance_checkpoints
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+revision = '0007_hot_path_indexes'
+down_revision = '0006_balance_checkpoints'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Group listings, balances and exports filter by group and order by (created_at, id)
+    op.create_index('ix_expenses_group_created', 'expenses', ['group_id', 'created_at', 'id'])
+    # Payer lookups and ON DELETE CASCADE from users
+    op.create_index('ix_expenses_payer_id', 'expenses', ['payer_id'])
+    # Reverse of the (group_id, user_id) primary key for user -> groups
+    op.create_index('ix_group_members_user_group', 'group_members', ['user_id', 'group_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_group_members_user_group', table_name='group_members')
+    op.drop_index('ix_expenses_payer_id', table_name='expenses')
+    op.drop_index('ix_expenses_group_created', table_name='expenses')
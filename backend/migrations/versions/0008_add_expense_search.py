@@ -0,0 +1,58 @@
+"""add expense description search indexes
+
+Revision ID: 0008_expense_search
+Revises: 0007_hot_path_indexes
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+revision = '0008_expense_search'
+down_revision = '0007_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+# Mirrors EXPENSES_FTS_DDL in app/infrastructure/orm.py at this revision
+EXPENSES_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS expenses_fts "
+    "USING fts5(expense_id UNINDEXED, description, tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS expenses_fts_insert AFTER INSERT ON expenses "
+    "WHEN new.description IS NOT NULL BEGIN "
+    "INSERT INTO expenses_fts (expense_id, description) VALUES (new.id, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS expenses_fts_delete AFTER DELETE ON expenses BEGIN "
+    "DELETE FROM expenses_fts WHERE expense_id = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS expenses_fts_update AFTER UPDATE OF description ON expenses BEGIN "
+    "DELETE FROM expenses_fts WHERE expense_id = old.id; "
+    "INSERT INTO expenses_fts (expense_id, description) "
+    "SELECT new.id, new.description WHERE new.description IS NOT NULL; END",
+)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in EXPENSES_FTS_DDL:
+            op.execute(statement)
+        op.execute(
+            "INSERT INTO expenses_fts (expense_id, description) "
+            "SELECT id, description FROM expenses WHERE description IS NOT NULL"
+        )
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_expenses_description_trgm',
+        'expenses',
+        ['description'],
+        postgresql_using='gin',
+        postgresql_ops={'description': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        for trigger in ('expenses_fts_update', 'expenses_fts_delete', 'expenses_fts_insert'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS expenses_fts')
+        return
+
+    op.drop_index('ix_expenses_description_trgm', table_name='expenses')
@@ -0,0 +1,41 @@
+"""add expense_rollups report table
+
+Revision ID: 0009_expense_rollups
+Revises: 0008_expense_search
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0009_expense_rollups'
+down_revision = '0008_expense_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'expense_rollups',
+        sa.Column('group_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('groups.id', ondelete='CASCADE'), primary_key=True, nullable=False),
+        sa.Column('payer_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True, nullable=False),
+        sa.Column('day', sa.Date(), primary_key=True, nullable=False),
+        sa.Column('amount_cents', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('expense_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+    # Backfill per UTC day from existing expenses
+    if op.get_bind().dialect.name == 'sqlite':
+        day = 'date(created_at)'
+    else:
+        day = "CAST(timezone('UTC', created_at) AS DATE)"
+    op.execute(
+        "INSERT INTO expense_rollups (group_id, payer_id, day, amount_cents, expense_count) "
+        f"SELECT group_id, payer_id, {day}, SUM(amount), COUNT(*) "
+        f"FROM expenses GROUP BY group_id, payer_id, {day}"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('expense_rollups')
@@ -0,0 +1,103 @@
+"""partition expenses by month on created_at
+
+Revision ID: 0011_partition_expenses
+Revises: 0010_idempotency_keys
+Create Date: 2026-10-17
+
+Postgres only; SQLite keeps a single expenses table. The existing table is
+copied into a new table declared PARTITION BY RANGE (created_at) with one
+partition per month from the oldest expense to three months ahead, plus a
+default partition.
+"""
+
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0011_partition_expenses'
+down_revision = '0010_idempotency_keys'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+INDEXES = ('ix_expenses_group_created', 'ix_expenses_payer_id', 'ix_expenses_description_trgm')
+COLUMNS = 'id, group_id, payer_id, amount, created_at, description'
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_expenses_table(**kw) -> None:
+    op.create_table(
+        'expenses',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('group_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('groups.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('payer_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('description', sa.String(length=1024), nullable=True),
+        sa.PrimaryKeyConstraint(*kw.pop('primary_key')),
+        **kw,
+    )
+
+
+def _create_indexes() -> None:
+    op.create_index('ix_expenses_group_created', 'expenses', ['group_id', 'created_at', 'id'])
+    op.create_index('ix_expenses_payer_id', 'expenses', ['payer_id'])
+    op.create_index(
+        'ix_expenses_description_trgm',
+        'expenses',
+        ['description'],
+        postgresql_using='gin',
+        postgresql_ops={'description': 'gin_trgm_ops'},
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    for index in INDEXES:
+        op.drop_index(index, table_name='expenses')
+    op.execute('ALTER TABLE expenses RENAME TO expenses_unpartitioned')
+    op.execute('ALTER TABLE expenses_unpartitioned RENAME CONSTRAINT expenses_pkey TO expenses_unpartitioned_pkey')
+
+    _create_expenses_table(primary_key=('id', 'created_at'), postgresql_partition_by='RANGE (created_at)')
+
+    oldest = bind.execute(sa.text("SELECT min(created_at) FROM expenses_unpartitioned")).scalar()
+    today = datetime.now(timezone.utc).date()
+    month = date((oldest or today).year, (oldest or today).month, 1)
+    last = _add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE expenses_p{month:%Y_%m} PARTITION OF expenses "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+        )
+        month = upper
+    op.execute('CREATE TABLE expenses_default PARTITION OF expenses DEFAULT')
+
+    op.execute(f'INSERT INTO expenses ({COLUMNS}) SELECT {COLUMNS} FROM expenses_unpartitioned')
+    op.drop_table('expenses_unpartitioned')
+    _create_indexes()
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for index in INDEXES:
+        op.drop_index(index, table_name='expenses')
+    op.execute('ALTER TABLE expenses RENAME TO expenses_partitioned')
+    op.execute('ALTER TABLE expenses_partitioned RENAME CONSTRAINT expenses_pkey TO expenses_partitioned_pkey')
+
+    _create_expenses_table(primary_key=('id',))
+    op.execute(f'INSERT INTO expenses ({COLUMNS}) SELECT {COLUMNS} FROM expenses_partitioned')
+    # Dropping the parent drops every partition
+    op.drop_table('expenses_partitioned')
+    _create_indexes()
@@ -0,0 +1,43 @@
+"""add expense archive catalog and carry-forward balances
+
+Revision ID: 0012_expense_archive
+Revises: 0011_partition_expenses
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0012_expense_archive'
+down_revision = '0011_partition_expenses'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'expense_segments',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column('group_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('groups.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('path', sa.String(length=1024), nullable=False),
+        sa.Column('row_count', sa.Integer(), nullable=False),
+        sa.Column('first_created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('last_created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('archived_before', sa.Date(), nullable=False),
+    )
+    op.create_index('ix_expense_segments_group_id', 'expense_segments', ['group_id'])
+    op.create_table(
+        'archived_balances',
+        sa.Column('group_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('groups.id', ondelete='CASCADE'), primary_key=True, nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True, nullable=False),
+        sa.Column('paid_cents', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('amount_cents', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('expense_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('archived_balances')
+    op.drop_index('ix_expense_segments_group_id', table_name='expense_segments')
+    op.drop_table('expense_segments')
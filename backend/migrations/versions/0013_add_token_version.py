@@ -0,0 +1,22 @@
+"""add token_version to users
+
+Revision ID: 0013_token_version
+Revises: 0012_expense_archive
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0013_token_version'
+down_revision = '0012_expense_archive'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
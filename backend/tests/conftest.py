@@ -1,10 +1,14 @@
 import os
+from contextlib import contextmanager
 
 # MUST be set before any app imports — database.py creates the engine at module load time
 os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["DB_ENGINE_PROFILE"] = "test"
 
+import pytest  # noqa: E402
 import pytest_asyncio  # noqa: E402
 from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
 from sqlalchemy.pool import StaticPool  # noqa: E402
 
@@ -52,8 +56,43 @@ async def client(db_session: AsyncSession):
         yield db_session
 
     app.dependency_overrides[dbmod.get_db] = override_get_db
+    app.dependency_overrides[dbmod.get_read_db] = override_get_db
 
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
 
     app.dependency_overrides.clear()
+
+
+@pytest.fixture()
+def query_budget(db_session: AsyncSession):
+    """Fail a block that issues more statements or loads more ORM rows than declared.
+
+    Usage: ``with query_budget(statements=2, rows=1): await client.get(...)``.
+    """
+    engine = db_session.bind.sync_engine
+
+    @contextmanager
+    def budget(statements: int, rows: int = 0):
+        issued, loaded = [], []
+        # Measure as a fresh request would, without rows cached by earlier calls
+        db_session.expunge_all()
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            issued.append(statement)
+
+        def on_load(target, context):
+            loaded.append(target)
+
+        event.listen(engine, "before_cursor_execute", on_execute)
+        event.listen(Base, "load", on_load, propagate=True)
+        try:
+            yield issued
+        finally:
+            event.remove(engine, "before_cursor_execute", on_execute)
+            event.remove(Base, "load", on_load)
+        listing = "\n".join(issued)
+        assert len(issued) <= statements, f"{len(issued)} statements, budget {statements}:\n{listing}"
+        assert len(loaded) <= rows, f"{len(loaded)} ORM rows loaded, budget {rows}:\n{listing}"
+
+    return budget
@@ -0,0 +1,154 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import delete, event
+
+from app.domain.models import Expense
+from app.domain.services import calculate_group_balances
+from app.infrastructure.archive import Segment, write_segment
+from app.infrastructure.orm import ExpenseORM
+from app.infrastructure.repositories import SQLAlchemyExpenseRepository
+
+
+async def _signup_and_token(client, email="archive@example.com"):
+    local, _, domain = email.partition("@")
+    r = await client.post(
+        "/auth/signup",
+        json={
+            "email": f"{local}+{uuid4().hex}@{domain}",
+            "name": "Owner",
+            "password": "s3cret",
+            "is_admin": True,
+        },
+    )
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+def test_segment_round_trip(tmp_path):
+    gid, p1, p2 = uuid4(), uuid4(), uuid4()
+    start = datetime(2025, 12, 31, 23, 59, 59, 123456, tzinfo=timezone.utc)
+    expenses = [
+        Expense(group_id=gid, payer_id=p1 if i % 3 else p2, amount=199 + i, created_at=start + timedelta(hours=i),
+                description=None if i % 2 else f"item {i}")
+        for i in range(10)
+    ]
+    path = tmp_path / "seg" / "one.seg"
+    write_segment(path, gid, list(reversed(expenses)))
+
+    with Segment(path) as segment:
+        assert segment.group_id == gid
+        assert segment.rows == 10
+        assert segment.expenses() == expenses
+        window = segment.payer_totals(since=expenses[1].created_at, until=expenses[4].created_at)
+    assert {t.payer_id: (t.amount, t.credited, t.count) for t in window} == {
+        p1: (201 + 203, 200 + 200, 2),
+        p2: (202, 200, 1),
+    }
+    assert not path.with_suffix(".seg.tmp").exists()
+
+
+async def test_archive_moves_old_expenses_out_of_the_hot_table(client, db_session, tmp_path):
+    headers = {"Authorization": f"Bearer {await _signup_and_token(client)}"}
+    users = [
+        (await client.post("/users/", json={"email": f"arch{i}@example.com", "name": f"A{i}"})).json()
+        for i in range(3)
+    ]
+    g = (await client.post("/groups/", json={"name": "Archive"}, headers=headers)).json()
+    for u in users:
+        await client.post(f"/groups/{g['id']}/members/{u['id']}", headers=headers)
+
+    repo = SQLAlchemyExpenseRepository(db_session)
+    gid = UUID(g["id"])
+    members = [UUID(u["id"]) for u in users]
+    u1, u2, u3 = members
+    rows = [
+        Expense(group_id=gid, payer_id=payer, amount=amount, created_at=when, description=f"e{i}")
+        for i, (payer, amount, when) in enumerate(
+            (
+                (u1, 10000, datetime(2026, 1, 5, tzinfo=timezone.utc)),
+                (u2, 4000, datetime(2026, 1, 20, tzinfo=timezone.utc)),
+                (u1, 2000, datetime(2026, 2, 10, tzinfo=timezone.utc)),
+                (u3, 3050, datetime(2026, 3, 3, tzinfo=timezone.utc)),
+            )
+        )
+    ]
+    for e in rows:
+        await repo.add(e)
+
+    async def balances(**params):
+        entries = (await client.get(f"/groups/{g['id']}/balances", params=params)).json()
+        return {e["user_id"]: e["balance"] for e in entries}
+
+    async def snapshot():
+        current = await balances()
+        as_of = [await balances(as_of=when) for when in ("2026-01-25T00:00:00Z", "2026-02-20T00:00:00Z")]
+        export = (await client.get(f"/groups/{g['id']}/expenses/export")).text
+        report = (await client.get(f"/groups/{g['id']}/reports")).json()
+        mine = (await client.get(f"/users/{u1}/balances")).json()
+        totals = {
+            window: sorted(
+                (str(t.payer_id), t.amount, t.credited, t.count) for t in await repo.sum_by_payer(gid, *window)
+            )
+            for window in (
+                (None, None),
+                (datetime(2026, 1, 10, tzinfo=timezone.utc), datetime(2026, 2, 15, tzinfo=timezone.utc)),
+            )
+        }
+        return current, as_of, export, report, mine, totals
+
+    before = await snapshot()
+
+    assert await repo.archive_expenses(date(2026, 2, 1), tmp_path) == 2
+    hot = await repo.list_for_group(gid)
+    assert [e.id for e in hot] == [rows[2].id, rows[3].id]
+    segments = list(Path(tmp_path, str(gid)).glob("*.seg"))
+    assert len(segments) == 1
+
+    assert await snapshot() == before
+    lines = [json.loads(line) for line in before[2].splitlines()]
+    assert [line["id"] for line in lines] == [str(e.id) for e in rows]
+
+    # Only post-cutoff rows are needed once the carry-forward is applied
+    assert calculate_group_balances(members, hot, await repo.archived_credits(gid)) == pytest.approx(
+        calculate_group_balances(members, rows)
+    )
+
+    # Rebuilds keep archived history
+    await repo.rebuild_balances(gid)
+    await repo.rebuild_rollups(gid)
+    await repo.write_checkpoints(timedelta(days=7), gid, full=True, now=datetime(2026, 3, 10, tzinfo=timezone.utc))
+    assert await snapshot() == before
+
+    # Archiving past the latest checkpoint would leave later checkpoints short
+    with pytest.raises(ValueError):
+        await repo.archive_expenses(date(2026, 6, 1), tmp_path)
+
+
+async def test_archive_skips_groups_emptied_since_listing(client, db_session, tmp_path):
+    headers = {"Authorization": f"Bearer {await _signup_and_token(client, 'empty@example.com')}"}
+    g = (await client.post("/groups/", json={"name": "Emptied"}, headers=headers)).json()
+    u = (await client.post("/users/", json={"email": f"{uuid4().hex}@example.com", "name": "E"})).json()
+    await client.post(f"/groups/{g['id']}/members/{u['id']}", headers=headers)
+    gid = UUID(g["id"])
+    repo = SQLAlchemyExpenseRepository(db_session)
+    await repo.add(
+        Expense(group_id=gid, payer_id=UUID(u["id"]), amount=500, created_at=datetime(2025, 5, 1, tzinfo=timezone.utc))
+    )
+
+    # Another writer deletes the group's old rows right after they were listed
+    def race(state):
+        result = state.invoke_statement()
+        if str(state.statement).startswith("SELECT DISTINCT"):
+            state.session.execute(delete(ExpenseORM).where(ExpenseORM.group_id == gid))
+        return result
+
+    event.listen(db_session.sync_session, "do_orm_execute", race)
+    try:
+        assert await repo.archive_expenses(date(2025, 6, 1), tmp_path, gid) == 0
+    finally:
+        event.remove(db_session.sync_session, "do_orm_execute", race)
+    assert not Path(tmp_path, str(gid)).exists()
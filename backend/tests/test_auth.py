@@ -1,3 +1,10 @@
+from sqlalchemy import event
+
+from app.api import auth
+from app.domain.models import Group
+from app.infrastructure.repositories import SQLAlchemyGroupRepository
+
+
 async def test_signup_login_me_flow(client):
     # Signup
     r = await client.post(
@@ -36,3 +43,56 @@ async def test_signup_login_me_flow(client):
     assert r5.status_code == 200
     me = r5.json()
     assert me["email"] == "alice@example.com"
+
+
+async def test_principal_from_claims_and_revocation(client, query_budget):
+    r = await client.post(
+        "/auth/signup",
+        json={"email": "claims@example.com", "name": "Claims", "password": "s3cret-pass"},
+    )
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    uid = (await client.get("/auth/me", headers=headers)).json()["id"]
+
+    # With the token version cached, the principal costs no statements at all
+    with query_budget(statements=0):
+        me = await client.get("/auth/me", headers=headers)
+    assert (me.json()["email"], me.json()["name"]) == ("claims@example.com", "Claims")
+    assert "token_version" not in me.json()
+
+    # Changing the password revokes every earlier token
+    changed = await client.post(
+        f"/users/{uid}/password",
+        json={"current_password": "s3cret-pass", "new_password": "n3w-secret"},
+        headers=headers,
+    )
+    assert changed.status_code == 204
+    revoked = await client.get("/auth/me", headers=headers)
+    assert (revoked.status_code, revoked.json()["detail"]) == (401, "Token revoked")
+
+    login = await client.post("/auth/login", json={"email": "claims@example.com", "password": "n3w-secret"})
+    fresh = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    assert (await client.get("/auth/me", headers=fresh)).status_code == 200
+
+
+async def test_signup_commits_once(client, db_session, monkeypatch):
+    # Tests skip the lifespan that seeds the default group; point signup at a real one so it writes both rows
+    groups = SQLAlchemyGroupRepository(db_session)
+    default = await groups.add(Group(name="default"))
+    monkeypatch.setattr(auth, "DEFAULT_GROUP_ID", default.id)
+    commits = []
+
+    def record(session):
+        commits.append(session)
+
+    event.listen(db_session.sync_session, "after_commit", record)
+    try:
+        r = await client.post(
+            "/auth/signup",
+            json={"email": "once@example.com", "name": "Once", "password": "s3cret"},
+        )
+    finally:
+        event.remove(db_session.sync_session, "after_commit", record)
+    assert r.status_code == 200
+    assert len(commits) == 1
+    me = (await client.get("/auth/me", headers={"Authorization": f"Bearer {r.json()['access_token']}"})).json()
+    assert [str(m) for m in (await groups.get(default.id)).members] == [me["id"]]
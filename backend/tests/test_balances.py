@@ -1,4 +1,11 @@
-from uuid import uuid4
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+from sqlalchemy import select
+
+from app.domain.models import Expense
+from app.infrastructure.orm import BalanceCheckpointORM
+from app.infrastructure.repositories import SQLAlchemyExpenseRepository
 
 
 async def _signup_and_token(
@@ -105,3 +112,168 @@ async def test_group_balances_three_members_rounding(client):
     assert bals[u1["id"]] == 53.33
     assert bals[u2["id"]] == -6.67
     assert bals[u3["id"]] == -46.67
+
+
+async def test_group_balances_rebuilt_from_expenses(client, db_session):
+    token = await _signup_and_token(client, email="ledger@example.com", is_admin=True)
+    headers = {"Authorization": f"Bearer {token}"}
+    u1 = (await client.post("/users/", json={"email": "l1@example.com", "name": "L1"})).json()
+    u2 = (await client.post("/users/", json={"email": "l2@example.com", "name": "L2"})).json()
+    g = (await client.post("/groups/", json={"name": "Ledger"}, headers=headers)).json()
+    await client.post(f"/groups/{g['id']}/members/{u1['id']}", headers=headers)
+    await client.post(f"/groups/{g['id']}/members/{u2['id']}", headers=headers)
+    for payer, amount in ((u1, 30.99), (u1, 10), (u2, 12.5)):
+        r = await client.post(
+            "/expenses/",
+            json={"group_id": g["id"], "payer_id": payer["id"], "amount": amount},
+            headers=headers,
+        )
+        assert r.status_code == 200
+
+    before = (await client.get(f"/groups/{g['id']}/balances")).json()
+
+    rows = await SQLAlchemyExpenseRepository(db_session).rebuild_balances(UUID(g["id"]))
+    assert rows == 2
+
+    after = (await client.get(f"/groups/{g['id']}/balances")).json()
+    bals = {b["user_id"]: b["balance"] for b in after}
+    assert bals == {b["user_id"]: b["balance"] for b in before}
+    assert bals[u1["id"]] == -bals[u2["id"]]
+    assert bals[u1["id"]] > 0
+
+
+async def test_sum_by_payer_aggregates_in_database(client, db_session):
+    token = await _signup_and_token(client, email="agg@example.com", is_admin=True)
+    headers = {"Authorization": f"Bearer {token}"}
+    u1 = (await client.post("/users/", json={"email": "s1@example.com", "name": "S1"})).json()
+    u2 = (await client.post("/users/", json={"email": "s2@example.com", "name": "S2"})).json()
+    g = (await client.post("/groups/", json={"name": "Aggregates"}, headers=headers)).json()
+    await client.post(f"/groups/{g['id']}/members/{u1['id']}", headers=headers)
+    await client.post(f"/groups/{g['id']}/members/{u2['id']}", headers=headers)
+    for payer, amount in ((u1, 30.99), (u1, 10), (u2, 12.5)):
+        await client.post(
+            "/expenses/",
+            json={"group_id": g["id"], "payer_id": payer["id"], "amount": amount},
+            headers=headers,
+        )
+
+    totals = await SQLAlchemyExpenseRepository(db_session).sum_by_payer(UUID(g["id"]))
+    by_payer = {str(t.payer_id): t for t in totals}
+
+    assert by_payer[u1["id"]].amount == 4099
+    assert by_payer[u1["id"]].credited == 4000
+    assert by_payer[u1["id"]].count == 2
+    assert by_payer[u2["id"]].amount == 1250
+    assert by_payer[u2["id"]].credited == 1200
+    assert by_payer[u2["id"]].count == 1
+
+
+async def test_group_settlements(client):
+    token = await _signup_and_token(client, email="settle@example.com", is_admin=True)
+    headers = {"Authorization": f"Bearer {token}"}
+    u1 = (await client.post("/users/", json={"email": "p1@example.com", "name": "P1"})).json()
+    u2 = (await client.post("/users/", json={"email": "p2@example.com", "name": "P2"})).json()
+    u3 = (await client.post("/users/", json={"email": "p3@example.com", "name": "P3"})).json()
+    g = (await client.post("/groups/", json={"name": "Settle"}, headers=headers)).json()
+    for u in (u1, u2, u3):
+        await client.post(f"/groups/{g['id']}/members/{u['id']}", headers=headers)
+    await client.post(
+        "/expenses/",
+        json={"group_id": g["id"], "payer_id": u1["id"], "amount": 90},
+        headers=headers,
+    )
+
+    r = await client.get(f"/groups/{g['id']}/settlements")
+    assert r.status_code == 200
+    plan = sorted((s["from_user_id"], s["to_user_id"], s["amount"]) for s in r.json())
+    assert plan == sorted([(u2["id"], u1["id"], 30.0), (u3["id"], u1["id"], 30.0)])
+
+    r2 = await client.get(f"/groups/{uuid4()}/settlements")
+    assert r2.status_code == 404
+
+
+async def test_group_balances_as_of_with_checkpoints(client, db_session):
+    token = await _signup_and_token(client, email="asof@example.com", is_admin=True)
+    headers = {"Authorization": f"Bearer {token}"}
+    users = [
+        (await client.post("/users/", json={"email": f"asof{i}@example.com", "name": f"A{i}"})).json()
+        for i in range(3)
+    ]
+    g = (await client.post("/groups/", json={"name": "AsOf"}, headers=headers)).json()
+    for u in users:
+        await client.post(f"/groups/{g['id']}/members/{u['id']}", headers=headers)
+
+    repo = SQLAlchemyExpenseRepository(db_session)
+    gid = UUID(g["id"])
+    u1, u2, u3 = (UUID(u["id"]) for u in users)
+    for payer, amount, when in (
+        (u1, 10000, datetime(2026, 1, 10, tzinfo=timezone.utc)),
+        (u2, 4000, datetime(2026, 1, 25, tzinfo=timezone.utc)),
+        (u1, 2000, datetime(2026, 2, 5, tzinfo=timezone.utc)),
+    ):
+        await repo.add(Expense(group_id=gid, payer_id=payer, amount=amount, created_at=when))
+
+    async def balances_as_of(when: str):
+        r = await client.get(f"/groups/{g['id']}/balances", params={"as_of": when})
+        assert r.status_code == 200
+        return {UUID(b["user_id"]): b["balance"] for b in r.json()}
+
+    replayed = await balances_as_of("2026-01-31T23:59:59Z")
+    assert replayed == {u1: 53.33, u2: -6.67, u3: -46.67}
+
+    written = await repo.write_checkpoints(
+        timedelta(days=7), group_id=gid, now=datetime(2026, 2, 10, tzinfo=timezone.utc)
+    )
+    assert written > 0
+
+    assert await balances_as_of("2026-01-31T23:59:59Z") == replayed
+    assert await balances_as_of("2026-02-07T00:00:00+01:00") == {u1: 66.67, u2: -13.33, u3: -53.33}
+    assert await balances_as_of("2025-12-31T00:00:00Z") == {u1: 0.0, u2: 0.0, u3: 0.0}
+
+    # Incremental runs only add checkpoints for groups that changed since the last one
+    await repo.add(
+        Expense(group_id=gid, payer_id=u3, amount=3000, created_at=datetime(2026, 2, 12, tzinfo=timezone.utc))
+    )
+    later = await repo.write_checkpoints(
+        timedelta(days=7), group_id=gid, now=datetime(2026, 3, 1, tzinfo=timezone.utc)
+    )
+    assert later == 3
+    assert await balances_as_of("2026-02-28T00:00:00Z") == {u1: 56.67, u2: -23.33, u3: -33.33}
+
+
+async def test_incremental_checkpoints_resume_per_group(client, db_session):
+    token = await _signup_and_token(client, email="resume@example.com", is_admin=True)
+    headers = {"Authorization": f"Bearer {token}"}
+    payer = (await client.post("/users/", json={"email": "resume-payer@example.com", "name": "P"})).json()
+    groups = []
+    for name in ("A", "B"):
+        g = (await client.post("/groups/", json={"name": name}, headers=headers)).json()
+        await client.post(f"/groups/{g['id']}/members/{payer['id']}", headers=headers)
+        groups.append(UUID(g["id"]))
+    a, b = groups
+    pid = UUID(payer["id"])
+
+    def on(day):
+        return datetime(2027, 1, 1, tzinfo=timezone.utc) + timedelta(days=day)
+
+    repo = SQLAlchemyExpenseRepository(db_session)
+    week = timedelta(days=7)
+    await repo.add(Expense(group_id=a, payer_id=pid, amount=300, created_at=on(4)))
+    await repo.add(Expense(group_id=b, payer_id=pid, amount=500, created_at=on(5)))
+    await repo.write_checkpoints(week, group_id=a, now=on(19))
+
+    # A resumes after its checkpoint; B has none and must start from its first expense
+    await repo.add(Expense(group_id=a, payer_id=pid, amount=100, created_at=on(24)))
+    await repo.add(Expense(group_id=b, payer_id=pid, amount=700, created_at=on(25)))
+    await repo.write_checkpoints(week, now=on(40))
+
+    async def checkpoints(group_id):
+        result = await db_session.execute(
+            select(BalanceCheckpointORM.checkpoint_at, BalanceCheckpointORM.paid_cents)
+            .where(BalanceCheckpointORM.group_id == group_id)
+            .order_by(BalanceCheckpointORM.checkpoint_at)
+        )
+        return [cents for _, cents in result.all()]
+
+    assert await checkpoints(a) == [300, 400]
+    assert await checkpoints(b) == [500, 1200]
@@ -0,0 +1,31 @@
+async def test_endpoint_statement_budgets(client, query_budget):
+    r = await client.post(
+        "/auth/signup",
+        json={"email": "budget_owner@example.com", "name": "Owner", "password": "s3cret", "is_admin": True},
+    )
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    g = (await client.post("/groups/", json={"name": "Budget"}, headers=headers)).json()
+    users = []
+    for i in range(30):
+        u = (await client.post("/users/", json={"email": f"budget{i}@example.com", "name": "B"})).json()
+        await client.post(f"/groups/{g['id']}/members/{u['id']}", headers=headers)
+        users.append(u)
+    newcomer = (await client.post("/users/", json={"email": "budget_new@example.com", "name": "N"})).json()
+    gid, uid = g["id"], users[0]["id"]
+
+    # (method, path, body, statements, ORM rows). The caller's principal comes from the
+    # token with its version cached, so auth adds nothing; nothing may scale with group size.
+    budgets = [
+        ("GET", f"/groups/{gid}", None, 1, 0),
+        ("GET", "/groups/", None, 1, 0),
+        ("GET", f"/users/{uid}/groups", None, 1, 0),
+        ("GET", f"/groups/{gid}/balances", None, 2, 0),
+        ("GET", f"/groups/{gid}/expenses", None, 2, 0),
+        ("POST", "/expenses/", {"group_id": gid, "payer_id": uid, "amount": 5}, 3, 0),
+        ("PATCH", f"/groups/{gid}", {"name": "Renamed"}, 1, 0),
+        ("POST", f"/groups/{gid}/members/{newcomer['id']}", None, 2, 0),
+    ]
+    for method, path, body, statements, rows in budgets:
+        with query_budget(statements=statements, rows=rows):
+            r = await client.request(method, path, json=body, headers=headers)
+        assert r.status_code == 200, (method, path, r.text)
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.infrastructure import pool_metrics
+from app.infrastructure.engine_profiles import engine_options, load_profile
+from app.infrastructure.pool_metrics import TimedAsyncAdaptedQueuePool, pool_status
+
+
+def test_profiles_select_pool_settings(monkeypatch):
+    monkeypatch.delenv("DB_ENGINE_PROFILE", raising=False)
+    prod = load_profile()
+    assert (prod.name, prod.echo, prod.capacity) == ("prod", False, 20)
+    assert load_profile("dev").echo is True
+
+    opts = engine_options("postgresql+asyncpg://app@db/app", prod, "primary")
+    assert (opts["pool_size"], opts["max_overflow"], opts["pool_timeout"], opts["pool_recycle"]) == (10, 10, 10, 1800)
+    assert opts["connect_args"] == {"prepared_statement_cache_size": 500}
+
+    bouncer = engine_options("postgresql+asyncpg://app@pgbouncer/app", load_profile("pgbouncer"), "primary")
+    assert bouncer["connect_args"]["prepared_statement_cache_size"] == 0
+    assert bouncer["connect_args"]["statement_cache_size"] == 0
+
+    # In-memory SQLite keeps its single shared connection
+    assert "poolclass" not in engine_options("sqlite+aiosqlite:///:memory:", prod, "primary")
+
+
+def test_invalid_profiles_fail_at_startup(monkeypatch):
+    with pytest.raises(ValueError, match="Unknown DB_ENGINE_PROFILE"):
+        load_profile("staging")
+
+    monkeypatch.setenv("DB_POOL_SIZE", "25")
+    assert load_profile("prod").pool_size == 25
+    monkeypatch.setenv("DB_POOL_SIZE", "0")
+    with pytest.raises(ValueError, match="pool_size"):
+        load_profile("prod")
+    monkeypatch.setenv("DB_POOL_SIZE", "lots")
+    with pytest.raises(ValueError, match="DB_POOL_SIZE"):
+        load_profile("prod")
+
+
+async def test_pool_reports_wait_time_and_saturation(tmp_path, monkeypatch):
+    waits = []
+
+    class Recorder:
+        def record(self, value, attributes):
+            waits.append((value, attributes))
+
+    monkeypatch.setattr(pool_metrics, "checkout_wait", Recorder())
+    monkeypatch.setenv("DB_POOL_SIZE", "1")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    profile = load_profile("test")
+    url = f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}"
+    engine = create_async_engine(url, **engine_options(url, profile, "primary"))
+    try:
+        assert isinstance(engine.pool, TimedAsyncAdaptedQueuePool)
+        async with engine.connect() as held:
+            await held.execute(text("SELECT 1"))
+            assert pool_status(engine, profile.capacity)["saturation"] == 1.0
+
+            # A second checkout queues behind the held connection
+            async def second():
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+
+            waiting = asyncio.create_task(second())
+            await asyncio.sleep(0.2)
+        await waiting
+
+        assert pool_status(engine, profile.capacity) == {"used": 0, "idle": 1, "saturation": 0.0}
+        assert {attrs["pool.name"] for _, attrs in waits} == {"primary"}
+        assert max(value for value, _ in waits) >= 0.1
+    finally:
+        await engine.dispose()
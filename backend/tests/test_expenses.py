@@ -1,3 +1,19 @@
+import base64
+import csv
+import io
+import json
+import re
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+
+from app.domain.exceptions import NotGroupMemberError, UserExistsError
+from app.domain.models import Expense, Group, User
+from app.infrastructure.repositories import SQLAlchemyGroupRepository, SQLAlchemyUserRepository
+from app.infrastructure.unit_of_work import SQLAlchemyUnitOfWork
+
+
 async def _signup_and_token(
     client,
     email="exp_owner@example.com",
@@ -53,12 +69,12 @@ async def test_expense_flow(client):
     # List group expenses
     le = await client.get(f"/groups/{gid}/expenses")
     assert le.status_code == 200
-    assert any(e["id"] == eid for e in le.json())
+    assert any(e["id"] == eid for e in le.json()["items"])
 
     # List all expenses
-    la = await client.get("/expenses/")
+    la = await client.get("/expenses/", params={"limit": 1000})
     assert la.status_code == 200
-    assert any(e["id"] == eid for e in la.json())
+    assert any(e["id"] == eid for e in la.json()["items"])
 
     # Get expense by id
     ge = await client.get(f"/expenses/{eid}")
@@ -86,3 +102,216 @@ async def test_expense_rejects_non_member_payer(client):
         headers=headers,
     )
     assert r.status_code == 400
+
+
+async def test_group_expenses_keyset_pagination(client):
+    u = (await client.post("/users/", json={"email": "pager@example.com", "name": "Pager"})).json()
+    token = await _signup_and_token(client, email="exp_pager@example.com", is_admin=True)
+    headers = {"Authorization": f"Bearer {token}"}
+    g = (await client.post("/groups/", json={"name": "Pages"}, headers=headers)).json()
+    await client.post(f"/groups/{g['id']}/members/{u['id']}", headers=headers)
+    created = []
+    for i in range(5):
+        r = await client.post(
+            "/expenses/",
+            json={"group_id": g["id"], "payer_id": u["id"], "amount": i + 1},
+            headers=headers,
+        )
+        created.append(r.json()["id"])
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+        page = (await client.get(f"/groups/{g['id']}/expenses", params=params)).json()
+        assert page["limit"] == 2
+        assert len(page["items"]) <= 2
+        seen.extend(e["id"] for e in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == created
+
+    bad = await client.get(f"/groups/{g['id']}/expenses", params={"cursor": "not-a-cursor"})
+    assert bad.status_code == 400
+    # Well-formed JSON with the wrong types is rejected too, not a 500
+    for parts in ([1, str(uuid4())], ["2026-01-01T00:00:00+00:00", 5]):
+        cursor = base64.urlsafe_b64encode(json.dumps(parts).encode()).decode().rstrip("=")
+        bad = await client.get(f"/groups/{g['id']}/expenses", params={"cursor": cursor})
+        assert bad.status_code == 400
+
+
+async def test_export_group_expenses(client):
+    u = (await client.post("/users/", json={"email": "exporter@example.com", "name": "Exp"})).json()
+    token = await _signup_and_token(client, email="exp_export@example.com", is_admin=True)
+    headers = {"Authorization": f"Bearer {token}"}
+    g = (await client.post("/groups/", json={"name": "Export"}, headers=headers)).json()
+    await client.post(f"/groups/{g['id']}/members/{u['id']}", headers=headers)
+    for amount, desc in ((12.5, "taxi"), (3, "coffee, large")):
+        await client.post(
+            "/expenses/",
+            json={"group_id": g["id"], "payer_id": u["id"], "amount": amount, "description": desc},
+            headers=headers,
+        )
+
+    nd = await client.get(f"/groups/{g['id']}/expenses/export")
+    assert nd.status_code == 200
+    assert nd.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in nd.text.splitlines()]
+    assert [(e["amount"], e["description"]) for e in lines] == [(12.5, "taxi"), (3.0, "coffee, large")]
+
+    cv = await client.get(f"/groups/{g['id']}/expenses/export", params={"format": "csv"})
+    assert cv.status_code == 200
+    assert cv.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(cv.text)))
+    assert [(r["amount"], r["description"]) for r in rows] == [("12.5", "taxi"), ("3.0", "coffee, large")]
+
+    bad = await client.get(f"/groups/{g['id']}/expenses/export", params={"format": "xml"})
+    assert bad.status_code == 422
+    missing = await client.get(f"/groups/{uuid4()}/expenses/export")
+    assert missing.status_code == 404
+
+
+async def test_bulk_create_expenses(client):
+    u1 = (await client.post("/users/", json={"email": "bulk1@example.com", "name": "B1"})).json()
+    u2 = (await client.post("/users/", json={"email": "bulk2@example.com", "name": "B2"})).json()
+    token = await _signup_and_token(client, email="exp_bulk@example.com", is_admin=True)
+    headers = {"Authorization": f"Bearer {token}"}
+    g = (await client.post("/groups/", json={"name": "Bulk"}, headers=headers)).json()
+    await client.post(f"/groups/{g['id']}/members/{u1['id']}", headers=headers)
+
+    rows = [{"group_id": g["id"], "payer_id": u1["id"], "amount": 10 + i} for i in range(50)]
+    rows.insert(3, {"group_id": g["id"], "payer_id": u2["id"], "amount": 5})
+    rows.insert(7, {"group_id": str(uuid4()), "payer_id": u1["id"], "amount": 5})
+    rows.insert(9, {"group_id": g["id"], "payer_id": str(uuid4()), "amount": 5})
+
+    r = await client.post("/expenses/bulk", json=rows, headers=headers)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["created"] == 50
+    assert len(body["ids"]) == 50
+    assert body["errors"] == [
+        {"index": 3, "detail": "Payer is not a member of the group"},
+        {"index": 7, "detail": "Group not found"},
+        {"index": 9, "detail": "Payer not found"},
+    ]
+
+    listed = (await client.get(f"/groups/{g['id']}/expenses", params={"limit": 1000})).json()["items"]
+    assert {e["id"] for e in listed} == set(body["ids"])
+
+    # The ledger is credited for bulk rows too: u1 is the only member
+    bals = (await client.get(f"/groups/{g['id']}/balances")).json()
+    assert bals == [{"user_id": u1["id"], "balance": 0.0}]
+
+    empty = await client.post("/expenses/bulk", json=[], headers=headers)
+    assert empty.status_code == 422
+
+
+async def test_list_group_expenses_filters(client):
+    u1 = (await client.post("/users/", json={"email": "flt1@example.com", "name": "F1"})).json()
+    u2 = (await client.post("/users/", json={"email": "flt2@example.com", "name": "F2"})).json()
+    token = await _signup_and_token(client, email="exp_filter@example.com", is_admin=True)
+    headers = {"Authorization": f"Bearer {token}"}
+    g = (await client.post("/groups/", json={"name": "Filters"}, headers=headers)).json()
+    for u in (u1, u2):
+        await client.post(f"/groups/{g['id']}/members/{u['id']}", headers=headers)
+
+    rows = [
+        (u1, 12.5, "Pizza night"),
+        (u2, 40, "Train tickets 100%"),
+        (u1, 75, "Hotel"),
+        (u2, 8, "pizza slices"),
+        (u1, 3, None),
+    ]
+    created = []
+    for payer, amount, description in rows:
+        body = {"group_id": g["id"], "payer_id": payer["id"], "amount": amount}
+        if description:
+            body["description"] = description
+        created.append((await client.post("/expenses/", json=body, headers=headers)).json())
+
+    async def ids(**params):
+        r = await client.get(f"/groups/{g['id']}/expenses", params=params)
+        assert r.status_code == 200
+        return [e["id"] for e in r.json()["items"]]
+
+    assert await ids(payer_id=u2["id"]) == [created[1]["id"], created[3]["id"]]
+    assert await ids(min_amount=8, max_amount=40) == [created[0]["id"], created[1]["id"], created[3]["id"]]
+    assert await ids(q="PIZZA") == [created[0]["id"], created[3]["id"]]
+    assert await ids(q="100%") == [created[1]["id"]]
+    assert await ids(q="ho") == [created[2]["id"]]
+    assert await ids(q="pizza", payer_id=u1["id"]) == [created[0]["id"]]
+    assert await ids(q="nothing like this") == []
+
+    third = created[2]["created_at"]
+    assert await ids(**{"from": third}) == [e["id"] for e in created[2:]]
+    assert await ids(to=third) == [e["id"] for e in created[:2]]
+
+    # Filters and keyset pagination compose
+    first = (await client.get(f"/groups/{g['id']}/expenses", params={"q": "i", "limit": 2})).json()
+    assert [e["id"] for e in first["items"]] == [created[0]["id"], created[1]["id"]]
+    rest = await ids(q="i", limit=2, cursor=first["next_cursor"])
+    assert rest == [created[3]["id"]]
+
+
+async def test_create_expense_single_insert(client, db_session):
+    u = (await client.post("/users/", json={"email": "single@example.com", "name": "One"})).json()
+    token = await _signup_and_token(client, email="exp_single@example.com", is_admin=True)
+    headers = {"Authorization": f"Bearer {token}"}
+    g = (await client.post("/groups/", json={"name": "Single"}, headers=headers)).json()
+    for i in range(20):
+        member = (await client.post("/users/", json={"email": f"single{i}@example.com", "name": "M"})).json()
+        await client.post(f"/groups/{g['id']}/members/{member['id']}", headers=headers)
+    await client.post(f"/groups/{g['id']}/members/{u['id']}", headers=headers)
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        r = await client.post(
+            "/expenses/", json={"group_id": g["id"], "payer_id": u["id"], "amount": 7.5}, headers=headers
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert r.status_code == 200
+    assert r.json()["amount"] == 7.5
+
+    # Membership is checked inside the INSERT; the group and its members are never loaded.
+    # Everything after the insert is the ledger and rollup upserts.
+    inserts = [i for i, s in enumerate(statements) if s.lstrip().startswith("INSERT INTO expenses")]
+    assert len(inserts) == 1 and "EXISTS" in statements[inserts[0]]
+    assert not any(re.search(r"WHERE groups\.id\b", s) for s in statements)
+    after = statements[inserts[0] + 1 :]
+    assert [s.split("(")[0].strip() for s in after] == [
+        "INSERT INTO group_balances",
+        "INSERT INTO expense_rollups",
+    ]
+
+    missing_group = await client.post(
+        "/expenses/", json={"group_id": str(uuid4()), "payer_id": u["id"], "amount": 1}, headers=headers
+    )
+    assert (missing_group.status_code, missing_group.json()["detail"]) == (404, "Group not found")
+    missing_payer = await client.post(
+        "/expenses/", json={"group_id": g["id"], "payer_id": str(uuid4()), "amount": 1}, headers=headers
+    )
+    assert (missing_payer.status_code, missing_payer.json()["detail"]) == (404, "Payer not found")
+
+
+async def test_failed_writes_leave_the_unit_of_work_transaction_alone(db_session):
+    uow = SQLAlchemyUnitOfWork(db_session)
+    async with uow:
+        user = await uow.users.add(User(email="uow-keep@example.com", name="Keep"))
+        group = await uow.groups.add(Group(name="Kept"))
+        with pytest.raises(NotGroupMemberError):
+            await uow.expenses.add_for_member(Expense(group_id=group.id, payer_id=user.id, amount=100))
+        with pytest.raises(UserExistsError):
+            await uow.users.add(User(email="uow-keep@example.com", name="Again"))
+        await uow.commit()
+
+    groups = SQLAlchemyGroupRepository(db_session)
+    assert (await groups.get(group.id)).name == "Kept"
+    assert (await SQLAlchemyUserRepository(db_session).get_by_email("uow-keep@example.com")).id == user.id
@@ -64,6 +64,20 @@ async def test_group_creation_and_membership(client):
     # Not found group
     nf = await client.post(f"/groups/{uuid4()}/members/{user_id}", headers=headers)
     assert nf.status_code == 404
+    nu = await client.post(f"/groups/{group_id}/members/{uuid4()}", headers=headers)
+    assert (nu.status_code, nu.json()["detail"]) == (404, "User not found")
+
+    # Adding an existing member is a no-op
+    again = await client.post(f"/groups/{group_id}/members/{user_id}", headers=headers)
+    assert again.status_code == 200
+    assert again.json()["members"].count(user_id) == 1
+
+    # Rename returns the group with its members
+    up = await client.patch(f"/groups/{group_id}", json={"name": "Renamed"}, headers=headers)
+    assert up.status_code == 200
+    assert up.json()["name"] == "Renamed" and user_id in up.json()["members"]
+    missing = await client.patch(f"/groups/{uuid4()}", json={"name": "X"}, headers=headers)
+    assert missing.status_code == 404
 
 
 async def test_group_balances(client):
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from app.api.idempotency import response_cache
+from app.domain.models import IdempotencyRecord
+from app.infrastructure.repositories import SQLAlchemyIdempotencyRepository
+
+
+async def _signup_and_token(client, email="idem@example.com"):
+    local, _, domain = email.partition("@")
+    r = await client.post(
+        "/auth/signup",
+        json={
+            "email": f"{local}+{uuid4().hex}@{domain}",
+            "name": "Owner",
+            "password": "s3cret",
+            "is_admin": True,
+        },
+    )
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+async def test_expense_retry_replays_first_response(client):
+    headers = {"Authorization": f"Bearer {await _signup_and_token(client)}"}
+    payer = (await client.post("/users/", json={"email": "idem-payer@example.com", "name": "P"})).json()
+    g = (await client.post("/groups/", json={"name": "Idem"}, headers=headers)).json()
+    await client.post(f"/groups/{g['id']}/members/{payer['id']}", headers=headers)
+
+    body = {"group_id": g["id"], "payer_id": payer["id"], "amount": 20, "description": "Taxi"}
+    keyed = {**headers, "Idempotency-Key": "retry-1"}
+    first = await client.post("/expenses/", json=body, headers=keyed)
+    assert first.status_code == 200
+    assert first.json()["amount"] == 20.0
+    assert "Idempotent-Replayed" not in first.headers
+
+    again = await client.post("/expenses/", json=body, headers=keyed)
+    assert again.status_code == 200
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert again.content == first.content
+
+    # Replays are served from the table when the process cache is cold
+    response_cache.clear()
+    cold = await client.post("/expenses/", json=body, headers=keyed)
+    assert cold.headers["Idempotent-Replayed"] == "true"
+    assert cold.content == first.content
+
+    listed = (await client.get(f"/groups/{g['id']}/expenses")).json()["items"]
+    assert [e["id"] for e in listed] == [first.json()["id"]]
+
+    # Reusing the key for a different request is rejected
+    other = await client.post("/expenses/", json={**body, "amount": 21}, headers=keyed)
+    assert other.status_code == 422
+
+    # Keys are scoped per user
+    other_user = {"Authorization": f"Bearer {await _signup_and_token(client, 'idem-other@example.com')}"}
+    fresh = await client.post("/expenses/", json=body, headers={**other_user, "Idempotency-Key": "retry-1"})
+    assert fresh.status_code == 200
+    assert fresh.json()["id"] != first.json()["id"]
+
+    # Without a key every request creates an expense
+    await client.post("/expenses/", json=body, headers=headers)
+    await client.post("/expenses/", json=body, headers=headers)
+    listed = (await client.get(f"/groups/{g['id']}/expenses")).json()["items"]
+    assert len(listed) == 4
+
+
+async def test_group_retry_replays_first_response(client):
+    headers = {"Authorization": f"Bearer {await _signup_and_token(client, 'idem-group@example.com')}"}
+    keyed = {**headers, "Idempotency-Key": "group-1"}
+    first = await client.post("/groups/", json={"name": "Trip"}, headers=keyed)
+    again = await client.post("/groups/", json={"name": "Trip"}, headers=keyed)
+    assert first.status_code == again.status_code == 200
+    assert again.json() == first.json()
+    assert again.headers["Idempotent-Replayed"] == "true"
+
+    mismatch = await client.post("/groups/", json={"name": "Other"}, headers=keyed)
+    assert mismatch.status_code == 422
+
+
+async def test_purge_idempotency_keys(client, db_session):
+    headers = {"Authorization": f"Bearer {await _signup_and_token(client, 'idem-purge@example.com')}"}
+    await client.post("/groups/", json={"name": "Old"}, headers={**headers, "Idempotency-Key": "purge-1"})
+
+    repo = SQLAlchemyIdempotencyRepository(db_session)
+    assert await repo.purge(datetime.now(timezone.utc) - timedelta(hours=1)) == 0
+    assert await repo.purge(datetime.now(timezone.utc) + timedelta(seconds=1)) >= 1
+
+
+async def test_concurrent_retry_replays_winner(client, monkeypatch):
+    headers = {"Authorization": f"Bearer {await _signup_and_token(client, 'idem-race@example.com')}"}
+    keyed = {**headers, "Idempotency-Key": "race-1"}
+    first = await client.post("/groups/", json={"name": "Race"}, headers=keyed)
+
+    # A retry that checked for the key before the first request committed
+    real_get = SQLAlchemyIdempotencyRepository.get
+    misses = iter([None])
+
+    async def racing_get(self, user_id, key):
+        return next(misses, None) or await real_get(self, user_id, key)
+
+    monkeypatch.setattr(SQLAlchemyIdempotencyRepository, "get", racing_get)
+    response_cache.clear()
+    again = await client.post("/groups/", json={"name": "Race"}, headers=keyed)
+    assert again.status_code == 200
+    assert again.json() == first.json()
+    assert again.headers["Idempotent-Replayed"] == "true"
+
+    groups = (await client.get("/groups/", headers=headers, params={"limit": 1000})).json()["items"]
+    assert [g["id"] for g in groups if g["name"] == "Race"] == [first.json()["id"]]
+
+
+def test_cached_responses_expire_with_the_stored_record():
+    user_id = uuid4()
+
+    def record(key, age):
+        return IdempotencyRecord(
+            user_id=user_id,
+            key=key,
+            request_hash="h",
+            status_code=200,
+            response_body="{}",
+            created_at=datetime.now(timezone.utc) - age,
+        )
+
+    fresh = record("fresh", timedelta(0))
+    response_cache.put(fresh)
+    response_cache.put(record("stale", response_cache.ttl + timedelta(seconds=1)))
+    assert response_cache.get(user_id, "fresh") == fresh
+    assert response_cache.get(user_id, "stale") is None
+
+    # An entry cached while fresh is dropped once it outlives the TTL
+    aging = record("aging", response_cache.ttl - timedelta(seconds=1))
+    response_cache.put(aging)
+    assert response_cache.get(user_id, "aging") == aging
+    aging.created_at -= timedelta(seconds=2)
+    assert response_cache.get(user_id, "aging") is None
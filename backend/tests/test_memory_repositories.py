@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.domain.exceptions import (
+    GroupNotFoundError,
+    NotGroupMemberError,
+    PayerNotFoundError,
+    UserExistsError,
+    UserNotFoundError,
+)
+from app.domain.models import Expense, ExpenseFilter, Group, User
+from app.domain.services import create_user_and_add_to_group
+from app.infrastructure.repositories import (
+    InMemoryExpenseRepository,
+    InMemoryGroupRepository,
+    InMemoryUserRepository,
+)
+from app.infrastructure.unit_of_work import InMemoryUnitOfWork
+
+
+def _repos():
+    users = InMemoryUserRepository()
+    groups = InMemoryGroupRepository(users)
+    return users, groups, InMemoryExpenseRepository(groups)
+
+
+async def test_users_and_groups_are_indexed():
+    users, groups, _ = _repos()
+    alice = await users.add(User(email="alice@example.com", name="Alice"))
+    with pytest.raises(UserExistsError):
+        await users.add(User(email="alice@example.com", name="Again"))
+    assert (await users.get_by_email("alice@example.com")).id == alice.id
+    assert await users.get_by_email("nobody@example.com") is None
+
+    created = [await groups.add(Group(name=f"G{i}")) for i in range(5)]
+    ids = sorted(g.id for g in created)
+    for gid in ids[1:4]:
+        await groups.add_member(gid, alice.id)
+    again = await groups.add_member(ids[1], alice.id)
+    assert again.members == [alice.id]
+
+    assert [g.id for g in await groups.list_all()] == ids
+    assert [g.id for g in await groups.list_for_user(alice.id)] == ids[1:4]
+    assert [g.id for g in await groups.list_for_user(alice.id, limit=1, after=ids[1])] == [ids[2]]
+    with pytest.raises(UserNotFoundError):
+        await groups.add_member(ids[0], uuid4())
+    with pytest.raises(GroupNotFoundError):
+        await groups.add_member(uuid4(), alice.id)
+
+    # Returned models are copies; the store and its indexes are unaffected
+    again.members.append(uuid4())
+    assert (await groups.get(ids[1])).members == [alice.id]
+
+
+async def test_group_expenses_are_ordered_and_filtered_by_time():
+    users, groups, expenses = _repos()
+    payer = await users.add(User(email="p@example.com", name="P"))
+    group = await groups.add(Group(name="Trip"))
+    await groups.add_member(group.id, payer.id)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for day in (3, 0, 2, 1, 4):
+        await expenses.add_for_member(
+            Expense(
+                group_id=group.id,
+                payer_id=payer.id,
+                amount=100 * (day + 1),
+                created_at=start + timedelta(days=day),
+                description="Taxi" if day % 2 else "Dinner",
+            )
+        )
+    await expenses.add(Expense(group_id=uuid4(), payer_id=payer.id, amount=1))
+    outsider = await users.add(User(email="o@example.com", name="O"))
+    with pytest.raises(NotGroupMemberError):
+        await expenses.add_for_member(Expense(group_id=group.id, payer_id=outsider.id, amount=1))
+    with pytest.raises(PayerNotFoundError):
+        await expenses.add_for_member(Expense(group_id=group.id, payer_id=uuid4(), amount=1))
+
+    listed = await expenses.list_for_group(group.id)
+    assert [e.amount for e in listed] == [100, 200, 300, 400, 500]
+    page = await expenses.list_for_group(group.id, limit=2, after=(listed[1].created_at, listed[1].id))
+    assert [e.amount for e in page] == [300, 400]
+
+    window = ExpenseFilter(since=start + timedelta(days=1), until=start + timedelta(days=4), text="taxi")
+    assert [e.amount for e in await expenses.list_for_group(group.id, filters=window)] == [200, 400]
+    assert len(await expenses.list_all()) == 6
+
+
+async def test_unit_of_work_rolls_back_its_own_writes():
+    users, groups, expenses = _repos()
+    group = await groups.add(Group(name="G"))
+    kept = await create_user_and_add_to_group(
+        User(email="kept@example.com", name="K"),
+        group_id=group.id,
+        uow=InMemoryUnitOfWork(users, groups, expenses),
+    )
+
+    uow = InMemoryUnitOfWork(users, groups, expenses)
+    async with uow:
+        await uow.users.add(User(email="gone@example.com", name="G"))
+        gone = await uow.groups.add(Group(name="Gone"))
+        await uow.groups.add_member(group.id, (await uow.users.get_by_email("gone@example.com")).id)
+        await uow.groups.update_name(group.id, "Renamed")
+        await uow.rollback()
+
+    assert await users.get_by_email("gone@example.com") is None
+    assert await groups.get(gone.id) is None
+    assert await groups.get(group.id) == Group(id=group.id, name="G", members=[kept.id])
+    assert [g.id for g in await groups.list_for_user(kept.id)] == [group.id]
+
+
+async def test_add_for_member_checks_the_shared_membership_index():
+    users, groups, expenses = _repos()
+    payer = await users.add(User(email="payer@example.com", name="P"))
+    group = await groups.add(Group(name="G"))
+
+    with pytest.raises(NotGroupMemberError):
+        await expenses.add_for_member(Expense(group_id=group.id, payer_id=payer.id, amount=100))
+    with pytest.raises(GroupNotFoundError):
+        await expenses.add_for_member(Expense(group_id=uuid4(), payer_id=payer.id, amount=100))
+
+    # A member added through a unit of work is visible to the expense repository at once
+    uow = InMemoryUnitOfWork(users, groups, expenses)
+    async with uow:
+        await uow.groups.add_member(group.id, payer.id)
+        added = await uow.expenses.add_for_member(Expense(group_id=group.id, payer_id=payer.id, amount=100))
+        await uow.commit()
+    assert [e.id for e in await expenses.list_for_group(group.id)] == [added.id]
+
+    # Without a shared group repository nothing is a member
+    with pytest.raises(GroupNotFoundError):
+        await InMemoryExpenseRepository().add_for_member(Expense(group_id=group.id, payer_id=payer.id, amount=1))
@@ -0,0 +1,74 @@
+import os
+from datetime import date, datetime, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.schema import CreateTable
+
+from app.infrastructure.orm import Base, ExpenseORM, GroupORM, UserORM
+from app.infrastructure.partitions import ensure_expense_partitions, monthly_partitions
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+
+def test_monthly_partition_bounds_roll_over_years():
+    assert monthly_partitions(date(2026, 11, 17), 3) == [
+        ("expenses_p2026_11", date(2026, 11, 1), date(2026, 12, 1)),
+        ("expenses_p2026_12", date(2026, 12, 1), date(2027, 1, 1)),
+        ("expenses_p2027_01", date(2027, 1, 1), date(2027, 2, 1)),
+    ]
+
+
+def test_expenses_partitioned_on_postgres_only():
+    pg = str(CreateTable(ExpenseORM.__table__).compile(dialect=postgresql.dialect()))
+    assert "PARTITION BY RANGE (created_at)" in pg
+    assert "PRIMARY KEY (id, created_at)" in pg
+
+    lite = str(CreateTable(ExpenseORM.__table__).compile(dialect=sqlite.dialect()))
+    assert "PARTITION" not in lite
+
+
+async def test_ensure_partitions_is_a_noop_on_sqlite(db_session):
+    conn = await db_session.connection()
+    assert await conn.run_sync(ensure_expense_partitions, 3) == []
+
+
+@pytest.mark.skipif(not POSTGRES_URL, reason="set TEST_POSTGRES_URL to a disposable Postgres database")
+async def test_time_bounded_queries_prune_partitions():
+    engine = create_async_engine(POSTGRES_URL)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+            created = await conn.run_sync(ensure_expense_partitions, 1, date(2026, 1, 1))
+            assert created == ["expenses_p2026_01", "expenses_p2026_02"]
+
+            user_id, group_id = uuid4(), uuid4()
+            await conn.execute(UserORM.__table__.insert().values(id=user_id, email="p@example.com", name="P"))
+            await conn.execute(GroupORM.__table__.insert().values(id=group_id, name="P"))
+            await conn.execute(
+                ExpenseORM.__table__.insert(),
+                [
+                    {"id": uuid4(), "group_id": group_id, "payer_id": user_id, "amount": 100, "created_at": when}
+                    for when in (datetime(2026, 1, 5, tzinfo=timezone.utc), datetime(2026, 2, 5, tzinfo=timezone.utc))
+                ],
+            )
+
+            plan = await conn.execute(
+                text(
+                    "EXPLAIN SELECT * FROM expenses WHERE group_id = :gid "
+                    "AND created_at >= '2026-02-01 00:00:00+00' AND created_at < '2026-03-01 00:00:00+00'"
+                ),
+                {"gid": group_id},
+            )
+            plan_text = "\n".join(row[0] for row in plan)
+            assert "expenses_p2026_02" in plan_text
+            assert "expenses_p2026_01" not in plan_text
+            assert "expenses_default" not in plan_text
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
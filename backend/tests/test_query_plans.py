@@ -0,0 +1,167 @@
+import re
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event, select
+
+from app.domain.models import Expense, Group, User
+from app.infrastructure.orm import ExpenseORM
+from app.infrastructure.repositories import (
+    SQLAlchemyExpenseRepository,
+    SQLAlchemyGroupRepository,
+    SQLAlchemyUserRepository,
+)
+
+_FULL_SCAN = re.compile(r"^SCAN (TABLE )?(expenses|group_members|expense_segments)\b")
+_FROM_EXPENSES = re.compile(r"\bFROM expenses\b")
+
+
+@contextmanager
+def _query_plans(db_session):
+    """Collect SQLite ``EXPLAIN QUERY PLAN`` output for every SELECT issued in the block."""
+    plans = []
+
+    def explain(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.append((statement, [row[-1] for row in cursor.fetchall()]))
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", explain)
+    try:
+        yield plans
+    finally:
+        event.remove(engine, "before_cursor_execute", explain)
+
+
+def _assert_indexed(plans):
+    assert plans
+    for statement, details in plans:
+        scans = [d for d in details if _FULL_SCAN.match(d)]
+        assert not scans, f"full scan {scans} in:\n{statement}"
+
+
+async def test_group_expense_queries_use_index(db_session):
+    repo = SQLAlchemyExpenseRepository(db_session)
+    gid = uuid4()
+    with _query_plans(db_session) as plans:
+        await repo.list_for_group(gid, limit=10, after=(datetime.now(timezone.utc), uuid4()))
+        await repo.sum_by_payer(gid, until=datetime.now(timezone.utc))
+        async for _ in repo.stream_for_group(gid):
+            pass
+    _assert_indexed(plans)
+    expense_plans = [details for statement, details in plans if _FROM_EXPENSES.search(statement)]
+    assert len(expense_plans) == 3
+    assert all(any("ix_expenses_group_created" in d for d in details) for details in expense_plans)
+
+
+async def test_payer_lookup_uses_index(db_session):
+    with _query_plans(db_session) as plans:
+        await db_session.execute(select(ExpenseORM.id).where(ExpenseORM.payer_id == uuid4()))
+    _assert_indexed(plans)
+    assert any("ix_expenses_payer_id" in d for d in plans[0][1])
+
+
+async def test_membership_by_user_uses_index(db_session):
+    uid = uuid4()
+    with _query_plans(db_session) as plans:
+        await SQLAlchemyGroupRepository(db_session).list_for_user(uid)
+        await SQLAlchemyExpenseRepository(db_session).totals_for_member(uid)
+    _assert_indexed(plans)
+    assert any("ix_group_members_user_group" in d for _, details in plans for d in details)
+
+
+async def test_member_totals_read_the_ledger(db_session):
+    with _statements(db_session) as statements:
+        await SQLAlchemyExpenseRepository(db_session).totals_for_member(uuid4())
+    assert len(statements) == 1
+    assert "group_balances" in statements[0]
+    assert not _FROM_EXPENSES.search(statements[0])
+
+
+@contextmanager
+def _statements(db_session):
+    """Collect every SQL statement issued in the block."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.lstrip())
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def _targets(statements):
+    return [re.match(r"(INSERT INTO|UPDATE) (\w+)", s).group(2) for s in statements]
+
+
+async def test_writes_do_not_read_back(db_session):
+    users = SQLAlchemyUserRepository(db_session)
+    groups = SQLAlchemyGroupRepository(db_session)
+    expenses = SQLAlchemyExpenseRepository(db_session)
+
+    with _statements(db_session) as statements:
+        user = await users.add(User(email="returning@example.com", name="Ret"))
+    assert _targets(statements) == ["users"]
+    assert (user.email, user.name, user.token_version) == ("returning@example.com", "Ret", 0)
+
+    with _statements(db_session) as statements:
+        group = await groups.add(Group(name="Returning"))
+    assert _targets(statements) == ["groups"]
+
+    # SQLite has no writable CTEs, so the ledger row is its own statement there
+    with _statements(db_session) as statements:
+        joined = await groups.add_member(group.id, user.id)
+    assert _targets(statements) == ["group_members", "group_balances"]
+    assert joined.members == [user.id]
+
+    with _statements(db_session) as statements:
+        renamed = await groups.update_name(group.id, "Renamed")
+    assert _targets(statements) == ["groups"]
+    assert (renamed.name, renamed.members) == ("Renamed", [user.id])
+
+    with _statements(db_session) as statements:
+        expense = await expenses.add(Expense(group_id=group.id, payer_id=user.id, amount=250))
+    assert _targets(statements) == ["expenses", "group_balances", "expense_rollups"]
+    assert expense.created_at.tzinfo is not None
+
+    assert await groups.update_name(uuid4(), "Missing") is None
+
+
+async def test_group_reads_select_member_ids_only(db_session):
+    users = SQLAlchemyUserRepository(db_session)
+    groups = SQLAlchemyGroupRepository(db_session)
+    group = await groups.add(Group(name="Projection"))
+    member_ids = []
+    for i in range(3):
+        user = await users.add(User(email=f"projection{i}@example.com", name="P"))
+        await groups.add_member(group.id, user.id)
+        member_ids.append(user.id)
+
+    with _statements(db_session) as statements:
+        fetched = await groups.get(group.id)
+        listed = await groups.list_for_user(member_ids[0])
+        everything = await groups.list_all()
+    assert sorted(fetched.members) == sorted(member_ids)
+    assert [g.id for g in listed] == [group.id] and sorted(listed[0].members) == sorted(member_ids)
+    assert group.id in {g.id for g in everything}
+    # One statement per call, and user rows are never read
+    assert len(statements) == 3
+    assert not any(re.search(r"\bFROM users\b", s) for s in statements)
+
+
+@pytest.mark.parametrize("path", ["/expenses", "/expenses/export", "/reports"])
+async def test_group_existence_checks_skip_members(client, db_session, path):
+    group = await SQLAlchemyGroupRepository(db_session).add(Group(name="Exists"))
+    with _statements(db_session) as statements:
+        r = await client.get(f"/groups/{group.id}{path}")
+    assert r.status_code == 200
+    # Checking that the group exists must not load its member list
+    assert not any("group_members" in s for s in statements)
+    assert (await client.get(f"/groups/{uuid4()}{path}")).status_code == 404
@@ -0,0 +1,99 @@
+from uuid import uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.infrastructure import database as dbmod
+from app.infrastructure.orm import Base, UserORM
+from app.infrastructure.replicas import PRIMARY_PIN_COOKIE, Replica, ReplicaSet, user_pins
+from app.main import app
+
+
+async def _database(path, marker):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(UserORM).values(id=uuid4(), email=f"{marker}@example.com", name=marker))
+    return engine
+
+
+async def test_round_robin_skips_unhealthy_replicas(tmp_path):
+    first = await _database(tmp_path / "first.db", "first")
+    second = await _database(tmp_path / "second.db", "second")
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'broken.db'}")
+    replicas = ReplicaSet([first, broken, second], health_interval=60, health_timeout=2)
+    try:
+        chosen = [(await replicas.choose()).engine for _ in range(4)]
+        assert chosen == [first, second, first, second]
+        assert [r.healthy for r in replicas.replicas] == [True, False, True]
+
+        for replica in replicas.replicas:
+            replica.healthy = False
+        assert await replicas.choose() is None
+    finally:
+        await replicas.dispose()
+
+
+async def test_reads_use_replica_until_client_writes(client, tmp_path, monkeypatch):
+    primary = await _database(tmp_path / "primary.db", "primary")
+    replica = await _database(tmp_path / "replica.db", "replica")
+    monkeypatch.setattr(dbmod, "async_session_maker", async_sessionmaker(primary, expire_on_commit=False))
+    monkeypatch.setattr(dbmod.read_replicas, "replicas", [Replica(replica)])
+    app.dependency_overrides.pop(dbmod.get_read_db)
+
+    async def listed():
+        r = await client.get("/users/")
+        assert r.status_code == 200
+        return [u["name"] for u in r.json()["items"]]
+
+    try:
+        assert await listed() == ["replica"]
+
+        # A successful write pins this client's reads to the primary
+        created = await client.post("/users/", json={"email": "rw@example.com", "name": "RW"})
+        assert created.status_code == 200
+        assert PRIMARY_PIN_COOKIE in created.cookies
+        assert await listed() == ["primary"]
+
+        client.cookies.clear()
+        assert await listed() == ["replica"]
+    finally:
+        await primary.dispose()
+        await replica.dispose()
+
+
+async def test_bearer_writes_pin_the_user_without_cookies(client, tmp_path, monkeypatch):
+    primary = await _database(tmp_path / "primary.db", "primary")
+    replica = await _database(tmp_path / "replica.db", "replica")
+    monkeypatch.setattr(dbmod, "async_session_maker", async_sessionmaker(primary, expire_on_commit=False))
+    monkeypatch.setattr(dbmod.read_replicas, "replicas", [Replica(replica)])
+    app.dependency_overrides.pop(dbmod.get_read_db)
+
+    signup = await client.post(
+        "/auth/signup", json={"email": "pinned@example.com", "name": "Pinned", "password": "s3cret"}
+    )
+    headers = {"Authorization": f"Bearer {signup.json()['access_token']}"}
+
+    async def listed(**kwargs):
+        # Like the API client, which sends a bearer token and no cookies
+        client.cookies.clear()
+        r = await client.get("/users/", **kwargs)
+        assert r.status_code == 200
+        return [u["name"] for u in r.json()["items"]]
+
+    try:
+        user_pins.clear()
+        assert await listed(headers=headers) == ["replica"]
+
+        created = await client.post("/users/", json={"email": "bw@example.com", "name": "BW"}, headers=headers)
+        assert created.status_code == 200
+        assert await listed(headers=headers) == ["primary"]
+        # Other users, and anonymous clients, still read from the replica
+        assert await listed() == ["replica"]
+
+        user_pins.clear()
+        assert await listed(headers=headers) == ["replica"]
+    finally:
+        user_pins.clear()
+        await primary.dispose()
+        await replica.dispose()
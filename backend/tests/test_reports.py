@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+from app.domain.models import Expense
+from app.infrastructure.repositories import SQLAlchemyExpenseRepository
+
+
+async def _signup_and_token(client, email="reports@example.com"):
+    local, _, domain = email.partition("@")
+    r = await client.post(
+        "/auth/signup",
+        json={
+            "email": f"{local}+{uuid4().hex}@{domain}",
+            "name": "Owner",
+            "password": "s3cret",
+            "is_admin": True,
+        },
+    )
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+async def test_group_reports_by_day_and_month(client, db_session):
+    headers = {"Authorization": f"Bearer {await _signup_and_token(client)}"}
+    users = [
+        (await client.post("/users/", json={"email": f"rep{i}@example.com", "name": f"R{i}"})).json()
+        for i in range(2)
+    ]
+    g = (await client.post("/groups/", json={"name": "Reports"}, headers=headers)).json()
+    for u in users:
+        await client.post(f"/groups/{g['id']}/members/{u['id']}", headers=headers)
+
+    repo = SQLAlchemyExpenseRepository(db_session)
+    gid = UUID(g["id"])
+    u1, u2 = (UUID(u["id"]) for u in users)
+    # 23:30 in New York on Jan 31 is Feb 1 in UTC
+    late = datetime(2026, 1, 31, 23, 30, tzinfo=timezone(timedelta(hours=-5)))
+    for payer, amount, when in (
+        (u1, 1050, datetime(2026, 1, 10, tzinfo=timezone.utc)),
+        (u1, 250, datetime(2026, 1, 10, 18, tzinfo=timezone.utc)),
+        (u2, 700, late),
+    ):
+        await repo.add(Expense(group_id=gid, payer_id=payer, amount=amount, created_at=when))
+    await repo.add_many(
+        [
+            Expense(group_id=gid, payer_id=u2, amount=300, created_at=datetime(2026, 2, 1, 9, tzinfo=timezone.utc)),
+            Expense(group_id=gid, payer_id=u1, amount=125, created_at=datetime(2026, 2, 14, tzinfo=timezone.utc)),
+        ]
+    )
+
+    async def report(granularity):
+        r = await client.get(f"/groups/{g['id']}/reports", params={"granularity": granularity})
+        assert r.status_code == 200
+        return {(e["period"], e["payer_id"]): (e["amount"], e["count"]) for e in r.json()}
+
+    expected_days = {
+        ("2026-01-10", str(u1)): (13.0, 2),
+        ("2026-02-01", str(u2)): (10.0, 2),
+        ("2026-02-14", str(u1)): (1.25, 1),
+    }
+    expected_months = {
+        ("2026-01-01", str(u1)): (13.0, 2),
+        ("2026-02-01", str(u2)): (10.0, 2),
+        ("2026-02-01", str(u1)): (1.25, 1),
+    }
+    assert await report("day") == expected_days
+    assert await report("month") == expected_months
+
+    # The backfill command reproduces the incrementally maintained rows
+    assert await repo.rebuild_rollups(gid) == 3
+    assert await report("day") == expected_days
+    assert await report("month") == expected_months
+
+
+async def test_group_reports_validation(client):
+    r = await client.get(f"/groups/{uuid4()}/reports")
+    assert r.status_code == 404
+
+    headers = {"Authorization": f"Bearer {await _signup_and_token(client, 'reports-bad@example.com')}"}
+    g = (await client.post("/groups/", json={"name": "Empty"}, headers=headers)).json()
+    assert (await client.get(f"/groups/{g['id']}/reports")).json() == []
+    bad = await client.get(f"/groups/{g['id']}/reports", params={"granularity": "week"})
+    assert bad.status_code == 422
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app import main
+from app.infrastructure.constants import DEFAULT_GROUP_ID
+from app.infrastructure.engine_profiles import load_profile
+from app.infrastructure.orm import GroupORM
+from app.infrastructure.sqlite import sqlite_engines
+
+
+async def _pragma(engine, name):
+    async with engine.connect() as conn:
+        return (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+
+
+async def test_sqlite_profile_configures_writer_and_readers(tmp_path):
+    writer, readers = sqlite_engines(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}", load_profile("sqlite"))
+    try:
+        async with writer.begin() as conn:
+            await conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        for engine in (writer, readers):
+            assert await _pragma(engine, "journal_mode") == "wal"
+            assert await _pragma(engine, "synchronous") == 1  # NORMAL
+            assert await _pragma(engine, "busy_timeout") == 5000
+        assert await _pragma(readers, "query_only") == 1
+
+        with pytest.raises(OperationalError, match="readonly"):
+            async with readers.begin() as conn:
+                await conn.execute(text("INSERT INTO t VALUES (1)"))
+
+        # The writer has one connection: a second writer waits for the first to finish
+        order = []
+
+        async def write(value, hold):
+            async with writer.begin() as conn:
+                order.append(("start", value))
+                await conn.execute(text("INSERT INTO t VALUES (:x)"), {"x": value})
+                await asyncio.sleep(hold)
+                order.append(("end", value))
+
+        await asyncio.gather(write(1, 0.1), write(2, 0))
+        assert order == [("start", 1), ("end", 1), ("start", 2), ("end", 2)]
+        async with readers.connect() as conn:
+            assert (await conn.execute(text("SELECT count(*) FROM t"))).scalar() == 2
+    finally:
+        await writer.dispose()
+        await readers.dispose()
+
+
+def test_sqlite_profile_needs_a_database_file():
+    with pytest.raises(ValueError, match="SQLite database file"):
+        sqlite_engines("sqlite+aiosqlite:///:memory:", load_profile("sqlite"))
+    with pytest.raises(ValueError, match="SQLite database file"):
+        sqlite_engines("postgresql+asyncpg://app@db/app", load_profile("sqlite"))
+
+
+async def test_lifespan_seeds_default_group_on_sqlite(tmp_path, monkeypatch):
+    writer, readers = sqlite_engines(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}", load_profile("sqlite"))
+
+    async def dispose():
+        await writer.dispose()
+        await readers.dispose()
+
+    monkeypatch.setattr(main, "engine", writer)
+    monkeypatch.setattr(main, "async_session_maker", async_sessionmaker(writer, expire_on_commit=False))
+    monkeypatch.setattr(main, "dispose_engines", dispose)
+    for _ in range(2):  # a restart finds the group and leaves it alone
+        async with main.lifespan(main.app):
+            async with async_sessionmaker(readers)() as db:
+                group = await db.get(GroupORM, DEFAULT_GROUP_ID)
+    assert (group.id, group.name) == (DEFAULT_GROUP_ID, "default")
@@ -1,3 +1,8 @@
+import base64
+import json
+from uuid import UUID
+
+
 async def test_users_crud_and_groups_listing(client):
     # Create a user via users API
     r = await client.post("/users/", json={"email": "bob@example.com", "name": "Bob"})
@@ -7,9 +12,9 @@ async def test_users_crud_and_groups_listing(client):
     user_id = user["id"]
 
     # List users includes Bob
-    r2 = await client.get("/users/")
+    r2 = await client.get("/users/", params={"limit": 1000})
     assert r2.status_code == 200
-    emails = [u["email"] for u in r2.json()]
+    emails = [u["email"] for u in r2.json()["items"]]
     assert "bob@example.com" in emails
 
     # Get user by id
@@ -47,6 +52,12 @@ async def test_user_profile_update_with_auth(client):
     assert up.status_code == 200
     assert up.json()["name"] == "New Name"
 
+    # Tokens carry the profile, so updating it revokes them and returns a fresh one
+    stale = await client.get("/auth/me", headers=headers)
+    assert (stale.status_code, stale.json()["detail"]) == (401, "Token revoked")
+    headers = {"Authorization": f"Bearer {up.json()['access_token']}"}
+    assert (await client.get("/auth/me", headers=headers)).json()["name"] == "New Name"
+
     # Create another user and attempt to update them -> 403
     other = (await client.post("/users/", json={"email": "o@example.com", "name": "O"})).json()
     forb = await client.patch(f"/users/{other['id']}", json={"name": "X"}, headers=headers)
@@ -57,3 +68,59 @@ async def test_user_profile_update_with_auth(client):
         f"/users/{uid}", json={"email": "o@example.com"}, headers=headers
     )
     assert conflict.status_code == 409
+
+
+async def test_user_balances_across_groups(client):
+    r = await client.post(
+        "/auth/signup",
+        json={"email": "multi@example.com", "name": "Multi", "password": "s3cret", "is_admin": True},
+    )
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    me = (await client.post("/users/", json={"email": "mg0@example.com", "name": "M0"})).json()
+    a = (await client.post("/users/", json={"email": "mg1@example.com", "name": "M1"})).json()
+    b = (await client.post("/users/", json={"email": "mg2@example.com", "name": "M2"})).json()
+
+    g1 = (await client.post("/groups/", json={"name": "Trip"}, headers=headers)).json()
+    g2 = (await client.post("/groups/", json={"name": "Flat"}, headers=headers)).json()
+    g3 = (await client.post("/groups/", json={"name": "Quiet"}, headers=headers)).json()
+    for gid, members in ((g1["id"], (me, a, b)), (g2["id"], (me, a)), (g3["id"], (me,))):
+        for u in members:
+            await client.post(f"/groups/{gid}/members/{u['id']}", headers=headers)
+
+    for gid, payer, amount in ((g1["id"], me, 100), (g1["id"], a, 40), (g2["id"], a, 25.5)):
+        r = await client.post(
+            "/expenses/",
+            json={"group_id": gid, "payer_id": payer["id"], "amount": amount},
+            headers=headers,
+        )
+        assert r.status_code == 200
+
+    r = await client.get(f"/users/{me['id']}/balances")
+    assert r.status_code == 200
+    body = r.json()
+    by_group = {g["group_id"]: g["balance"] for g in body["groups"]}
+    # The user also belongs to the default group when one is seeded
+    assert by_group[g1["id"]] == 53.33
+    assert by_group[g2["id"]] == -12.5
+    assert by_group[g3["id"]] == 0.0
+    assert body["balance"] == round(sum(by_group.values()), 2)
+
+
+async def test_list_users_pages_by_id(client):
+    for i in range(3):
+        await client.post("/users/", json={"email": f"page{i}@example.com", "name": f"P{i}"})
+
+    everyone = (await client.get("/users/", params={"limit": 1000})).json()["items"]
+    first = (await client.get("/users/", params={"limit": 2})).json()
+    second = (await client.get("/users/", params={"limit": 2, "cursor": first["next_cursor"]})).json()
+
+    ids = [u["id"] for u in everyone]
+    assert ids == sorted(ids, key=lambda v: UUID(v).hex)
+    assert [u["id"] for u in first["items"] + second["items"]] == ids[:4]
+
+
+async def test_malformed_cursors_are_rejected(client):
+    for parts in ([123], [None], [["nested"]], ["not-a-uuid"], ["a", "b"]):
+        cursor = base64.urlsafe_b64encode(json.dumps(parts).encode()).decode().rstrip("=")
+        r = await client.get("/users/", params={"cursor": cursor})
+        assert (r.status_code, r.json()["detail"]) == (400, "Invalid cursor")
@@ -1,9 +1,26 @@
+import random
+from math import floor
 from uuid import uuid4
 
 import pytest
 
-from app.domain.models import Expense
-from app.domain.services import summarize_balances
+from app.domain.exceptions import GroupNotFoundError
+from app.domain.models import Expense, Group, PayerTotal, User
+from app.domain.services import (
+    calculate_balances_from_payer_totals,
+    calculate_balances_from_totals,
+    calculate_group_balances,
+    create_user_and_add_to_group,
+    payer_credit_cents,
+    plan_settlements,
+    summarize_balances,
+)
+from app.domain.unit_of_work import UnitOfWork
+from app.infrastructure.repositories import (
+    InMemoryExpenseRepository,
+    InMemoryGroupRepository,
+    InMemoryUserRepository,
+)
 
 
 # Fixtures
@@ -368,3 +385,156 @@ class TestSummarizeBalancesEdgeCases:
 
         assert str(sample_payer_id) in result
         assert result[str(sample_payer_id)] == 0.0
+
+
+class TestCalculateBalancesFromTotals:
+    def test_matches_per_expense_calculation(self, sample_group_id):
+        """Aggregated payer credits give the same balances as replaying expenses."""
+        members = [uuid4() for _ in range(3)]
+        amounts = [(members[0], 10000), (members[1], 4099), (members[0], 1), (members[2], 250)]
+        expenses = [
+            Expense(group_id=sample_group_id, payer_id=payer, amount=amount)
+            for payer, amount in amounts
+        ]
+        paid = {}
+        for payer, amount in amounts:
+            paid[payer] = paid.get(payer, 0) + payer_credit_cents(amount)
+
+        expected = calculate_group_balances(members, expenses)
+        result = calculate_balances_from_totals(members, paid)
+
+        assert result.keys() == expected.keys()
+        for mid in members:
+            assert result[mid] == pytest.approx(expected[mid])
+
+    def test_from_payer_totals(self):
+        """``GROUP BY payer`` aggregates feed the same balance calculation."""
+        a, b = uuid4(), uuid4()
+        totals = [
+            PayerTotal(payer_id=a, amount=4099, credited=4000, count=2),
+            PayerTotal(payer_id=b, amount=1250, credited=1200, count=1),
+        ]
+
+        result = calculate_balances_from_payer_totals([a, b], totals)
+
+        assert result[a] == pytest.approx(14.0)
+        assert result[b] == pytest.approx(-14.0)
+
+    def test_no_members(self):
+        """A group without members has no balances."""
+        assert calculate_balances_from_totals([], {uuid4(): 100}) == {}
+
+    def test_payer_credit_is_whole_dollars(self):
+        """Payers are credited the whole-dollar part of the amount."""
+        assert payer_credit_cents(4299) == 4200
+        assert payer_credit_cents(99) == 0
+
+
+class TestCalculateGroupBalances:
+    @staticmethod
+    def _nested_loop(member_ids, expenses):
+        n = len(member_ids)
+        balances = {mid: 0.0 for mid in member_ids}
+        for e in expenses:
+            share = floor(float(e.amount) / 100) / n if n else 0.0
+            for mid in member_ids:
+                balances[mid] -= share
+            if e.payer_id in balances:
+                balances[e.payer_id] += floor(e.amount / 100)
+        return balances
+
+    def test_matches_nested_loop(self, sample_group_id):
+        """The indexed engine agrees with the original per-member loop."""
+        rng = random.Random(7)
+        members = [uuid4() for _ in range(25)]
+        outsider = uuid4()
+        expenses = [
+            Expense(
+                group_id=sample_group_id,
+                payer_id=rng.choice(members + [outsider]),
+                amount=rng.randint(1, 100_000),
+            )
+            for _ in range(300)
+        ]
+
+        expected = self._nested_loop(members, expenses)
+        result = calculate_group_balances(members, expenses)
+
+        assert list(result) == list(expected)
+        for mid in members:
+            assert result[mid] == pytest.approx(expected[mid])
+
+    def test_no_members(self, sample_group_id, sample_payer_id):
+        """Without members there is nobody to credit or debit."""
+        expense = Expense(group_id=sample_group_id, payer_id=sample_payer_id, amount=500)
+        assert calculate_group_balances([], [expense]) == {}
+
+
+class TestPlanSettlements:
+    @staticmethod
+    def _net(plan):
+        totals = {}
+        for s in plan:
+            totals[s.from_user_id] = totals.get(s.from_user_id, 0) - s.amount
+            totals[s.to_user_id] = totals.get(s.to_user_id, 0) + s.amount
+        return totals
+
+    def test_empty_and_settled_balances(self):
+        """Nothing to transfer when nobody owes anything."""
+        assert plan_settlements({}) == []
+        assert plan_settlements({uuid4(): 0.0, uuid4(): 0.001}) == []
+
+    def test_single_debtor_pays_each_creditor(self):
+        """One debtor settles with every creditor, largest first."""
+        a, b, c = uuid4(), uuid4(), uuid4()
+        plan = plan_settlements({a: 30.0, b: 10.0, c: -40.0})
+
+        assert [(s.from_user_id, s.to_user_id, s.amount) for s in plan] == [
+            (c, a, 3000),
+            (c, b, 1000),
+        ]
+
+    def test_plan_settles_every_balance(self):
+        """Applying the plan brings every member back to zero."""
+        rng = random.Random(3)
+        members = [uuid4() for _ in range(50)]
+        cents = [rng.randint(-10_000, 10_000) for _ in members[:-1]]
+        cents.append(-sum(cents))
+        balances = {mid: c / 100 for mid, c in zip(members, cents)}
+
+        plan = plan_settlements(balances)
+        net = self._net(plan)
+
+        assert len(plan) < len(members)
+        assert all(s.amount > 0 for s in plan)
+        for mid, c in zip(members, cents):
+            assert net.get(mid, 0) == c
+
+
+class _RecordingUnitOfWork(UnitOfWork):
+    def __init__(self):
+        self.users = InMemoryUserRepository()
+        self.groups = InMemoryGroupRepository(self.users)
+        self.expenses = InMemoryExpenseRepository(self.groups)
+        self.events = []
+
+    async def commit(self):
+        self.events.append("commit")
+
+    async def rollback(self):
+        self.events.append("rollback")
+
+
+class TestCreateUserAndAddToGroup:
+    async def test_commits_once(self):
+        uow = _RecordingUnitOfWork()
+        group = await uow.groups.add(Group(name="G"))
+        user = await create_user_and_add_to_group(User(email="a@example.com", name="A"), group_id=group.id, uow=uow)
+        assert uow.events == ["commit"]
+        assert (await uow.groups.list_for_user(user.id))[0].id == group.id
+
+    async def test_rolls_back_when_membership_fails(self):
+        uow = _RecordingUnitOfWork()
+        with pytest.raises(GroupNotFoundError):
+            await create_user_and_add_to_group(User(email="a@example.com", name="A"), group_id=uuid4(), uow=uow)
+        assert uow.events == ["rollback"]
@@ -6,9 +6,11 @@ import type {
   GroupCreate,
   GroupRead,
   LoginRequest,
+  Page,
   SignupRequest,
   Token,
   User,
+  UserUpdated,
 } from "./types";
 
 // Re-export all types
@@ -20,9 +22,11 @@ export type {
   GroupCreate,
   GroupRead,
   LoginRequest,
+  Page,
   SignupRequest,
   Token,
   User,
+  UserUpdated,
 };
 
 export class ExpenseClient {
@@ -41,6 +45,28 @@ export class ExpenseClient {
     return h;
   }
 
+  // Follow next_cursor links until the listing is exhausted.
+  private async listAll<T>(path: string, error: string): Promise<T[]> {
+    const items: T[] = [];
+    let cursor: string | null = null;
+    do {
+      const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+      const res = await fetch(`${this.options.baseUrl}${path}${query}`, {
+        headers: this.headers(),
+      });
+
+      if (!res.ok) {
+        throw new Error(`${error} (${res.status})`);
+      }
+
+      const page = (await res.json()) as Page<T>;
+      items.push(...page.items);
+      cursor = page.next_cursor;
+    } while (cursor);
+
+    return items;
+  }
+
   async ping(): Promise<string> {
     const res = await fetch(`${this.options.baseUrl}/`, { headers: this.headers() });
     const data = await res.json();
@@ -113,7 +139,8 @@ export class ExpenseClient {
     return (await res.json()) as User;
   }
 
-  async updateUserName(id: string, name: string): Promise<User> {
+  // Renaming revokes the current token; the response carries its replacement.
+  async updateUserName(id: string, name: string): Promise<UserUpdated> {
     const res = await fetch(`${this.options.baseUrl}/users/${id}`, {
       method: "PATCH",
       headers: this.headers(true),
@@ -130,31 +157,18 @@ export class ExpenseClient {
       throw new Error(message);
     }
 
-    return (await res.json()) as User;
+    const updated = (await res.json()) as UserUpdated;
+    this.setToken(updated.access_token);
+
+    return updated;
   }
 
   async listUsers(): Promise<User[]> {
-    const res = await fetch(`${this.options.baseUrl}/users/`, {
-      headers: this.headers(),
-    });
-
-    if (!res.ok) {
-      throw new Error(`Failed to load users (${res.status})`);
-    }
-
-    return (await res.json()) as User[];
+    return this.listAll<User>("/users/", "Failed to load users");
   }
 
   async listGroups(): Promise<GroupRead[]> {
-    const res = await fetch(`${this.options.baseUrl}/groups/`, {
-      headers: this.headers(),
-    });
-
-    if (!res.ok) {
-      throw new Error(`Failed to load groups (${res.status})`);
-    }
-
-    return (await res.json()) as GroupRead[];
+    return this.listAll<GroupRead>("/groups/", "Failed to load groups");
   }
 
   async listUserGroups(userId: string): Promise<GroupRead[]> {
@@ -239,15 +253,7 @@ export class ExpenseClient {
   }
 
   async listGroupExpenses(groupId: string): Promise<ExpenseRead[]> {
-    const res = await fetch(`${this.options.baseUrl}/groups/${groupId}/expenses`, {
-      headers: this.headers(),
-    });
-
-    if (!res.ok) {
-      throw new Error(`Failed to load expenses (${res.status})`);
-    }
-
-    return (await res.json()) as ExpenseRead[];
+    return this.listAll<ExpenseRead>(`/groups/${groupId}/expenses`, "Failed to load expenses");
   }
 
   async createExpense(input: Omit<ExpenseCreate, 'payer_id'> & { payer_id?: string }): Promise<ExpenseRead> {
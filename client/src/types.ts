@@ -23,6 +23,11 @@ export interface User {
   is_admin: boolean;
 }
 
+export interface UserUpdated extends User {
+  access_token: string;
+  token_type: string;
+}
+
 export interface GroupRead {
   id: string;
   name: string;
@@ -42,6 +47,12 @@ export interface ExpenseRead {
   description?: string | null;
 }
 
+export interface Page<T> {
+  items: T[];
+  limit: number;
+  next_cursor: string | null;
+}
+
 export interface BalanceEntry {
   user_id: string;
   balance: number;
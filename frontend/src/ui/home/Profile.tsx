@@ -4,7 +4,7 @@ import React from 'react';
 import { useAuth } from '../auth/useAuth';
 
 export const Profile: React.FC = () => {
-  const { client } = useAuth();
+  const { client, setToken } = useAuth();
   const [user, setUser] = React.useState<User | null>(null);
   const [error, setError] = React.useState<string | null>(null);
   const [editing, setEditing] = React.useState(false);
@@ -73,6 +73,8 @@ export const Profile: React.FC = () => {
     setError(null);
     try {
       const updated = await client.updateUserName(user.id, newName);
+      // The rename revoked the old token; persist the one that came back
+      setToken(updated.access_token);
       setUser(updated);
       setEditing(false);
     } catch (e: any) {
@@ -52,8 +52,8 @@ export class ExpenseClient {
       { id: 'u_me', name: 'Test User', email: 'me@example.com', is_admin: false },
     ];
   }
-  async updateUserName(id: string, name: string): Promise<User> {
-    return { id, name, email: 'me@example.com', is_admin: false };
+  async updateUserName(id: string, name: string): Promise<User & { access_token: string; token_type: string }> {
+    return { id, name, email: 'me@example.com', is_admin: false, access_token: 'token', token_type: 'bearer' };
   }
   async listGroups(): Promise<GroupRead[]> {
     return [